@@ -1,30 +1,54 @@
 import os
 import bpy
 import sys
+import json
 import typing
 import inspect
 import pkgutil
 import importlib
+import importlib.util
 from pathlib import Path
 
 __all__ = (
     "init",
     "register",
     "unregister",
+    "lazy_import",
+    "class_hooks",
 )
 
 modules = None
 ordered_classes = None
 
+# callables applied to every class right before it is registered
+class_hooks = []
+
+# Lazy mode imports only the modules defining classes or register functions,
+# in the order cached in the manifest, and defers heavy imports until first use.
+# Set MESH_UTILS_LAZY=0 to import and scan everything on every start.
+LAZY = os.environ.get("MESH_UTILS_LAZY", "1") != "0"
+MANIFEST_NAME = ".auto_load_manifest.json"
+
 def init():
     global modules
     global ordered_classes
 
-    modules = get_all_submodules(Path(__file__).parent)
+    directory = Path(__file__).parent
+    manifest = load_manifest(directory) if LAZY else None
+    if manifest is not None:
+        modules = [importlib.import_module("." + name, directory.name) for name in manifest["modules"]]
+        ordered_classes = list(iter_manifest_classes(manifest, directory.name))
+        return
+
+    modules = get_all_submodules(directory)
     ordered_classes = get_ordered_classes_to_register(modules)
+    if LAZY:
+        save_manifest(directory, modules, ordered_classes)
 
 def register():
     for cls in ordered_classes:
+        for hook in class_hooks:
+            hook(cls)
         bpy.utils.register_class(cls)
 
     for module in modules:
@@ -64,6 +88,66 @@ def iter_submodule_names(path, root=""):
             yield root + module_name
 
 
+def lazy_import(name, package=None):
+    # the module is executed on first attribute access
+    absolute_name = importlib.util.resolve_name(name, package)
+    if not LAZY or absolute_name in sys.modules:
+        return importlib.import_module(absolute_name)
+
+    spec = importlib.util.find_spec(absolute_name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[absolute_name] = module
+    loader.exec_module(module)
+    return module
+
+
+# Cached register order
+#################################################
+
+def get_manifest_key(directory):
+    # any change to the sources or the Blender version invalidates the manifest
+    files = {str(path.relative_to(directory)): path.stat().st_mtime_ns for path in sorted(directory.rglob("*.py"))}
+    return {"blender": list(bpy.app.version), "files": files}
+
+def load_manifest(directory):
+    try:
+        with open(directory / MANIFEST_NAME) as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("key") != get_manifest_key(directory):
+        return None
+    return manifest
+
+def save_manifest(directory, modules, ordered_classes):
+    package_name = directory.name
+    manifest = {
+        "key": get_manifest_key(directory),
+        # modules with something to register, in import order
+        "modules": [get_relative_name(module.__name__, package_name) for module in modules
+            if module.__name__ != __name__ and (hasattr(module, "register") or any(cls.__module__ == module.__name__ for cls in ordered_classes))],
+        "classes": [[get_relative_name(cls.__module__, package_name), cls.__qualname__] for cls in ordered_classes],
+    }
+    try:
+        with open(directory / MANIFEST_NAME, "w") as manifest_file:
+            json.dump(manifest, manifest_file, indent=1)
+    except OSError:
+        # read only installation, the order is computed on every start
+        pass
+
+def iter_manifest_classes(manifest, package_name):
+    for (module_name, qualname) in manifest["classes"]:
+        value = importlib.import_module("." + module_name, package_name)
+        for name in qualname.split("."):
+            value = getattr(value, name)
+        yield value
+
+def get_relative_name(module_name, package_name):
+    return module_name[len(package_name) + 1:]
+
+
 # Find classes to register
 #################################################
 
@@ -0,0 +1,299 @@
+# Interior detection benchmark and accuracy harness.
+#
+# Generates meshes with known ground truth, runs every interior detection
+# engine on them and reports wall time, peak memory and precision/recall.
+# Every case runs in a fresh Blender process, so its peak memory isn't hidden
+# by the high-water mark of the cases before it.
+#
+# Usage:
+#   blender -b --factory-startup -P benchmarks/interior_benchmark.py -- --output interior.json
+#   blender -b --factory-startup -P benchmarks/interior_benchmark.py -- --engines VOXEL WINDING --voxel-resolutions 64 128 256
+#   blender -b --factory-startup -P benchmarks/interior_benchmark.py -- --engines WINDING --memory-budgets 0 64 256
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import importlib
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+import bpy
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ADDON_DIR = Path(__file__).resolve().parent.parent
+SCRIPT = Path(__file__).resolve()
+
+
+# Add-on
+#################################################
+
+def load_addon():
+    # import the repository as add-on package and register it
+    sys.path.insert(0, str(ADDON_DIR.parent))
+    addon = importlib.import_module(ADDON_DIR.name)
+    addon.register()
+    return addon
+
+def addon_revision():
+    try:
+        output = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=str(ADDON_DIR), stderr=subprocess.DEVNULL)
+        return output.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# Ground truth meshes
+#################################################
+
+def grid_quads(origin, axis_u, axis_v, steps):
+    # planar grid of quads, winding follows axis_u x axis_v
+    verts = []
+    faces = []
+    for j in range(steps + 1):
+        for i in range(steps + 1):
+            verts.append(tuple(origin[k] + axis_u[k] * i / steps + axis_v[k] * j / steps for k in range(3)))
+    for j in range(steps):
+        for i in range(steps):
+            a = j * (steps + 1) + i
+            faces.append((a, a + 1, a + steps + 2, a + steps + 1))
+    return (verts, faces)
+
+def box_sides(center, size, steps):
+    # six subdivided sides with outward normals
+    (cx, cy, cz) = center
+    h = size / 2
+    s = size
+    return [
+        ((cx - h, cy - h, cz - h), (0, s, 0), (s, 0, 0)),  # -Z
+        ((cx - h, cy - h, cz + h), (s, 0, 0), (0, s, 0)),  # +Z
+        ((cx - h, cy - h, cz - h), (s, 0, 0), (0, 0, s)),  # -Y
+        ((cx - h, cy + h, cz - h), (0, 0, s), (s, 0, 0)),  # +Y
+        ((cx - h, cy - h, cz - h), (0, 0, s), (0, s, 0)),  # -X
+        ((cx + h, cy - h, cz - h), (0, s, 0), (0, 0, s)),  # +X
+    ]
+
+def append_grids(mesh_data, sides, steps, interior, skip=()):
+    (verts, faces, truth) = mesh_data
+    for side_index, (origin, axis_u, axis_v) in enumerate(sides):
+        (grid_verts, grid_faces) = grid_quads(origin, axis_u, axis_v, steps)
+        offset = len(verts)
+        verts.extend(grid_verts)
+        for face_index, face in enumerate(grid_faces):
+            if (side_index, face_index) in skip:
+                continue
+            faces.append(tuple(offset + index for index in face))
+            truth.append(interior(face, grid_verts))
+
+def centroid(face, verts):
+    return tuple(sum(verts[index][k] for index in face) / len(face) for k in range(3))
+
+def inside_box(point, center, size):
+    return all(abs(point[k] - center[k]) < size / 2 for k in range(3))
+
+def never(face, verts):
+    return False
+
+def always(face, verts):
+    return True
+
+def nested_boxes(steps):
+    # inner box completely enclosed by the outer one
+    mesh_data = ([], [], [])
+    append_grids(mesh_data, box_sides((0, 0, 0), 2.0, steps), steps, never)
+    append_grids(mesh_data, box_sides((0, 0, 0), 1.0, steps), steps, always)
+    return mesh_data
+
+def boolean_stack(steps):
+    # interpenetrating boxes, offsets follow the grid so no face straddles another box
+    boxes = [((0.0, 0.0, 0.0), 2.0), ((1.0, 0.5, 0.25), 2.0), ((-0.5, -1.0, 0.5), 2.0)]
+    mesh_data = ([], [], [])
+    for (center, size) in boxes:
+        others = [other for other in boxes if other[0] != center]
+        def interior(face, verts):
+            return any(inside_box(centroid(face, verts), *other) for other in others)
+        append_grids(mesh_data, box_sides(center, size, steps), steps, interior)
+    return mesh_data
+
+def shell_with_partitions(steps):
+    # closed shell with hidden internal walls
+    mesh_data = ([], [], [])
+    append_grids(mesh_data, box_sides((0, 0, 0), 2.0, steps), steps, never)
+    append_grids(mesh_data, [((0, -1, -1), (0, 2, 0), (0, 0, 2))], steps, always)
+    append_grids(mesh_data, [((-1, 0, -1), (0, 0, 2), (2, 0, 0))], steps, always)
+    return mesh_data
+
+def open_shell(steps):
+    # outer box with one missing face on top, inner box should still be found
+    mesh_data = ([], [], [])
+    hole = {(1, (steps // 2) * steps + steps // 2)}
+    append_grids(mesh_data, box_sides((0, 0, 0), 2.0, steps), steps, never, skip=hole)
+    append_grids(mesh_data, box_sides((0, -0.25, -0.25), 1.0, steps), steps, always)
+    return mesh_data
+
+SCENES = {
+    "nested_boxes": nested_boxes,
+    "boolean_stack": boolean_stack,
+    "shell_with_partitions": shell_with_partitions,
+    "open_shell": open_shell,
+}
+
+
+# Scene setup
+#################################################
+
+def reset_scene():
+    if bpy.context.object and bpy.context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    for mesh in list(bpy.data.meshes):
+        bpy.data.meshes.remove(mesh)
+
+def create_object(name, mesh_data):
+    (verts, faces, truth) = mesh_data
+    mesh = bpy.data.meshes.new(name)
+    mesh.from_pydata(verts, [], faces)
+    mesh.update()
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+    return obj
+
+def enter_edit_mode():
+    bpy.ops.object.mode_set(mode='EDIT')
+    bpy.ops.mesh.select_mode(type='FACE')
+    bpy.ops.mesh.select_all(action='DESELECT')
+
+def read_face_selection(obj):
+    bpy.ops.object.mode_set(mode='OBJECT')
+    return [polygon.select for polygon in obj.data.polygons]
+
+
+# Measurements
+#################################################
+
+def max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / (1024 * 1024) if platform.system() == 'Darwin' else rss / 1024
+
+def score(selection, truth):
+    true_positive = sum(1 for selected, expected in zip(selection, truth) if selected and expected)
+    selected = sum(selection)
+    expected = sum(truth)
+    precision = true_positive / selected if selected else 1.0
+    recall = true_positive / expected if expected else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {"precision": precision, "recall": recall, "f1": f1, "selected": selected, "expected": expected}
+
+def set_memory_budget(budget):
+    # read by the add-on on every run, 0 for no limit
+    os.environ["MESH_UTILS_MEMORY_BUDGET"] = str(budget)
+
+def run_case(scene_name, steps, params, memory_budget=0):
+    set_memory_budget(memory_budget)
+    reset_scene()
+    mesh_data = SCENES[scene_name](steps)
+    obj = create_object(scene_name, mesh_data)
+    enter_edit_mode()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    bpy.ops.mesh.select_interior_faces_bake(**params)
+    wall_time = time.perf_counter() - start
+    (_, peak_python) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        "scene": scene_name,
+        "faces": len(mesh_data[1]),
+        "params": params,
+        "memory_budget_mb": memory_budget,
+        "wall_time": wall_time,
+        "peak_python_mb": peak_python / (1024 * 1024),
+        # high-water mark of this process, scene setup included
+        "max_rss_mb": max_rss_mb(),
+    }
+    result.update(score(read_face_selection(obj), mesh_data[2]))
+    return result
+
+def run_child(scene_name, steps, params, memory_budget):
+    # one case in a fresh process, its result is printed as the last line
+    case = json.dumps({"scene": scene_name, "steps": steps, "params": params, "memory_budget": memory_budget})
+    command = [bpy.app.binary_path, "-b", "--factory-startup", "-P", str(SCRIPT), "--", "--case", case]
+    output = subprocess.check_output(command, stderr=subprocess.DEVNULL).decode()
+    line = [line for line in output.splitlines() if line.startswith("INTERIOR ")][-1]
+    return json.loads(line[len("INTERIOR "):])
+
+def iter_params(args):
+    for engine in args.engines:
+        if engine == 'BAKE':
+            for resolution in args.bake_resolutions:
+                for samples in args.bake_samples:
+                    yield {"engine": 'BAKE', "resolution": str(resolution), "samples": samples}
+        elif engine == 'VOXEL':
+            for resolution in args.voxel_resolutions:
+                yield {"engine": 'VOXEL', "voxel_resolution": resolution}
+        elif engine == 'WINDING':
+            for accuracy in args.winding_accuracies:
+                yield {"engine": 'WINDING', "winding_accuracy": accuracy}
+
+
+# Main
+#################################################
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Interior detection benchmark")
+    parser.add_argument("--output", default="interior_benchmark.json")
+    parser.add_argument("--scenes", nargs="+", default=sorted(SCENES), choices=sorted(SCENES))
+    parser.add_argument("--steps", nargs="+", type=int, default=[8], help="grid subdivisions per box side, multiples of 8 keep the ground truth exact")
+    parser.add_argument("--engines", nargs="+", default=['BAKE', 'VOXEL', 'WINDING'], choices=['BAKE', 'VOXEL', 'WINDING'])
+    parser.add_argument("--bake-resolutions", nargs="+", type=int, default=[512, 1024], choices=[512, 1024, 2048, 4096])
+    parser.add_argument("--bake-samples", nargs="+", type=int, default=[16, 64])
+    parser.add_argument("--voxel-resolutions", nargs="+", type=int, default=[64, 128])
+    parser.add_argument("--winding-accuracies", nargs="+", type=float, default=[1.5, 2.0])
+    parser.add_argument("--memory-budgets", nargs="+", type=int, default=[0], help="memory budgets in MB, 0 for no limit")
+    parser.add_argument("--case", help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    if args.case is not None:
+        load_addon()
+        case = json.loads(args.case)
+        print("INTERIOR " + json.dumps(run_case(case["scene"], case["steps"], case["params"], case["memory_budget"])))
+        return
+
+    results = []
+    for scene_name in args.scenes:
+        for steps in args.steps:
+            for params in iter_params(args):
+                for memory_budget in args.memory_budgets:
+                    result = run_child(scene_name, steps, params, memory_budget)
+                    results.append(result)
+                    print("{scene:24} {faces:7} {params} {memory_budget_mb:5}MB {wall_time:8.3f}s peak {peak_python_mb:8.1f}MB rss {max_rss_mb}MB precision {precision:.3f} recall {recall:.3f}".format(**result))
+
+    report = {
+        "blender": bpy.app.version_string,
+        "revision": addon_revision(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print("Results written to", os.path.abspath(args.output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# Intersection detection benchmark under memory budgets.
+#
+# Runs the face intersection search of Select Overlapping with and without a
+# memory budget, reports wall time and peak memory and checks that streamed
+# runs select the same faces as the run without a limit. Every run starts a
+# fresh Blender process, so the peak memory of one run isn't hidden by the
+# high-water mark of the runs before it.
+#
+# Usage:
+#   blender -b --factory-startup -P benchmarks/overlap_benchmark.py -- --output overlap.json
+#   blender -b --factory-startup -P benchmarks/overlap_benchmark.py -- --steps 64 128 --memory-budgets 0 16 64
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+import bpy
+
+# scenes, add-on loading and measurements are shared with the interior benchmark
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import interior_benchmark as harness
+
+SCRIPT = Path(__file__).resolve()
+
+
+def run_case(scene_name, steps, memory_budget):
+    harness.set_memory_budget(memory_budget)
+    harness.reset_scene()
+    mesh_data = harness.SCENES[scene_name](steps)
+    obj = harness.create_object(scene_name, mesh_data)
+    harness.enter_edit_mode()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    bpy.ops.mesh.select_overlapping(select_type='FACE', overlapping=False, intersections=True)
+    wall_time = time.perf_counter() - start
+    (_, peak_python) = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    selection = harness.read_face_selection(obj)
+    return {
+        "scene": scene_name,
+        "faces": len(mesh_data[1]),
+        "memory_budget_mb": memory_budget,
+        "wall_time": wall_time,
+        "peak_python_mb": peak_python / (1024 * 1024),
+        # high-water mark of this process, scene setup included
+        "max_rss_mb": harness.max_rss_mb(),
+        "selected": [index for (index, selected) in enumerate(selection) if selected],
+    }
+
+def run_child(scene_name, steps, memory_budget):
+    # one case in a fresh process, its result is printed as the last line
+    command = [bpy.app.binary_path, "-b", "--factory-startup", "-P", str(SCRIPT), "--",
+        "--case", scene_name, str(steps), str(memory_budget)]
+    output = subprocess.check_output(command, stderr=subprocess.DEVNULL).decode()
+    line = [line for line in output.splitlines() if line.startswith("OVERLAP ")][-1]
+    return json.loads(line[len("OVERLAP "):])
+
+
+# Main
+#################################################
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Intersection detection benchmark")
+    parser.add_argument("--output", default="overlap_benchmark.json")
+    parser.add_argument("--scenes", nargs="+", default=["boolean_stack"], choices=sorted(harness.SCENES))
+    parser.add_argument("--steps", nargs="+", type=int, default=[32], help="grid subdivisions per box side")
+    parser.add_argument("--memory-budgets", nargs="+", type=int, default=[0, 16, 64], help="memory budgets in MB, 0 for no limit")
+    parser.add_argument("--case", nargs=3, metavar=("SCENE", "STEPS", "BUDGET"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    if args.case is not None:
+        harness.load_addon()
+        (scene_name, steps, memory_budget) = args.case
+        print("OVERLAP " + json.dumps(run_case(scene_name, int(steps), int(memory_budget))))
+        return
+
+    results = []
+    for scene_name in args.scenes:
+        for steps in args.steps:
+            reference = None
+            # no limit first, then the largest budget, the first run is the reference
+            for memory_budget in sorted(args.memory_budgets, key=lambda budget: (budget != 0, -budget)):
+                result = run_child(scene_name, steps, memory_budget)
+                selection = result.pop("selected")
+                if reference is None:
+                    reference = selection
+                result["selected"] = len(selection)
+                result["matches_reference"] = selection == reference
+                results.append(result)
+                print("{scene:24} {faces:7} {memory_budget_mb:5}MB {wall_time:8.3f}s peak {peak_python_mb:8.1f}MB rss {max_rss_mb}MB selected {selected} matches {matches_reference}".format(**result))
+
+    report = {
+        "blender": bpy.app.version_string,
+        "revision": harness.addon_revision(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print("Results written to", os.path.abspath(args.output))
+
+if __name__ == "__main__":
+    main()
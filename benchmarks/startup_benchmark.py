@@ -0,0 +1,117 @@
+# Add-on startup benchmark.
+#
+# Starts fresh Blender processes which import and register the add-on and
+# reports the time spent, for eager loading, lazy loading without the cached
+# register order (first start) and lazy loading with it.
+#
+# Usage:
+#   blender -b --factory-startup -P benchmarks/startup_benchmark.py -- --output startup.json
+#   blender -b --factory-startup -P benchmarks/startup_benchmark.py -- --runs 20 --modes EAGER LAZY_WARM
+
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+from pathlib import Path
+
+import bpy
+
+ADDON_DIR = Path(__file__).resolve().parent.parent
+MANIFEST = ADDON_DIR / ".auto_load_manifest.json"
+
+# executed in every child process, prints the timings as the last line
+CHILD_SCRIPT = """
+import sys, time, json, importlib
+sys.path.insert(0, {parent!r})
+start = time.perf_counter()
+addon = importlib.import_module({name!r})
+imported = time.perf_counter()
+addon.register()
+registered = time.perf_counter()
+print("STARTUP " + json.dumps({{
+    "import_time": imported - start,
+    "register_time": registered - imported,
+    "total_time": registered - start,
+    "numpy_loaded": type(sys.modules.get("numpy")).__name__ == "module",
+}}))
+"""
+
+MODES = {
+    'EAGER': {"MESH_UTILS_LAZY": "0"},
+    'LAZY_COLD': {"MESH_UTILS_LAZY": "1"},
+    'LAZY_WARM': {"MESH_UTILS_LAZY": "1"},
+}
+
+
+# Runs
+#################################################
+
+def remove_manifest():
+    if MANIFEST.exists():
+        MANIFEST.unlink()
+
+def run_child(mode):
+    if mode == 'LAZY_COLD':
+        remove_manifest()
+
+    env = dict(os.environ)
+    env.update(MODES[mode])
+    script = CHILD_SCRIPT.format(parent=str(ADDON_DIR.parent), name=ADDON_DIR.name)
+    command = [bpy.app.binary_path, "-b", "--factory-startup", "--python-expr", script]
+
+    output = subprocess.check_output(command, env=env, stderr=subprocess.DEVNULL).decode()
+    line = [line for line in output.splitlines() if line.startswith("STARTUP ")][-1]
+    return json.loads(line[len("STARTUP "):])
+
+def summarize(mode, runs):
+    result = {"mode": mode, "runs": runs}
+    for key in ("import_time", "register_time", "total_time"):
+        values = [run[key] for run in runs]
+        result[key] = {
+            "median": statistics.median(values),
+            "mean": statistics.mean(values),
+            "min": min(values),
+            "max": max(values),
+        }
+    return result
+
+
+# Main
+#################################################
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description="Add-on startup benchmark")
+    parser.add_argument("--output", default="startup_benchmark.json")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--modes", nargs="+", default=['EAGER', 'LAZY_COLD', 'LAZY_WARM'], choices=list(MODES))
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+
+    results = []
+    for mode in args.modes:
+        if mode == 'LAZY_WARM':
+            # one start to write the manifest
+            run_child('LAZY_COLD')
+        runs = [run_child(mode) for _ in range(args.runs)]
+        result = summarize(mode, runs)
+        results.append(result)
+        print("{:10} median {:.4f}s (import {:.4f}s, register {:.4f}s)".format(mode,
+            result["total_time"]["median"], result["import_time"]["median"], result["register_time"]["median"]))
+
+    report = {
+        "blender": bpy.app.version_string,
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, "w") as output:
+        json.dump(report, output, indent=2)
+    print("Results written to", os.path.abspath(args.output))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import numpy as np
+
+# Bulk mesh data access through foreach_get/foreach_set.
+# Mesh data is only in sync with the edit mesh while in object mode,
+# so callers are expected to switch modes before reading or writing.
+
+def foreach_get(collection, attr, dtype, width=1):
+    values = np.empty(len(collection) * width, dtype=dtype)
+    collection.foreach_get(attr, values)
+    if width > 1:
+        return values.reshape(-1, width)
+    return values
+
+def get_vertex_coords(mesh):
+    return foreach_get(mesh.vertices, "co", np.float32, 3)
+
+def get_loop_vertices(mesh):
+    return foreach_get(mesh.loops, "vertex_index", np.int32)
+
+def get_loop_edges(mesh):
+    return foreach_get(mesh.loops, "edge_index", np.int32)
+
+def get_polygon_loops(mesh):
+    loop_start = foreach_get(mesh.polygons, "loop_start", np.int32)
+    loop_total = foreach_get(mesh.polygons, "loop_total", np.int32)
+    return (loop_start, loop_total)
+
+def get_loop_uvs(mesh, uv_layer_name):
+    uv_layer = mesh.uv_layers[uv_layer_name]
+    return foreach_get(uv_layer.data, "uv", np.float32, 2)
+
+def get_flags(collection, attr):
+    return foreach_get(collection, attr, bool)
+
+def set_face_selection(mesh, face_select):
+    # flush face selection down to edges and vertices
+    (loop_start, loop_total) = get_polygon_loops(mesh)
+    loop_select = np.repeat(face_select, loop_total)
+
+    vert_select = np.zeros(len(mesh.vertices), dtype=bool)
+    vert_select[get_loop_vertices(mesh)[loop_select]] = True
+    edge_select = np.zeros(len(mesh.edges), dtype=bool)
+    edge_select[get_loop_edges(mesh)[loop_select]] = True
+
+    mesh.vertices.foreach_set("select", vert_select)
+    mesh.edges.foreach_set("select", edge_select)
+    mesh.polygons.foreach_set("select", np.asarray(face_select, dtype=bool))
+
+def get_loop_triangles(mesh):
+    # triangulated faces, polygon_index maps every triangle back to its face
+    mesh.calc_loop_triangles()
+    tris = foreach_get(mesh.loop_triangles, "vertices", np.int32, 3)
+    tri_faces = foreach_get(mesh.loop_triangles, "polygon_index", np.int32)
+    return (tris, tri_faces)
+
+def get_loop_triangle_loops(mesh):
+    # triangles as loop indices, for per corner data like UVs
+    mesh.calc_loop_triangles()
+    tri_loops = foreach_get(mesh.loop_triangles, "loops", np.int32, 3)
+    tri_faces = foreach_get(mesh.loop_triangles, "polygon_index", np.int32)
+    return (tri_loops, tri_faces)
+
+def get_world_coords(obj, origin=None):
+    # origin - world position the coords are relative to, objects moved together keep their coords
+    coords = get_vertex_coords(obj.data).astype(np.float64)
+    matrix = np.array(obj.matrix_world, dtype=np.float64)
+    translation = matrix[:3, 3] if origin is None else matrix[:3, 3] - origin
+    return coords @ matrix[:3, :3].T + translation
+
+def get_edge_vertices(mesh):
+    return foreach_get(mesh.edges, "vertices", np.int32, 2)
+
+def extend_edge_selection(mesh, edge_mask):
+    # add edges to the selection and flush to vertices and fully selected faces
+    edge_select = get_flags(mesh.edges, "select") | edge_mask
+    vert_select = get_flags(mesh.vertices, "select")
+    vert_select[get_edge_vertices(mesh)[edge_mask].ravel()] = True
+    face_select = get_flags(mesh.polygons, "select")
+    if len(face_select):
+        (loop_start, loop_total) = get_polygon_loops(mesh)
+        face_select |= np.logical_and.reduceat(edge_select[get_loop_edges(mesh)], loop_start)
+
+    mesh.vertices.foreach_set("select", vert_select)
+    mesh.edges.foreach_set("select", edge_select)
+    mesh.polygons.foreach_set("select", face_select)
+
+def extend_face_selection(mesh, face_mask):
+    # add faces to the selection and flush to their edges and vertices
+    (loop_start, loop_total) = get_polygon_loops(mesh)
+    loop_mask = np.repeat(face_mask, loop_total)
+    vert_select = get_flags(mesh.vertices, "select")
+    vert_select[get_loop_vertices(mesh)[loop_mask]] = True
+    edge_select = get_flags(mesh.edges, "select")
+    edge_select[get_loop_edges(mesh)[loop_mask]] = True
+
+    mesh.vertices.foreach_set("select", vert_select)
+    mesh.edges.foreach_set("select", edge_select)
+    mesh.polygons.foreach_set("select", get_flags(mesh.polygons, "select") | face_mask)
+
+def create_mesh_from_arrays(mesh, coords, loop_vertices, loop_total, edges=None):
+    # fill an empty mesh from flat arrays, face edges missing from edges are derived from the faces
+    loop_total = np.asarray(loop_total, dtype=np.int32)
+    loop_start = np.cumsum(loop_total, dtype=np.int32) - loop_total
+
+    mesh.vertices.add(len(coords))
+    if edges is not None:
+        mesh.edges.add(len(edges))
+        mesh.edges.foreach_set("vertices", np.asarray(edges, dtype=np.int32).ravel())
+    mesh.loops.add(len(loop_vertices))
+    mesh.polygons.add(len(loop_total))
+    mesh.vertices.foreach_set("co", np.asarray(coords, dtype=np.float32).ravel())
+    mesh.loops.foreach_set("vertex_index", np.asarray(loop_vertices, dtype=np.int32))
+    mesh.polygons.foreach_set("loop_start", loop_start)
+    # loop_total is derived from loop_start and read only since Blender 4.0
+    if len(mesh.polygons) and not mesh.polygons[0].bl_rna.properties["loop_total"].is_readonly:
+        mesh.polygons.foreach_set("loop_total", loop_total)
+
+    mesh.update(calc_edges=True)
+    return mesh
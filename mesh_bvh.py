@@ -0,0 +1,96 @@
+from collections import namedtuple
+import numpy as np
+
+# Triangle BVH stored in flat NumPy arrays.
+# Triangles are sorted along a Morton curve and every node range is split in
+# half, so the whole hierarchy is built level by level without Python recursion.
+#
+# order      - triangle indices in BVH order, nodes reference ranges of it
+# start      - first position in order for every node
+# count      - number of triangles for every node
+# left/right - child node indices, -1 for leaves
+# bbox_min/bbox_max - node bounds
+
+BVH = namedtuple("BVH", ["order", "start", "count", "left", "right", "bbox_min", "bbox_max"])
+
+def spread_bits(values):
+    # insert two zero bits between the lower 21 bits of every value
+    x = values.astype(np.uint64) & np.uint64(0x1fffff)
+    x = (x | (x << np.uint64(32))) & np.uint64(0x1f00000000ffff)
+    x = (x | (x << np.uint64(16))) & np.uint64(0x1f0000ff0000ff)
+    x = (x | (x << np.uint64(8))) & np.uint64(0x100f00f00f00f00f)
+    x = (x | (x << np.uint64(4))) & np.uint64(0x10c30c30c30c30c3)
+    x = (x | (x << np.uint64(2))) & np.uint64(0x1249249249249249)
+    return x
+
+def morton_codes(points):
+    co_min = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - co_min, 1e-12)
+    cells = ((points - co_min) / extent * ((1 << 21) - 1)).astype(np.uint64)
+    return spread_bits(cells[:, 0]) | (spread_bits(cells[:, 1]) << np.uint64(1)) | (spread_bits(cells[:, 2]) << np.uint64(2))
+
+def build_bvh(tri_coords, leaf_size=8):
+    tri_count = len(tri_coords)
+    order = np.argsort(morton_codes(tri_coords.mean(axis=1)), kind='stable')
+
+    # split node ranges level by level
+    levels = []
+    level_start = np.zeros(1, dtype=np.int64)
+    level_count = np.full(1, tri_count, dtype=np.int64)
+    node_offset = 0
+    while len(level_start):
+        split = level_count > leaf_size
+        child_count = 2 * np.count_nonzero(split)
+        left = np.full(len(level_start), -1, dtype=np.int64)
+        right = np.full(len(level_start), -1, dtype=np.int64)
+        first_child = node_offset + len(level_start)
+        left[split] = first_child + 2 * np.arange(child_count // 2)
+        right[split] = left[split] + 1
+        levels.append((level_start, level_count, left, right))
+        node_offset = first_child
+
+        half = level_count[split] // 2
+        next_start = np.empty(child_count, dtype=np.int64)
+        next_count = np.empty(child_count, dtype=np.int64)
+        next_start[0::2] = level_start[split]
+        next_count[0::2] = half
+        next_start[1::2] = level_start[split] + half
+        next_count[1::2] = level_count[split] - half
+        (level_start, level_count) = (next_start, next_count)
+
+    start = np.concatenate([level[0] for level in levels])
+    count = np.concatenate([level[1] for level in levels])
+    left = np.concatenate([level[2] for level in levels])
+    right = np.concatenate([level[3] for level in levels])
+
+    # leaf bounds from triangles, then bottom-up through the levels
+    ordered = tri_coords[order]
+    tri_min = ordered.min(axis=1)
+    tri_max = ordered.max(axis=1)
+    bbox_min = np.empty((len(start), 3), dtype=tri_coords.dtype)
+    bbox_max = np.empty((len(start), 3), dtype=tri_coords.dtype)
+    # leaves partition the triangle order, reduceat needs them sorted by start
+    leaves = np.flatnonzero(left < 0)
+    leaves = leaves[np.argsort(start[leaves])]
+    if tri_count:
+        bbox_min[leaves] = np.minimum.reduceat(tri_min, start[leaves], axis=0)
+        bbox_max[leaves] = np.maximum.reduceat(tri_max, start[leaves], axis=0)
+
+    level_end = len(start)
+    for level in reversed(levels):
+        level_begin = level_end - len(level[0])
+        nodes = np.arange(level_begin, level_end)
+        inner = nodes[left[nodes] >= 0]
+        bbox_min[inner] = np.minimum(bbox_min[left[inner]], bbox_min[right[inner]])
+        bbox_max[inner] = np.maximum(bbox_max[left[inner]], bbox_max[right[inner]])
+        level_end = level_begin
+
+    return BVH(order, start, count, left, right, bbox_min, bbox_max)
+
+def expand_leaves(bvh, pairs, nodes):
+    # (pair, triangle) candidates for every pair ending in a leaf node
+    counts = bvh.count[nodes]
+    pair_index = np.repeat(pairs, counts)
+    rank = np.arange(len(pair_index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    tri_index = bvh.order[np.repeat(bvh.start[nodes], counts) + rank]
+    return (pair_index, tri_index)
@@ -0,0 +1,82 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+
+# On-disk cache of spatial indices and per-face results.
+# Entries are keyed by a content hash of the geometry and the parameters and
+# stored as one .npy file per array, so warm runs memory-map them instead of
+# rebuilding. The least recently used entries are evicted above the size limit.
+#
+# cache - (directory, max_size in bytes) or None when caching is disabled
+
+def content_hash(kind, params, arrays):
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(json.dumps([kind, params], sort_keys=True).encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(str((array.dtype.str, array.shape)).encode())
+        digest.update(array.data)
+    return kind + "-" + digest.hexdigest()
+
+def load(directory, key):
+    path = os.path.join(directory, key)
+    try:
+        names = sorted(name for name in os.listdir(path) if name.endswith(".npy"))
+        arrays = {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r') for name in names}
+    except (OSError, ValueError):
+        return None
+    # mark as recently used
+    os.utime(path)
+    return arrays
+
+def save(directory, key, arrays):
+    # write into a temporary directory first, readers never see partial entries
+    path = os.path.join(directory, key)
+    temp_path = "%s.%d.tmp" % (path, os.getpid())
+    os.makedirs(temp_path, exist_ok=True)
+    for (name, array) in arrays.items():
+        np.save(os.path.join(temp_path, name + ".npy"), np.asarray(array))
+    try:
+        os.replace(temp_path, path)
+    except OSError:
+        # written by someone else in the meantime
+        shutil.rmtree(temp_path, ignore_errors=True)
+
+def entry_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+def evict(directory, max_size):
+    # drop least recently used entries until the cache fits
+    entries = []
+    for entry in os.scandir(directory):
+        if entry.is_dir() and not entry.name.endswith(".tmp"):
+            entries.append((entry.stat().st_mtime, entry_size(entry.path), entry.path))
+    total = sum(size for (_, size, _) in entries)
+    for (_, size, path) in sorted(entries):
+        if total <= max_size:
+            break
+        # mapped files can't be removed on every platform, they are retried next time
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+
+def cached(cache, kind, params, arrays, compute):
+    # compute() returns a dict of arrays, results are loaded memory mapped when cached
+    if cache is None:
+        return compute()
+
+    (directory, max_size) = cache
+    key = content_hash(kind, params, arrays)
+    result = load(directory, key)
+    if result is not None:
+        return result
+
+    result = compute()
+    try:
+        os.makedirs(directory, exist_ok=True)
+        save(directory, key, result)
+        evict(directory, max_size)
+    except OSError:
+        pass
+    return result
@@ -0,0 +1,117 @@
+from collections import namedtuple
+import numpy as np
+from . import mesh_bvh
+
+# Streaming over spatially coherent chunks of elements.
+# Elements are sorted along the same Morton curve the BVH uses and cut into
+# chunks sized by a memory budget. Engines that need the neighbourhood of a
+# chunk also get its halo, every element whose bounds touch the bounds of one
+# of the chunk elements. Element bounds are binned into a sparse grid of cells
+# about one average element wide, so a halo only grows with the neighbours of
+# the chunk elements, not with the bounds of the whole chunk.
+#
+# cell_size/origin/shape - grid layout, cells are keyed by their flat index
+# keys/elements          - (cell, element) entries sorted by cell
+# large                  - elements spanning too many cells, tested directly
+
+HaloGrid = namedtuple("HaloGrid", ["bbox_min", "bbox_max", "margin", "cell_size", "origin", "shape", "keys", "elements", "large"])
+
+# (element, candidate) pairs tested at once
+HALO_BATCH = 1 << 20
+# elements spanning more cells than this along an axis are kept out of the grid
+MAX_CELL_SPAN = 4
+# cells per axis, keeps the cell keys inside int64
+MAX_CELLS = 1 << 20
+
+def chunk_size(budget, bytes_per_element, minimum=1024):
+    # elements per chunk, None without a budget
+    if not budget:
+        return None
+    return max(int(budget // bytes_per_element), minimum)
+
+def iter_chunks(centers, size):
+    # element indices per chunk, everything at once without a size
+    if size is None or len(centers) <= size:
+        yield np.arange(len(centers))
+        return
+    order = np.argsort(mesh_bvh.morton_codes(centers), kind='stable')
+    for start in range(0, len(order), size):
+        yield np.sort(order[start:start + size])
+
+def grid_cells(grid, bbox_min, bbox_max):
+    # cell ranges covered by the bounds
+    cell_min = np.floor((bbox_min - grid.origin) / grid.cell_size).astype(np.int64)
+    cell_max = np.floor((bbox_max - grid.origin) / grid.cell_size).astype(np.int64)
+    return (np.clip(cell_min, 0, grid.shape - 1), np.clip(cell_max, 0, grid.shape - 1))
+
+def box_cells(grid, cell_min, cell_max):
+    # (box, cell key) for every cell the boxes cover
+    spans = cell_max - cell_min + 1
+    counts = spans.prod(axis=1)
+    boxes = np.repeat(np.arange(len(cell_min)), counts)
+    rank = np.arange(len(boxes)) - np.repeat(np.cumsum(counts) - counts, counts)
+    x = cell_min[boxes, 0] + rank % spans[boxes, 0]
+    y = cell_min[boxes, 1] + (rank // spans[boxes, 0]) % spans[boxes, 1]
+    z = cell_min[boxes, 2] + rank // (spans[boxes, 0] * spans[boxes, 1])
+    return (boxes, (x * grid.shape[1] + y) * grid.shape[2] + z)
+
+def build_halo_grid(bbox_min, bbox_max, margin):
+    # elements touch when their bounds are closer than margin
+    co_min = bbox_min.min(axis=0) - margin
+    co_max = bbox_max.max(axis=0) + margin
+    mean_extent = float((bbox_max - bbox_min).max(axis=1).mean()) + margin
+    cell_size = max(mean_extent, float((co_max - co_min).max()) / MAX_CELLS, 1e-12)
+    shape = np.floor((co_max - co_min) / cell_size).astype(np.int64) + 1
+    grid = HaloGrid(bbox_min, bbox_max, margin, cell_size, co_min, shape, None, None, None)
+
+    (cell_min, cell_max) = grid_cells(grid, bbox_min, bbox_max)
+    small = np.all(cell_max - cell_min < MAX_CELL_SPAN, axis=1)
+    index = np.flatnonzero(small)
+    (boxes, keys) = box_cells(grid, cell_min[index], cell_max[index])
+    order = np.argsort(keys, kind='stable')
+    return grid._replace(keys=keys[order], elements=index[boxes[order]], large=np.flatnonzero(~small))
+
+def touching(grid, first, second):
+    # bounds of first[i] and second[i] closer than the margin
+    return np.all((grid.bbox_min[first] <= grid.bbox_max[second] + grid.margin) & (grid.bbox_max[first] >= grid.bbox_min[second] - grid.margin), axis=1)
+
+def touching_any(grid, elements, candidates):
+    # candidates touching at least one of the elements, pairs tested in batches
+    found = []
+    batch = max(HALO_BATCH // max(len(candidates), 1), 1)
+    for start in range(0, len(elements), batch):
+        first = np.repeat(elements[start:start + batch], len(candidates))
+        second = np.tile(candidates, len(elements[start:start + batch]))
+        found.append(second[touching(grid, first, second)])
+    return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+def chunk_halo(grid, chunk):
+    # elements outside the chunk touching one of the chunk elements
+    # grid from build_halo_grid, chunk sorted element indices
+    large_chunk = np.isin(chunk, grid.large, assume_unique=True)
+    (small, large) = (chunk[~large_chunk], chunk[large_chunk])
+    halo = []
+
+    # grid cells around the small chunk elements
+    (cell_min, cell_max) = grid_cells(grid, grid.bbox_min[small] - grid.margin, grid.bbox_max[small] + grid.margin)
+    (boxes, keys) = box_cells(grid, cell_min, cell_max)
+    first = np.searchsorted(grid.keys, keys, side='left')
+    counts = np.searchsorted(grid.keys, keys, side='right') - first
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(keys):
+        stop = max(int(np.searchsorted(ends, ends[start] - counts[start] + HALO_BATCH, side='right')), start + 1)
+        chunk_counts = counts[start:stop]
+        pairs = np.repeat(np.arange(start, stop), chunk_counts)
+        rank = np.arange(len(pairs)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        candidates = grid.elements[first[pairs] + rank]
+        elements = small[boxes[pairs]]
+        halo.append(np.unique(candidates[touching(grid, elements, candidates)]))
+        start = stop
+
+    # elements too large for the grid, against the chunk and against everything
+    halo.append(touching_any(grid, small, grid.large))
+    halo.append(touching_any(grid, large, np.arange(len(grid.bbox_min))))
+
+    halo = np.unique(np.concatenate(halo))
+    return halo[~np.isin(halo, chunk, assume_unique=True)]
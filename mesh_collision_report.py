@@ -0,0 +1,187 @@
+bl_info = {
+    "name": "Collision Report",
+    "author": "rpopovici",
+    "version": (0, 1),
+    "blender": (2, 80, 0),
+    "location": "(Object Mode) Select > Collision Report",
+    "description": "Find interpenetrating objects in the scene",
+    "warning": "",
+    "wiki_url": "https://github.com/rpopovici/mesh-utils",
+    "category": "Mesh",
+    }
+
+import json
+import bpy
+from mathutils.bvhtree import BVHTree
+from . import auto_load
+
+# loaded on first use
+np = auto_load.lazy_import("numpy")
+mesh_arrays = auto_load.lazy_import(".mesh_arrays", __package__)
+
+REPORT_TEXT = "Collision Report"
+
+# upper bound for broadphase candidate pairs tested at once
+MAX_CANDIDATES = 1 << 22
+
+def get_world_bounds(objects, depsgraph):
+    # world space AABBs of the evaluated bounding boxes
+    corners = np.array([obj.evaluated_get(depsgraph).bound_box for obj in objects], dtype=np.float64).reshape(-1, 8, 3)
+    matrices = np.array([obj.matrix_world for obj in objects], dtype=np.float64).reshape(-1, 4, 4)
+    world = np.einsum('nij,nkj->nki', matrices[:, :3, :3], corners) + matrices[:, None, :3, 3]
+    return (world.min(axis=1), world.max(axis=1))
+
+def sweep_and_prune(bbox_min, bbox_max):
+    # pairs of overlapping boxes, sorted sweep along the axis with the largest spread
+    axis = int(np.argmax(bbox_min.max(axis=0) - bbox_min.min(axis=0))) if len(bbox_min) else 0
+    order = np.argsort(bbox_min[:, axis], kind='stable')
+    sorted_min = bbox_min[order, axis]
+
+    # every box is tested against the boxes starting inside its interval
+    end = np.searchsorted(sorted_min, bbox_max[order, axis], side='right')
+    counts = np.maximum(end - np.arange(len(order)) - 1, 0)
+
+    # candidates in chunks of bounded size, like voxelization
+    pairs = []
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(order):
+        offset = ends[start] - counts[start]
+        stop = max(int(np.searchsorted(ends, offset + MAX_CANDIDATES, side='right')), start + 1)
+        chunk_counts = counts[start:stop]
+        first = np.repeat(np.arange(start, stop), chunk_counts)
+        rank = np.arange(len(first)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        (a, b) = (order[first], order[first + 1 + rank])
+
+        # remaining axes
+        overlap = np.all((bbox_min[a] <= bbox_max[b]) & (bbox_min[b] <= bbox_max[a]), axis=1)
+        pairs.append(np.stack((a[overlap], b[overlap]), axis=1))
+        start = stop
+
+    if not pairs:
+        return np.zeros((0, 2), dtype=np.int64)
+    return np.sort(np.concatenate(pairs), axis=1)
+
+def build_world_bvhtree(obj, depsgraph):
+    obj_eval = obj.evaluated_get(depsgraph)
+    mesh = obj_eval.to_mesh()
+    try:
+        matrix = np.array(obj.matrix_world, dtype=np.float64)
+        coords = mesh_arrays.get_vertex_coords(mesh).astype(np.float64) @ matrix[:3, :3].T + matrix[:3, 3]
+        (tris, tri_faces) = mesh_arrays.get_loop_triangles(mesh)
+        return BVHTree.FromPolygons(coords.tolist(), tris.tolist(), epsilon=0.0)
+    finally:
+        obj_eval.to_mesh_clear()
+
+def find_collisions(objects, depsgraph, margin):
+    # (first object, second object, intersecting triangle pairs)
+    if len(objects) < 2:
+        return []
+    (bbox_min, bbox_max) = get_world_bounds(objects, depsgraph)
+    pairs = sweep_and_prune(bbox_min - margin, bbox_max + margin)
+
+    # narrow phase, every tree is built once and freed after its last pair
+    order = np.lexsort((pairs[:, 1], pairs[:, 0]))
+    pairs = pairs[order]
+    last_use = np.full(len(objects), -1)
+    np.maximum.at(last_use, pairs[:, 0], np.arange(len(pairs)))
+    np.maximum.at(last_use, pairs[:, 1], np.arange(len(pairs)))
+
+    trees = {}
+    collisions = []
+    for (index, (a, b)) in enumerate(pairs.tolist()):
+        for i in (a, b):
+            if i not in trees:
+                trees[i] = build_world_bvhtree(objects[i], depsgraph)
+        overlap = trees[a].overlap(trees[b])
+        if overlap:
+            collisions.append((objects[a], objects[b], len(overlap)))
+        for i in (a, b):
+            if last_use[i] == index:
+                del trees[i]
+    return collisions
+
+def write_report_text(collisions):
+    text = bpy.data.texts.get(REPORT_TEXT) or bpy.data.texts.new(REPORT_TEXT)
+    text.clear()
+    for (first, second, count) in collisions:
+        text.write("%s <-> %s: %d intersecting triangle pairs\n" % (first.name, second.name, count))
+    return text
+
+def write_report_json(filepath, collisions, object_count):
+    report = {
+        "objects": object_count,
+        "collisions": [{"first": first.name, "second": second.name, "triangle_pairs": count}
+            for (first, second, count) in collisions],
+    }
+    with open(bpy.path.abspath(filepath), "w") as output:
+        json.dump(report, output, indent=2)
+
+class CollisionReport(bpy.types.Operator):
+    """Find interpenetrating objects"""
+    bl_idname = 'object.collision_report'
+    bl_label = 'Collision Report'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    only_selected: bpy.props.BoolProperty(
+        name = "Only Selected",
+        default = False,
+        description = "Check selected objects only, otherwise all visible mesh objects",
+        )
+
+    margin: bpy.props.FloatProperty(
+        name = "Margin",
+        subtype = 'DISTANCE',
+        default = 0.0,
+        min = 0.0,
+        max = 100.0,
+        description = "Grow bounding boxes by this distance in the broadphase",
+        unit = 'LENGTH',
+        )
+
+    filepath: bpy.props.StringProperty(
+        name = "JSON Report",
+        subtype = 'FILE_PATH',
+        default = "",
+        description = "Optional file the collision pairs are written to",
+        )
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def execute(self, context):
+        if self.only_selected:
+            objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        else:
+            objects = [obj for obj in context.visible_objects if obj.type == 'MESH']
+
+        depsgraph = context.evaluated_depsgraph_get()
+        collisions = find_collisions(objects, depsgraph, self.margin)
+
+        # select colliding objects
+        colliding = {obj for (first, second, count) in collisions for obj in (first, second)}
+        for obj in objects:
+            obj.select_set(obj in colliding)
+
+        write_report_text(collisions)
+        if self.filepath:
+            write_report_json(self.filepath, collisions, len(objects))
+
+        self.report({'INFO'}, "%d colliding pairs between %d objects, see the '%s' text" % (len(collisions), len(colliding), REPORT_TEXT))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return self.execute(context)
+
+def menu_func(self, context):
+    self.layout.separator()
+    self.layout.operator(CollisionReport.bl_idname, text="Collision Report")
+
+def register():
+    # bpy.utils.register_class(CollisionReport)
+    bpy.types.VIEW3D_MT_select_object.append(menu_func)
+
+def unregister():
+    # bpy.utils.unregister_class(CollisionReport)
+    bpy.types.VIEW3D_MT_select_object.remove(menu_func)
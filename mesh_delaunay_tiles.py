@@ -0,0 +1,172 @@
+import numpy as np
+
+# Tiled Delaunay triangulation of large 2D point sets.
+# - points are split at the median into tiles of at most tile_points points,
+#   so clustered sets get small tiles where they are dense
+# - every tile is triangulated together with up to tile_points halo points,
+#   all points closer to the tile than the halo width
+# - a tile triangle whose circumcircle stays inside the tile grown by the halo
+#   width is empty of all other points, so it belongs to the global
+#   triangulation. It is kept by the one tile containing its circumcenter
+# - the leftover gap, the points around the certified region or not covered at
+#   all, is triangulated the same way, tile by tile. Gap triangles inside the
+#   certified region are dropped, the rest fill the holes between the tiles
+# Every triangulator call gets at most 2 * tile_points points. Only a gap which
+# stops shrinking is triangulated in one call, e.g. the rim of a hole wider
+# than the halo of any tile around it, whose triangles span the whole hole.
+
+# halo width relative to the tile size
+HALO = 0.25
+# the gap is tiled again while it shrinks below this share of the points
+GAP_SHRINK = 0.75
+
+def split_tiles(points, tile_points):
+    # median splits along the longer side until every tile holds at most tile_points points
+    # returns the point indices and the bounds of every tile, tiles partition the plane
+    tiles = []
+    stack = [(np.arange(len(points)), np.full(2, -np.inf), np.full(2, np.inf))]
+    while stack:
+        (index, tile_min, tile_max) = stack.pop()
+        if len(index) <= tile_points:
+            tiles.append((index, tile_min, tile_max))
+            continue
+        co = points[index]
+        axis = int(np.argmax(co.max(axis=0) - co.min(axis=0)))
+        half = len(index) // 2
+        order = np.argpartition(co[:, axis], half)
+        split = co[order[half], axis]
+        (left_max, right_min) = (tile_max.copy(), tile_min.copy())
+        left_max[axis] = right_min[axis] = split
+        stack.append((index[order[:half]], tile_min, left_max))
+        stack.append((index[order[half:]], right_min, tile_max))
+    return tiles
+
+def rect_distance(points, rect_min, rect_max):
+    # Chebyshev distance to the rectangle, 0 inside
+    return np.maximum(np.maximum(rect_min - points, points - rect_max), 0.0).max(axis=1)
+
+def gather_halo(points, tiles, bounds_min, bounds_max, tile, halo_width, max_points):
+    # points of other tiles closer than the returned width to the tile, at most max_points of them
+    (index, tile_min, tile_max) = tiles[tile]
+    near_tiles = np.flatnonzero(np.all((bounds_min < tile_max + halo_width) & (bounds_max > tile_min - halo_width), axis=1))
+    near_tiles = near_tiles[near_tiles != tile]
+    if len(near_tiles) == 0:
+        return (np.zeros(0, dtype=np.int64), halo_width)
+    near = np.concatenate([tiles[other][0] for other in near_tiles])
+    distance = rect_distance(points[near], tile_min, tile_max)
+    if np.count_nonzero(distance < halo_width) > max_points:
+        # shrink the halo to the closest points
+        halo_width = np.partition(distance, max_points)[max_points]
+    return (near[distance < halo_width], halo_width)
+
+def circumcircles(points, tris):
+    # circumcenter and radius, infinite radius for degenerate triangles
+    a = points[tris[:, 0]]
+    b = points[tris[:, 1]] - a
+    c = points[tris[:, 2]] - a
+    d = 2.0 * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0])
+    valid = np.abs(d) > 1e-300
+    d = np.where(valid, d, 1.0)
+    b_sq = (b * b).sum(axis=1)
+    c_sq = (c * c).sum(axis=1)
+    offset = np.stack(((c[:, 1] * b_sq - b[:, 1] * c_sq) / d, (b[:, 0] * c_sq - c[:, 0] * b_sq) / d), axis=1)
+    radius = np.where(valid, np.linalg.norm(offset, axis=1), np.inf)
+    return (a + offset, radius)
+
+def certify_tile(points, tris, tile_min, tile_max, halo_width):
+    # triangles with their circumcircle inside the grown tile and their circumcenter in the tile
+    (center, radius) = circumcircles(points, tris)
+    inside = np.all((center - radius[:, None] > tile_min - halo_width) & (center + radius[:, None] < tile_max + halo_width), axis=1)
+    owned = np.all((center >= tile_min) & (center < tile_max), axis=1)
+    return tris[inside & owned]
+
+def boundary_vertices(tris, point_count):
+    # vertices of edges used by only one triangle
+    edges = np.sort(tris[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    keys = edges[:, 0].astype(np.int64) * point_count + edges[:, 1]
+    (unique_keys, counts) = np.unique(keys, return_counts=True)
+    boundary = unique_keys[counts == 1]
+    return np.unique(np.concatenate((boundary // point_count, boundary % point_count)))
+
+def orient(u, v):
+    return u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+
+def covered_candidates(points, certified, candidates):
+    # a gap candidate either lies inside the certified region or outside of it,
+    # the certified boundary edges are part of both triangulations.
+    # At every certified corner, the direction towards the centroid is tested
+    # against the wedges of the certified triangles around that corner. A
+    # candidate outside never points into a wedge, one inside does at least at
+    # one corner unless all its centroid directions run along certified edges.
+    covered = np.zeros(len(candidates), dtype=bool)
+    is_certified = np.zeros(len(points), dtype=bool)
+    is_certified[certified.ravel()] = True
+
+    # certified triangles around every vertex, rotated so the vertex comes first
+    rotations = np.concatenate((certified, certified[:, [1, 2, 0]], certified[:, [2, 0, 1]]))
+    rotations = rotations[np.argsort(rotations[:, 0], kind='stable')]
+    counts = np.bincount(rotations[:, 0], minlength=len(points))
+    first = np.cumsum(counts) - counts
+    centroids = points[candidates].mean(axis=1)
+
+    for column in range(3):
+        test = np.flatnonzero(is_certified[candidates[:, column]] & ~covered)
+        if len(test) == 0:
+            continue
+        corner = candidates[test, column]
+        direction = centroids[test] - points[corner]
+
+        pair_counts = counts[corner]
+        pairs = np.repeat(np.arange(len(test)), pair_counts)
+        rank = np.arange(len(pairs)) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)
+        wedges = rotations[np.repeat(first[corner], pair_counts) + rank]
+
+        v = points[wedges[:, 0]]
+        a = points[wedges[:, 1]] - v
+        b = points[wedges[:, 2]] - v
+        d = direction[pairs]
+        sign = np.sign(orient(a, b))
+        inside = (np.sign(orient(a, d)) == sign) & (np.sign(orient(d, b)) == sign) & (sign != 0)
+        covered[test] = np.bincount(pairs[inside], minlength=len(test)) > 0
+    return covered
+
+def tiled_delaunay(points, triangulate, tile_points, halo=HALO):
+    # triangulate(points) returns triangles as indices into the given points
+    points = np.asarray(points, dtype=np.float64)
+    tile_points = max(tile_points, 3)
+    if len(points) <= tile_points:
+        return triangulate(points) if len(points) >= 3 else np.zeros((0, 3), dtype=np.int64)
+
+    tiles = split_tiles(points, tile_points)
+    bounds_min = np.array([tile_min for (index, tile_min, tile_max) in tiles])
+    bounds_max = np.array([tile_max for (index, tile_min, tile_max) in tiles])
+    certified = []
+    for (tile, (index, tile_min, tile_max)) in enumerate(tiles):
+        # halo width from the size of the tile points, tiles are open towards the outside
+        co = points[index]
+        halo_width = halo * max(float((co.max(axis=0) - co.min(axis=0)).max()), 1e-12)
+        (halo_index, halo_width) = gather_halo(points, tiles, bounds_min, bounds_max, tile, halo_width, tile_points)
+        local = np.concatenate((index, halo_index))
+        if len(local) < 3:
+            continue
+        tris = local[triangulate(points[local])]
+        certified.append(certify_tile(points, tris, tile_min, tile_max, halo_width))
+
+    certified = np.concatenate(certified) if certified else np.zeros((0, 3), dtype=np.int64)
+    # co-circular points can be certified by two tiles with different diagonals
+    certified = certified[np.unique(np.sort(certified, axis=1), axis=0, return_index=True)[1]]
+
+    # gap points, around the certified region or not covered at all
+    uncovered = np.ones(len(points), dtype=bool)
+    uncovered[certified.ravel()] = False
+    gap = np.union1d(boundary_vertices(certified, len(points)), np.flatnonzero(uncovered))
+    if len(gap) < 3:
+        return certified
+
+    # the Delaunay triangulation of the gap points matches the global one outside the certified region
+    if len(gap) <= GAP_SHRINK * len(points):
+        candidates = gap[tiled_delaunay(points[gap], triangulate, tile_points, halo)]
+    else:
+        candidates = gap[triangulate(points[gap])]
+    candidates = candidates[~covered_candidates(points, certified, candidates)]
+    return np.concatenate((certified, candidates))
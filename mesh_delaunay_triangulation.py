@@ -11,10 +11,16 @@ bl_info = {
     }
 
 import bpy
-from mathutils import Vector
+from itertools import chain
 from mathutils.geometry import delaunay_2d_cdt
+from . import auto_load
 
-def create_object_from_data(context, name, verts, edges, faces):
+# loaded on first use
+np = auto_load.lazy_import("numpy")
+mesh_arrays = auto_load.lazy_import(".mesh_arrays", __package__)
+mesh_delaunay_tiles = auto_load.lazy_import(".mesh_delaunay_tiles", __package__)
+
+def create_object_from_data(context, name, coords, edges, loop_vertices, loop_total):
     # Create new mesh & object
     mesh = bpy.data.meshes.new(name + '_TRIS')
     obj = bpy.data.objects.new(name, mesh)
@@ -25,30 +31,172 @@ def create_object_from_data(context, name, verts, edges, faces):
     context.view_layer.objects.active = obj
     obj.select_set(True)
 
-    # populate mesh with data from given verts & faces
-    mesh.from_pydata(verts, edges, faces)
-    mesh.update()
+    # populate mesh in bulk from the given arrays
+    mesh_arrays.create_mesh_from_arrays(mesh, coords, loop_vertices, loop_total, edges)
 
     # wireframe display
     obj.show_wire = True
 
     return obj
 
-def delaunay_triangulate(context, obj, output_type, epsilon):
+def read_mesh_input(mesh):
+    # coords, edges and faces as arrays
+    coords = mesh_arrays.get_vertex_coords(mesh).astype(np.float64)
+    edges = mesh_arrays.get_edge_vertices(mesh)
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(mesh)
+    loop_vertices = mesh_arrays.get_loop_vertices(mesh)
+    return (coords, edges, loop_vertices, loop_start, loop_total)
+
+def run_delaunay_2d_cdt(coords, edges, loop_vertices, loop_start, output_type, epsilon):
+    # delaunay_2d_cdt is the only place where arrays are converted to Python sequences
+    faces = [face.tolist() for face in np.split(loop_vertices, loop_start[1:])] if len(loop_start) else []
+    (out_coords, out_edges, out_faces, orig_verts, orig_edges, orig_faces) = delaunay_2d_cdt(
+        coords.tolist(), edges.tolist(), faces, output_type, epsilon)
+
+    # output back to arrays
+    out_coords = np.array(out_coords, dtype=np.float64).reshape(-1, 2)
+    out_edges = np.array(out_edges, dtype=np.int32).reshape(-1, 2)
+    out_loop_total = np.fromiter(map(len, out_faces), dtype=np.int32, count=len(out_faces))
+    out_loop_vertices = np.fromiter(chain.from_iterable(out_faces), dtype=np.int32, count=int(out_loop_total.sum()))
+    return (out_coords, out_edges, out_loop_vertices, out_loop_total)
+
+def triangulate_points(points, epsilon):
+    # convex hull triangulation of points only, returns indices into points
+    (out_coords, out_edges, out_faces, orig_verts, orig_edges, orig_faces) = delaunay_2d_cdt(points.tolist(), [], [], 0, epsilon)
+    out_to_input = np.fromiter((verts[0] for verts in orig_verts), dtype=np.int64, count=len(orig_verts))
+    return out_to_input[np.array(out_faces, dtype=np.int64).reshape(-1, 3)]
+
+def run_tiled_delaunay(coords, tile_points, epsilon):
+    # tiles are triangulated one after another, so at most one tile is held by delaunay_2d_cdt.
+    # mathutils is part of the Blender binary and can't be used from worker processes.
+    tris = mesh_delaunay_tiles.tiled_delaunay(coords, lambda points: triangulate_points(points, epsilon), tile_points)
+    return (coords, np.zeros((0, 2), dtype=np.int32), tris.ravel(), np.full(len(tris), 3, dtype=np.int32))
+
+def triangulate_2d(coords, edges, loop_vertices, loop_start, output_type, epsilon, tile_points):
+    # large point sets in convex hull mode are split into tiles
+    if output_type == 0 and tile_points > 0 and len(coords) > tile_points:
+        return run_tiled_delaunay(coords, tile_points, epsilon)
+    return run_delaunay_2d_cdt(coords, edges, loop_vertices, loop_start, output_type, epsilon)
+
+def connected_components(vertex_count, edges):
+    # label propagation over edges, every vertex ends up pointing at the smallest vertex of its component
+    labels = np.arange(vertex_count)
+    (v0, v1) = (edges[:, 0], edges[:, 1])
+    while True:
+        # hook the larger root of every edge onto the smaller one
+        (l0, l1) = (labels[v0], labels[v1])
+        differ = l0 != l1
+        if not differ.any():
+            break
+        (l0, l1) = (l0[differ], l1[differ])
+        np.minimum.at(labels, np.maximum(l0, l1), np.minimum(l0, l1))
+        # pointer jumping until every vertex points at its root
+        while True:
+            parents = labels[labels]
+            if np.array_equal(parents, labels):
+                break
+            labels = parents
+    (roots, labels) = np.unique(labels, return_inverse=True)
+    return (labels.ravel(), len(roots))
+
+def island_labels(vertex_count, edges):
+    # connected components, loose vertices without edges form one island together,
+    # a point cloud is triangulated as a whole
+    (labels, count) = connected_components(vertex_count, edges)
+    loose = np.bincount(edges.ravel(), minlength=vertex_count) == 0
+    if loose.any():
+        labels[loose] = count
+        (roots, labels) = np.unique(labels, return_inverse=True)
+        (labels, count) = (labels.ravel(), len(roots))
+    return (labels, count)
+
+def best_fit_planes(coords, labels, count):
+    # PCA per component, the plane normal is the axis of least variance
+    weights = np.bincount(labels, minlength=count).astype(np.float64)
+    center = np.stack([np.bincount(labels, coords[:, i], count) for i in range(3)], axis=1) / np.maximum(weights, 1.0)[:, None]
+    offset = coords - center[labels]
+    covariance = np.empty((count, 3, 3), dtype=np.float64)
+    for i in range(3):
+        for j in range(i, 3):
+            covariance[:, i, j] = covariance[:, j, i] = np.bincount(labels, offset[:, i] * offset[:, j], count)
+    (eigenvalues, eigenvectors) = np.linalg.eigh(covariance)
+
+    # eigenvalues ascending, right handed (u, v, normal) frame
+    normal = eigenvectors[:, :, 0]
+    u = eigenvectors[:, :, 2]
+    v = np.cross(normal, u)
+    return (center, u, v, normal)
+
+def gather_faces(loop_vertices, loop_start, loop_total, faces):
+    # loops of the given faces, packed
+    counts = loop_total[faces]
+    rank = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    sub_loop_vertices = loop_vertices[np.repeat(loop_start[faces], counts) + rank]
+    return (sub_loop_vertices, np.cumsum(counts) - counts)
+
+def triangulate_islands(coords, edges, loop_vertices, loop_start, loop_total, output_type, epsilon, tile_points):
+    # every connected component is projected onto its own best fit plane, loose vertices share one,
+    # triangulated and lifted back to 3D. Components are triangulated one by one,
+    # delaunay_2d_cdt can't be used from worker processes.
+    (labels, count) = island_labels(len(coords), edges)
+    (center, u, v, normal) = best_fit_planes(coords, labels, count)
+
+    # vertices, edges and faces grouped by component
+    vertex_order = np.argsort(labels, kind='stable')
+    vertex_start = np.searchsorted(labels[vertex_order], np.arange(count + 1))
+    local_index = np.empty(len(coords), dtype=np.int64)
+    local_index[vertex_order] = np.arange(len(coords)) - vertex_start[labels[vertex_order]]
+    edge_labels = labels[edges[:, 0]]
+    edge_order = np.argsort(edge_labels, kind='stable')
+    edge_start = np.searchsorted(edge_labels[edge_order], np.arange(count + 1))
+    face_labels = labels[loop_vertices[loop_start]] if len(loop_start) else np.zeros(0, dtype=np.int64)
+    face_order = np.argsort(face_labels, kind='stable')
+    face_start = np.searchsorted(face_labels[face_order], np.arange(count + 1))
+
+    results = []
+    vertex_offset = 0
+    for island in range(count):
+        island_vertices = vertex_order[vertex_start[island]:vertex_start[island + 1]]
+        if len(island_vertices) < 3:
+            continue
+        island_edges = local_index[edges[edge_order[edge_start[island]:edge_start[island + 1]]]]
+        faces = face_order[face_start[island]:face_start[island + 1]]
+        (island_loop_vertices, island_loop_start) = gather_faces(loop_vertices, loop_start, loop_total, faces)
+
+        offset = coords[island_vertices] - center[island]
+        projected = np.stack((offset @ u[island], offset @ v[island]), axis=1)
+        (out_coords, out_edges, out_loop_vertices, out_loop_total) = triangulate_2d(projected,
+            island_edges, local_index[island_loop_vertices], island_loop_start, output_type, epsilon, tile_points)
+
+        lifted = center[island] + out_coords[:, :1] * u[island] + out_coords[:, 1:] * v[island]
+        results.append((lifted, out_edges + vertex_offset, out_loop_vertices + vertex_offset, out_loop_total))
+        vertex_offset += len(lifted)
+
+    if not results:
+        return (np.zeros((0, 3)), np.zeros((0, 2), dtype=np.int32), np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32))
+    return tuple(np.concatenate(arrays) for arrays in zip(*results))
+
+def lift_xy(coords):
+    coords_3d = np.zeros((len(coords), 3), dtype=np.float64)
+    coords_3d[:, :2] = coords
+    return coords_3d
+
+def delaunay_triangulate(context, obj, output_type, epsilon, tile_points=0, projection='XY'):
     depsgraph = context.evaluated_depsgraph_get()
     obj_eval = obj.evaluated_get(depsgraph)
     mesh_eval = obj_eval.to_mesh()
 
-    vert_coords = [vtx.co.to_2d() for vtx in mesh_eval.vertices]
-    edges = [edge.vertices for edge in mesh_eval.edges]
-    faces = [[mesh_eval.loops[loop_index].vertex_index for loop_index in face.loop_indices] for face in mesh_eval.polygons]
-
-    (out_coords, out_edges, out_faces, orig_verts, orig_edges, orig_faces) = delaunay_2d_cdt(vert_coords, edges, faces, output_type, epsilon)
+    (coords, edges, loop_vertices, loop_start, loop_total) = read_mesh_input(mesh_eval)
 
     obj_eval.to_mesh_clear()
-    #bpy.data.meshes.remove(mesh_eval)
 
-    return ([co.to_3d() for co in out_coords], out_edges, out_faces)
+    if projection == 'BEST_FIT':
+        return triangulate_islands(coords, edges, loop_vertices, loop_start, loop_total, output_type, epsilon, tile_points)
+
+    # drop Z, output lies in the XY plane
+    (out_coords, out_edges, out_loop_vertices, out_loop_total) = triangulate_2d(coords[:, :2],
+        edges, loop_vertices, loop_start, output_type, epsilon, tile_points)
+    return (lift_xy(out_coords), out_edges, out_loop_vertices, out_loop_total)
 
 class DelaunayTriangulation(bpy.types.Operator):
     """Delaunay Triangulation"""
@@ -78,6 +226,30 @@ class DelaunayTriangulation(bpy.types.Operator):
         unit ='LENGTH',
         )
 
+    projection: bpy.props.EnumProperty(
+        items = [
+                ('XY', "XY", "Project onto the XY plane by dropping Z"),
+                ('BEST_FIT', "Best Fit", "Project every connected island onto its own best fit plane"),
+                ],
+        name = "Projection",
+        default = 'XY',
+        description = "",
+        )
+
+    tiled: bpy.props.BoolProperty(
+        name = "Tiled",
+        default = False,
+        description = "Triangulate large point sets tile by tile. CONVEX HULL only, edges and faces are ignored",
+        )
+
+    tile_points: bpy.props.IntProperty(
+        name = "Points per Tile",
+        default = 100000,
+        min = 1000,
+        max = 10000000,
+        description = "Maximum number of points per tile, every triangulation step gets at most twice as many with the halo",
+        )
+
     @classmethod
     def poll(cls, context):
         return context.active_object is not None and context.active_object.type == 'MESH'
@@ -90,10 +262,24 @@ class DelaunayTriangulation(bpy.types.Operator):
         self.execute(context)
         return {"FINISHED"}
 
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "output_type")
+        layout.prop(self, "epsilon")
+        layout.prop(self, "projection")
+
+        box = layout.box()
+        box.enabled = self.output_type == '0'
+        box.prop(self, "tiled")
+        row = box.row()
+        row.enabled = self.tiled
+        row.prop(self, "tile_points")
+
     def triangulate_mesh(self, context):
         obj = context.active_object
-        (out_verts, out_edges, out_faces) = delaunay_triangulate(context, obj, int(self.output_type), self.epsilon)
-        create_object_from_data(context, obj.name + '_TRIS', out_verts, out_edges, out_faces)
+        tile_points = self.tile_points if self.tiled else 0
+        (coords, edges, loop_vertices, loop_total) = delaunay_triangulate(context, obj, int(self.output_type), self.epsilon, tile_points, self.projection)
+        create_object_from_data(context, obj.name + '_TRIS', coords, edges, loop_vertices, loop_total)
 
         # Hide the object in the viewport
         obj.hide_set(True)
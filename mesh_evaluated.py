@@ -0,0 +1,225 @@
+import hashlib
+import bpy
+import bmesh
+from collections import defaultdict
+from . import auto_load
+
+# loaded on first use
+np = auto_load.lazy_import("numpy")
+mesh_arrays = auto_load.lazy_import(".mesh_arrays", __package__)
+
+# Searches on the evaluated mesh, with the modifier stack applied.
+# Original element indices are written to temporary attributes of the mesh in
+# object mode, modifiers carry them over to the elements they create, so
+# results on the evaluated mesh map back to the elements they came from.
+# Results are kept per object until its state key changes: the mesh itself,
+# the modifier settings and the updates seen for the data blocks the modifiers
+# refer to. Updates of the object itself, e.g. mode toggles, don't count. On a
+# new key the results are still reused when the evaluated mesh is unchanged.
+
+ORIGINAL_INDEX = {
+    'VERT': ("POINT", "mesh_utils_orig_vertex_index"),
+    'EDGE': ("EDGE", "mesh_utils_orig_edge_index"),
+    'FACE': ("FACE", "mesh_utils_orig_face_index"),
+    }
+
+# modifier properties without effect on the evaluated mesh
+IGNORED_PROPERTIES = ("rna_type", "show_expanded", "is_active", "is_override_data")
+
+# object name -> {"state": state key, "hash": evaluated mesh hash, "results": {key: result}}
+cache = {}
+# (data block type, name) -> depsgraph updates seen
+update_counts = defaultdict(int)
+
+def id_key(data_block):
+    return (type(data_block).__name__, data_block.name_full)
+
+@bpy.app.handlers.persistent
+def depsgraph_update_post(scene, depsgraph):
+    for update in depsgraph.updates:
+        update_counts[id_key(update.id.original)] += 1
+
+@bpy.app.handlers.persistent
+def load_post(*args):
+    cache.clear()
+    update_counts.clear()
+
+def write_original_indices(mesh):
+    # element counts of the mesh, attributes are filled in bulk
+    attributes = getattr(mesh, "attributes", None)
+    element_counts = {'VERT': len(mesh.vertices), 'EDGE': len(mesh.edges), 'FACE': len(mesh.polygons)}
+    if attributes is None:
+        return element_counts
+    for (attribute_domain, name) in ORIGINAL_INDEX.values():
+        if name in attributes:
+            raise ValueError("Attribute '%s' is reserved for searches with modifiers, rename it first" % name)
+    for (domain, (attribute_domain, name)) in ORIGINAL_INDEX.items():
+        attributes.new(name, 'INT', attribute_domain).data.foreach_set("value", np.arange(element_counts[domain], dtype=np.int32))
+    mesh.update()
+    return element_counts
+
+def remove_original_indices(mesh):
+    attributes = getattr(mesh, "attributes", None)
+    if attributes is None:
+        return
+    for (attribute_domain, name) in ORIGINAL_INDEX.values():
+        if name in attributes:
+            attributes.remove(attributes[name])
+    mesh.update()
+
+def read_original_indices(mesh, domain):
+    # None where the modifiers dropped the attribute
+    (attribute_domain, name) = ORIGINAL_INDEX[domain]
+    attributes = getattr(mesh, "attributes", None)
+    if attributes is None or name not in attributes or attributes[name].domain != attribute_domain:
+        return None
+    return mesh_arrays.foreach_get(attributes[name].data, "value", np.int32)
+
+def mesh_hash(mesh, arrays=()):
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(mesh)
+    arrays = [
+        mesh_arrays.get_vertex_coords(mesh),
+        mesh_arrays.get_edge_vertices(mesh),
+        mesh_arrays.get_loop_vertices(mesh),
+        loop_total,
+        mesh_arrays.get_flags(mesh.vertices, "hide"),
+        mesh_arrays.get_flags(mesh.edges, "hide"),
+        mesh_arrays.get_flags(mesh.polygons, "hide"),
+    ] + list(arrays)
+    digest = hashlib.blake2b(digest_size=20)
+    for array in arrays:
+        digest.update(str(array.shape).encode())
+        digest.update(np.ascontiguousarray(array).data)
+    return digest.hexdigest()
+
+def property_values(struct):
+    # settings of a modifier, data blocks it refers to are returned separately
+    values = []
+    data_blocks = []
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in IGNORED_PROPERTIES or prop.type == 'COLLECTION':
+            continue
+        value = getattr(struct, prop.identifier, None)
+        if isinstance(value, bpy.types.ID):
+            data_blocks.append(value)
+            value = id_key(value)
+        elif prop.type == 'POINTER':
+            continue
+        elif getattr(prop, "is_array", False):
+            value = tuple(value)
+        values.append((prop.identifier, value))
+    # geometry nodes inputs are custom properties
+    try:
+        keys = struct.keys()
+    except TypeError:
+        keys = []
+    for key in keys:
+        value = struct[key]
+        if isinstance(value, bpy.types.ID):
+            data_blocks.append(value)
+            value = id_key(value)
+        elif hasattr(value, "to_list"):
+            value = value.to_list()
+        values.append((key, value))
+    return (values, data_blocks)
+
+def state_key(obj):
+    # hash of the mesh, the modifier settings and the data blocks the modifiers depend on
+    state = []
+    dependencies = []
+    for modifier in obj.modifiers:
+        (values, data_blocks) = property_values(modifier)
+        state.append(values)
+        dependencies.extend(data_blocks)
+    if dependencies:
+        # dependencies act relative to the object
+        state.append(tuple(tuple(row) for row in obj.matrix_world))
+
+    # objects are also moved, collections change their objects
+    while dependencies:
+        data_block = dependencies.pop()
+        # updates of the object itself come from searches as well
+        if data_block not in (obj, obj.data):
+            state.append((id_key(data_block), update_counts[id_key(data_block)]))
+        if isinstance(data_block, bpy.types.Object):
+            state.append(tuple(tuple(row) for row in data_block.matrix_world))
+            if data_block.data is not None and data_block.data != obj.data:
+                state.append((id_key(data_block.data), update_counts[id_key(data_block.data)]))
+        elif isinstance(data_block, bpy.types.Collection):
+            dependencies.extend(data_block.all_objects)
+
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(repr(state).encode())
+    digest.update(mesh_hash(obj.data).encode())
+    return digest.hexdigest()
+
+def prune_cache():
+    # deleted and renamed objects
+    for name in [name for name in cache if name not in bpy.data.objects]:
+        del cache[name]
+
+def map_to_original(indices, original_indices, element_count):
+    # original element indices, None when they're not known
+    if original_indices is None:
+        return None
+    indices = original_indices[np.asarray(sorted(indices), dtype=np.int64)]
+    return np.unique(indices[(indices >= 0) & (indices < element_count)])
+
+def evaluated_search(context, obj, searches):
+    # searches - [(key, domain, find)], find(bm, mesh) returns element indices of the evaluated mesh
+    # returns [(original indices or None, evaluated element count)] in the same order
+    # the object has to be in object mode
+    prune_cache()
+    # pending updates reach the handler first
+    context.evaluated_depsgraph_get()
+    key_state = state_key(obj)
+    entry = cache.get(obj.name)
+    if entry is not None and entry["state"] == key_state and all(key in entry["results"] for (key, domain, find) in searches):
+        return [entry["results"][key] for (key, domain, find) in searches]
+
+    mesh = obj.data
+    element_counts = write_original_indices(mesh)
+    try:
+        obj_eval = obj.evaluated_get(context.evaluated_depsgraph_get())
+        mesh_eval = obj_eval.to_mesh()
+        try:
+            original_indices = {domain: read_original_indices(mesh_eval, domain) for domain in ORIGINAL_INDEX}
+            key_hash = mesh_hash(mesh_eval, [indices for indices in original_indices.values() if indices is not None])
+            if entry is None or entry["hash"] != key_hash:
+                entry = cache[obj.name] = {"hash": key_hash, "results": {}}
+            entry["state"] = key_state
+
+            bm = None
+            for (key, domain, find) in searches:
+                if key in entry["results"]:
+                    continue
+                if bm is None:
+                    bm = bmesh.new()
+                    bm.from_mesh(mesh_eval)
+                    bm.verts.ensure_lookup_table()
+                    bm.edges.ensure_lookup_table()
+                    bm.faces.ensure_lookup_table()
+                indices = find(bm, mesh_eval)
+                entry["results"][key] = (map_to_original(indices, original_indices[domain], element_counts[domain]), len(indices))
+            if bm is not None:
+                bm.free()
+        finally:
+            obj_eval.to_mesh_clear()
+    finally:
+        remove_original_indices(mesh)
+
+    return [entry["results"][key] for (key, domain, find) in searches]
+
+def register():
+    if depsgraph_update_post not in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.append(depsgraph_update_post)
+    if load_post not in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.append(load_post)
+
+def unregister():
+    if depsgraph_update_post in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(depsgraph_update_post)
+    if load_post in bpy.app.handlers.load_post:
+        bpy.app.handlers.load_post.remove(load_post)
+    cache.clear()
+    update_counts.clear()
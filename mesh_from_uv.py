@@ -1,48 +1,93 @@
 bl_info = {
     "name": "Mesh from UVs",
     "author": "rpopovici",
-    "version": (0, 1),
+    "version": (0, 2),
     "blender": (2, 80, 0),
     "location": "(Object Mode) Add > Mesh > Mesh from UVs",
-    "description": "Create mesh from UVs",
+    "description": "Create mesh from UVs of one or many objects",
     "warning": "",
     "wiki_url": "https://github.com/rpopovici/mesh-utils",
     "category": "Mesh",
     }
 
 import bpy
-from mathutils import Vector
+from . import auto_load
 
-def create_object_from_data(context, name, verts, faces):
-    # Create new mesh & object
+# loaded on first use
+np = auto_load.lazy_import("numpy")
+mesh_arrays = auto_load.lazy_import(".mesh_arrays", __package__)
+
+def create_object_from_data(name, coords, layout, loop_vertices, loop_total):
+    # Create new mesh & object, linking is left to the caller
     mesh = bpy.data.meshes.new(name + 'Mesh')
     obj = bpy.data.objects.new(name, mesh)
     obj.show_name = True
 
-    # Link the newly created object to the scene and make it active
-    context.view_layer.active_layer_collection.collection.objects.link(obj)
-    context.view_layer.objects.active = obj
-    obj.select_set(True)
-
-    # populate mesh with data from given verts & faces
-    mesh.from_pydata(verts, [], faces)
-    mesh.update()
+    # populate mesh in bulk from the given arrays
+    mesh_arrays.create_mesh_from_arrays(mesh, coords, loop_vertices, loop_total)
+    add_uv_shape_key(obj, layout)
     return obj
 
-def generate_mesh_data_from_uv(context, obj, size, interpolate):
-    out_verts = []
-    out_faces = []
-    for face in obj.data.polygons:
-        out_face = []
-        for vert, loop in zip(face.vertices, face.loop_indices):
-            coord = obj.data.vertices[vert].co
-            uv = obj.data.uv_layers.active.data[loop].uv
-            uv_vert = ((uv.x - 0.5) * size, 0, (uv.y - 0.5) * size)
-            out_verts.append(coord.lerp(uv_vert, interpolate))
-            out_face.append(loop)
-        out_faces.append(out_face)
-
-    return (out_verts, out_faces)
+def link_objects(context, objects):
+    # Link the newly created objects to the scene and make the last one active
+    collection = context.view_layer.active_layer_collection.collection
+    for obj in objects:
+        collection.objects.link(obj)
+        obj.select_set(True)
+    if objects:
+        context.view_layer.objects.active = objects[-1]
+
+def add_uv_shape_key(obj, layout):
+    # 3D positions are the basis, the UV layout is a shape key
+    # the key value morphs between them on the object, no rebuild or redo needed
+    obj.shape_key_add(name="Basis", from_mix=False)
+    key = obj.shape_key_add(name="UV", from_mix=False)
+    key.data.foreach_set("co", np.asarray(layout, dtype=np.float32).ravel())
+    key.slider_min = 0.0
+    key.slider_max = 1.0
+    key.value = 1.0
+    return key
+
+def combine_mesh_data(parts):
+    # concatenate (coords, layout, loop_vertices, loop_total) tuples into one mesh
+    # and tag every face with the index of its part
+    vertex_offsets = np.cumsum([0] + [len(part[0]) for part in parts])
+    coords = np.concatenate([part[0] for part in parts])
+    layout = np.concatenate([part[1] for part in parts])
+    loop_vertices = np.concatenate([part[2] + offset for (part, offset) in zip(parts, vertex_offsets)])
+    loop_total = np.concatenate([part[3] for part in parts])
+    face_sources = np.repeat(np.arange(len(parts), dtype=np.int32), [len(part[3]) for part in parts])
+    return (coords, layout, loop_vertices, loop_total, face_sources)
+
+def uv_layout_coords(uvs, size):
+    # flattened UV layout in the XZ plane
+    return np.stack(((uvs[:, 0] - 0.5) * size, np.zeros(len(uvs)), (uvs[:, 1] - 0.5) * size), axis=1)
+
+def weld_corners(loop_vertices, uvs, weld_distance):
+    # one corner per unique (source vertex, quantized UV) pair
+    # returns the first loop of every corner and the corner of every loop
+    cells = np.floor(uvs / max(weld_distance, 1e-12) + 0.5).astype(np.int64)
+    keys = np.column_stack((loop_vertices.astype(np.int64), cells))
+    (_, first_loop, loop_corners) = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    return (first_loop, loop_corners.ravel().astype(np.int32))
+
+def generate_mesh_data_from_uv(context, obj, uv_layer_name, size, weld=False, weld_distance=0.0):
+    # one output vertex per loop, or per welded corner, faces keep the source loop order
+    # returns world space positions and the flattened UV layout of every output vertex
+    mesh = obj.data
+    loop_vertices = mesh_arrays.get_loop_vertices(mesh)
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(mesh)
+    uvs = mesh_arrays.get_loop_uvs(mesh, uv_layer_name).astype(np.float64)
+
+    if weld:
+        (corner_loops, out_loop_vertices) = weld_corners(loop_vertices, uvs, weld_distance)
+    else:
+        corner_loops = np.arange(len(loop_vertices))
+        out_loop_vertices = corner_loops.astype(np.int32)
+
+    coords = mesh_arrays.get_world_coords(obj)[loop_vertices[corner_loops]]
+    layout = uv_layout_coords(uvs[corner_loops], size)
+    return (coords, layout, out_loop_vertices, loop_total)
 
 class MeshFromUV(bpy.types.Operator):
     """Mesh from UVs"""
@@ -60,17 +105,56 @@ class MeshFromUV(bpy.types.Operator):
         unit ='LENGTH',
         )
 
-    interpolate: bpy.props.FloatProperty(
-        name = "Interpolate",
-        default = 1.0,
+    weld: bpy.props.BoolProperty(
+        name = "Weld",
+        default = False,
+        description = "Share vertices between faces with the same source vertex and UV, keeps UV islands connected",
+        )
+
+    weld_distance: bpy.props.FloatProperty(
+        name = "Weld Distance",
+        default = 0.00001,
         min = 0.0,
-        max = 1.0,
-        description = "Interpolate between 3D coords and UV coords",
+        max = 0.01,
+        precision = 6,
+        description = "UV distance below which corners of the same vertex are welded",
+        )
+
+    source: bpy.props.EnumProperty(
+        items=[
+                ('ACTIVE', "Active", "Active object only"),
+                ('SELECTED', "Selected", "All selected mesh objects"),
+                ],
+        name="Source",
+        default='ACTIVE',
+        description="Objects to build UV meshes from",
+        )
+
+    uv_layers: bpy.props.EnumProperty(
+        items=[
+                ('ACTIVE', "Active", "Active UV map of every object"),
+                ('ALL', "All", "Every UV map of every object"),
+                ],
+        name="UV Maps",
+        default='ACTIVE',
+        description="UV maps to build UV meshes from",
+        )
+
+    output: bpy.props.EnumProperty(
+        items=[
+                ('COMBINED', "Combined", "One mesh, faces are tagged with the uv_source attribute"),
+                ('SEPARATE', "Separate", "One object per object and UV map"),
+                ],
+        name="Output",
+        default='COMBINED',
+        description="",
         )
 
     @classmethod
     def poll(cls, context):
-        return context.active_object is not None and context.active_object.type == 'MESH'
+        # sources without UV maps are reported by execute
+        obj = context.active_object
+        return obj is not None and obj.type == 'MESH'
 
     def execute(self, context):
         self.mesh_from_uv(context)
@@ -80,10 +164,76 @@ class MeshFromUV(bpy.types.Operator):
         self.execute(context)
         return {"FINISHED"}
 
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "size")
+
+        box = layout.box()
+        box.prop(self, "weld")
+        row = box.row()
+        row.enabled = self.weld
+        row.prop(self, "weld_distance")
+
+        box = layout.box()
+        box.prop(self, "source")
+        box.prop(self, "uv_layers")
+        row = box.row()
+        row.enabled = self.source == 'SELECTED' or self.uv_layers == 'ALL'
+        row.prop(self, "output")
+
+    def uv_sources(self, context):
+        # (object, uv map name) pairs
+        if self.source == 'SELECTED':
+            objects = [obj for obj in context.selected_objects if obj.type == 'MESH']
+        else:
+            objects = [context.active_object]
+
+        sources = []
+        for obj in objects:
+            if self.uv_layers == 'ALL':
+                sources.extend((obj, uv_layer.name) for uv_layer in obj.data.uv_layers)
+            elif obj.data.uv_layers.active is not None:
+                sources.append((obj, obj.data.uv_layers.active.name))
+        return sources
+
     def mesh_from_uv(self, context):
-        obj = context.active_object
-        (out_verts, out_faces) = generate_mesh_data_from_uv(context, obj, self.size, self.interpolate)
-        create_object_from_data(context, obj.name + '_UVMesh', out_verts, out_faces)
+        sources = self.uv_sources(context)
+        if not sources:
+            self.report({'WARNING'}, "No UV maps found")
+            return
+
+        parts = [generate_mesh_data_from_uv(context, obj, uv_layer_name, self.size, self.weld, self.weld_distance)
+            for (obj, uv_layer_name) in sources]
+
+        if len(sources) == 1:
+            (obj, uv_layer_name) = sources[0]
+            objects = [create_object_from_data(obj.name + '_UVMesh', *parts[0])]
+        elif self.output == 'SEPARATE':
+            objects = [create_object_from_data(obj.name + '_' + uv_layer_name + '_UVMesh', *part)
+                for ((obj, uv_layer_name), part) in zip(sources, parts)]
+        else:
+            objects = [self.create_combined_object(sources, parts)]
+
+        link_objects(context, objects)
+
+    def create_combined_object(self, sources, parts):
+        # UV layouts side by side along X
+        for (index, part) in enumerate(parts):
+            part[1][:, 0] += index * self.size
+
+        (coords, layout, loop_vertices, loop_total, face_sources) = combine_mesh_data(parts)
+        combined = create_object_from_data('UVMesh', coords, layout, loop_vertices, loop_total)
+
+        # generic attributes need Blender 2.91
+        attributes = getattr(combined.data, "attributes", None)
+        if attributes is not None:
+            attribute = attributes.new("uv_source", 'INT', 'FACE')
+            attribute.data.foreach_set("value", face_sources)
+        else:
+            self.report({'WARNING'}, "Faces are not tagged with their source, the uv_source attribute needs Blender 2.91")
+        # uv_source attribute value -> source object and UV map
+        combined["uv_sources"] = [obj.name + '/' + uv_layer_name for (obj, uv_layer_name) in sources]
+        return combined
 
 def menu_func(self, context):
     self.layout.operator(MeshFromUV.bl_idname, text="Mesh From UVs")
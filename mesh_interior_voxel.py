@@ -0,0 +1,202 @@
+import numpy as np
+
+# Render free interior detection:
+# - voxelize the surface into an occupancy grid (triangle/box SAT test)
+# - flood fill empty space from the grid border to find exterior voxels
+# - a face is interior when none of its samples touches an exterior voxel
+# Grids are bit-packed along the last axis the whole way through, the flood
+# fill only unpacks one slice at a time.
+
+# upper bound for (triangle, voxel) candidate pairs tested at once
+MAX_CANDIDATES = 1 << 22
+
+def grid_from_bounds(coords, resolution):
+    # adapt the grid to mesh bounds, largest axis gets "resolution" voxels
+    co_min = coords.min(axis=0)
+    co_max = coords.max(axis=0)
+    extent = max(float((co_max - co_min).max()), 1e-6)
+    voxel_size = extent / resolution
+
+    # one empty voxel on each side so the flood fill can reach around the mesh
+    origin = co_min - voxel_size
+    shape = tuple(np.ceil((co_max - co_min) / voxel_size).astype(np.int64) + 3)
+    return (origin, voxel_size, shape)
+
+def tri_box_overlap(v0, v1, v2, half_size):
+    # Akenine-Moller separating axis test, vertices relative to box center
+    overlap = np.ones(len(v0), dtype=bool)
+
+    # box face normals
+    for axis in range(3):
+        p = np.stack((v0[:, axis], v1[:, axis], v2[:, axis]))
+        overlap &= (p.min(axis=0) <= half_size) & (p.max(axis=0) >= -half_size)
+
+    # triangle normal
+    normal = np.cross(v1 - v0, v2 - v0)
+    d = np.einsum('ij,ij->i', normal, v0)
+    radius = half_size * np.abs(normal).sum(axis=1)
+    overlap &= np.abs(d) <= radius
+
+    # cross products of triangle edges and box axes
+    for edge in (v1 - v0, v2 - v1, v0 - v2):
+        for axis in range(3):
+            a = np.zeros_like(edge)
+            a[:, (axis + 1) % 3] = -edge[:, (axis + 2) % 3]
+            a[:, (axis + 2) % 3] = edge[:, (axis + 1) % 3]
+            p0 = np.einsum('ij,ij->i', a, v0)
+            p1 = np.einsum('ij,ij->i', a, v1)
+            p2 = np.einsum('ij,ij->i', a, v2)
+            radius = half_size * np.abs(a).sum(axis=1)
+            overlap &= (np.minimum(np.minimum(p0, p1), p2) <= radius) & (np.maximum(np.maximum(p0, p1), p2) >= -radius)
+
+    return overlap
+
+def packed_shape(shape):
+    # grids are bit-packed along the last axis
+    return (shape[0], shape[1], (shape[2] + 7) >> 3)
+
+def set_bits(packed, ix, iy, iz):
+    np.bitwise_or.at(packed, (ix, iy, iz >> 3), (0x80 >> (iz & 7)).astype(np.uint8))
+
+def voxelize(tri_coords, origin, voxel_size, shape):
+    occupied = np.zeros(packed_shape(shape), dtype=np.uint8)
+    if len(tri_coords) == 0:
+        return occupied
+
+    # candidate voxels from triangle bbox
+    local = (tri_coords - origin) / voxel_size
+    bbox_min = np.clip(np.floor(local.min(axis=1)).astype(np.int64), 0, np.array(shape) - 1)
+    bbox_max = np.clip(np.floor(local.max(axis=1)).astype(np.int64), 0, np.array(shape) - 1)
+    extent = bbox_max - bbox_min + 1
+    counts = extent.prod(axis=1)
+
+    # slightly grow the box so triangles on voxel boundaries leave no cracks
+    half_size = 0.5 * 1.001
+
+    # split triangles in chunks with a bounded number of candidate pairs
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(tri_coords):
+        offset = ends[start] - counts[start]
+        stop = max(int(np.searchsorted(ends, offset + MAX_CANDIDATES, side='right')), start + 1)
+
+        chunk_counts = counts[start:stop]
+        tri_index = np.repeat(np.arange(start, stop), chunk_counts)
+        # running index of every candidate inside its triangle bbox
+        rank = np.arange(len(tri_index)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        ext = extent[tri_index]
+        ix = bbox_min[tri_index, 0] + rank % ext[:, 0]
+        iy = bbox_min[tri_index, 1] + (rank // ext[:, 0]) % ext[:, 1]
+        iz = bbox_min[tri_index, 2] + rank // (ext[:, 0] * ext[:, 1])
+
+        center = np.stack((ix, iy, iz), axis=1) + 0.5
+        tris = local[tri_index]
+        hit = tri_box_overlap(tris[:, 0] - center, tris[:, 1] - center, tris[:, 2] - center, half_size)
+        set_bits(occupied, ix[hit], iy[hit], iz[hit])
+        start = stop
+
+    return occupied
+
+def propagate_runs(occ, ext):
+    # every run of empty voxels along the last axis touching the exterior is exterior
+    length = occ.shape[-1]
+    # run id per voxel, unique across lines
+    run = np.cumsum(occ, axis=-1, dtype=np.int32)
+    run += (np.arange(occ.shape[0], dtype=np.int32) * (length + 1))[:, None]
+    flag = np.zeros(occ.shape[0] * (length + 1), dtype=bool)
+    flag[run[ext]] = True
+    return flag[run] & ~occ
+
+def propagate_along_axis(occupied, exterior, axis, depth):
+    # one slice is unpacked at a time, x and y runs in slices across the other one, z runs in x slices
+    # depth - unpacked size of the last axis, returns whether the exterior grew
+    changed = False
+    slice_axis = 1 if axis == 0 else 0
+    for i in range(occupied.shape[slice_axis]):
+        index = (slice(None), i) if slice_axis == 1 else (i,)
+        occ = np.unpackbits(occupied[index], axis=-1, count=depth).view(bool)
+        ext = np.unpackbits(exterior[index], axis=-1, count=depth).view(bool)
+        if axis == 2:
+            result = propagate_runs(occ, ext)
+        else:
+            # slice axes are (axis, z)
+            result = propagate_runs(occ.T, ext.T).T
+        packed = np.packbits(result, axis=-1)
+        if not np.array_equal(packed, exterior[index]):
+            exterior[index] = packed
+            changed = True
+    return changed
+
+def flood_fill_exterior(occupied, depth):
+    # seed from the grid border
+    exterior = np.zeros_like(occupied)
+    exterior[0, :, :] = exterior[-1, :, :] = 0xff
+    exterior[:, 0, :] = exterior[:, -1, :] = 0xff
+    last = int(depth) - 1
+    exterior[:, :, 0] |= 0x80
+    exterior[:, :, last >> 3] |= 0x80 >> (last & 7)
+    exterior &= ~occupied
+
+    while True:
+        changed = False
+        for axis in range(3):
+            changed |= propagate_along_axis(occupied, exterior, axis, depth)
+        if not changed:
+            return exterior
+
+def dilate(grid):
+    # 26-neighbourhood dilation of a bit-packed grid, separable along each axis
+    for axis in range(2):
+        grown = grid.copy()
+        grown_view = np.moveaxis(grown, axis, 0)
+        grid_view = np.moveaxis(grid, axis, 0)
+        grown_view[1:] |= grid_view[:-1]
+        grown_view[:-1] |= grid_view[1:]
+        grid = grown
+
+    # bits move across byte borders along the packed axis, grid is our own copy by now
+    for plane in grid:
+        grown = plane | (plane >> 1) | (plane << 1)
+        grown[:, 1:] |= plane[:, :-1] << 7
+        grown[:, :-1] |= plane[:, 1:] >> 7
+        plane[...] = grown
+    return grid
+
+def lookup_packed(packed, index):
+    # bit-packed grid lookup, bits are packed along the last axis
+    (ix, iy, iz) = index.T
+    byte = packed[ix, iy, iz >> 3]
+    return ((byte >> (7 - (iz & 7))) & 1).astype(bool)
+
+def sample_points(tri_coords):
+    # triangle centroid plus the corners pulled towards it
+    center = tri_coords.mean(axis=1)
+    corners = center[:, None, :] + (tri_coords - center[:, None, :]) * 0.75
+    return np.concatenate((center[:, None, :], corners), axis=1)
+
+def find_interior_faces(coords, tris, tri_faces, face_count, resolution):
+    interior = np.zeros(face_count, dtype=bool)
+    if len(tris) == 0:
+        return interior
+
+    (origin, voxel_size, shape) = grid_from_bounds(coords, resolution)
+    tri_coords = coords[tris]
+
+    # grids stay bit-packed, at most three of them exist at once
+    occupied = voxelize(tri_coords, origin, voxel_size, shape)
+    exterior = flood_fill_exterior(occupied, shape[2])
+    del occupied
+
+    # exterior neighbourhood
+    near_exterior = dilate(exterior)
+    del exterior
+
+    samples = sample_points(tri_coords)
+    index = np.floor((samples.reshape(-1, 3) - origin) / voxel_size).astype(np.int64)
+    index = np.clip(index, 0, np.array(shape) - 1)
+    exposed = lookup_packed(near_exterior, index).reshape(len(tris), -1).any(axis=1)
+
+    # a face is interior when none of its triangles is exposed
+    exposed_faces = np.bincount(tri_faces[exposed], minlength=face_count) > 0
+    has_tris = np.bincount(tri_faces, minlength=face_count) > 0
+    return has_tris & ~exposed_faces
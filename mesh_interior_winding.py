@@ -0,0 +1,137 @@
+import numpy as np
+from . import mesh_bvh
+from . import mesh_chunks
+
+# Generalized winding number interior detection for non watertight meshes.
+# Far away BVH clusters are approximated by their area weighted normal (dipole),
+# Barnes-Hut style, near clusters are evaluated exactly per triangle.
+
+# number of query points traversed together
+BATCH_SIZE = 1 << 15
+
+def node_sums(bvh, ordered_values):
+    # sum per node through prefix sums over the BVH triangle order
+    prefix = np.zeros((len(ordered_values) + 1,) + ordered_values.shape[1:], dtype=np.float64)
+    np.cumsum(ordered_values, axis=0, out=prefix[1:])
+    return prefix[bvh.start + bvh.count] - prefix[bvh.start]
+
+def build_dipoles(bvh, tri_coords):
+    ordered = tri_coords[bvh.order]
+    area_normals = 0.5 * np.cross(ordered[:, 1] - ordered[:, 0], ordered[:, 2] - ordered[:, 0])
+    areas = np.linalg.norm(area_normals, axis=1)
+
+    normal = node_sums(bvh, area_normals)
+    area = node_sums(bvh, areas[:, None])
+    weighted = node_sums(bvh, ordered.mean(axis=1) * areas[:, None])
+    center_of_bounds = 0.5 * (bvh.bbox_min + bvh.bbox_max)
+    center = np.where(area > 0.0, weighted / np.maximum(area, 1e-300), center_of_bounds)
+
+    # cluster radius, farthest bbox corner from the dipole center
+    radius = np.linalg.norm(np.maximum(bvh.bbox_max - center, center - bvh.bbox_min), axis=1)
+    return (center, normal, radius)
+
+def dot(a, b):
+    return np.einsum('ij,ij->i', a, b)
+
+def solid_angle(a, b, c):
+    # Van Oosterom and Strackee, a/b/c are the triangle corners relative to the query point
+    la = np.sqrt(dot(a, a))
+    lb = np.sqrt(dot(b, b))
+    lc = np.sqrt(dot(c, c))
+    det = (a[:, 0] * (b[:, 1] * c[:, 2] - b[:, 2] * c[:, 1])
+        + a[:, 1] * (b[:, 2] * c[:, 0] - b[:, 0] * c[:, 2])
+        + a[:, 2] * (b[:, 0] * c[:, 1] - b[:, 1] * c[:, 0]))
+    denom = la * lb * lc + dot(a, b) * lc + dot(b, c) * la + dot(c, a) * lb
+    return 2.0 * np.arctan2(det, denom)
+
+def triangle_winding(tri_coords, points):
+    # exact winding contribution of triangle i at point i
+    return solid_angle(tri_coords[:, 0] - points, tri_coords[:, 1] - points, tri_coords[:, 2] - points) / (4.0 * np.pi)
+
+def winding_numbers(bvh, dipoles, tri_coords, points, beta):
+    (center, normal, radius) = dipoles
+    winding = np.zeros(len(points), dtype=np.float64)
+
+    for batch_start in range(0, len(points), BATCH_SIZE):
+        batch = points[batch_start:batch_start + BATCH_SIZE]
+        batch_winding = np.zeros(len(batch), dtype=np.float64)
+
+        # frontier of (point, node) pairs still to be resolved
+        query = np.arange(len(batch))
+        nodes = np.zeros(len(batch), dtype=np.int64)
+        while len(query):
+            offset = center[nodes] - batch[query]
+            dist_sq = dot(offset, offset)
+            far = dist_sq > (beta * radius[nodes]) ** 2
+
+            # far clusters, dipole approximation
+            contrib = dot(offset[far], normal[nodes[far]]) / (4.0 * np.pi * dist_sq[far] ** 1.5)
+            batch_winding += np.bincount(query[far], weights=contrib, minlength=len(batch))
+
+            # near leaves, exact triangles
+            leaf = ~far & (bvh.left[nodes] < 0)
+            (leaf_query, leaf_tris) = mesh_bvh.expand_leaves(bvh, query[leaf], nodes[leaf])
+            contrib = triangle_winding(tri_coords[leaf_tris], batch[leaf_query])
+            batch_winding += np.bincount(leaf_query, weights=contrib, minlength=len(batch))
+
+            # near inner nodes, descend
+            inner = ~far & ~leaf
+            query = np.repeat(query[inner], 2)
+            nodes = np.stack((bvh.left[nodes[inner]], bvh.right[nodes[inner]]), axis=1).ravel()
+
+        winding[batch_start:batch_start + len(batch)] = batch_winding
+
+    return winding
+
+def face_triangles(tri_faces, face_count):
+    # triangles sorted by face, first triangle and triangle count of every face
+    order = np.argsort(tri_faces, kind='stable')
+    face_tri_count = np.bincount(tri_faces, minlength=face_count)
+    return (order, np.cumsum(face_tri_count) - face_tri_count, face_tri_count)
+
+def own_face_winding(tri_coords, tri_faces, face_tris, points, samples):
+    # winding of the sample's own face at every sample point
+    (order, face_tri_start, face_tri_count) = face_tris
+    counts = face_tri_count[tri_faces[samples]]
+    sample_index = np.repeat(np.arange(len(samples)), counts)
+    rank = np.arange(len(sample_index)) - np.repeat(np.cumsum(counts) - counts, counts)
+    own_tris = order[np.repeat(face_tri_start[tri_faces[samples]], counts) + rank]
+    own = triangle_winding(tri_coords[own_tris], points[sample_index])
+    return np.bincount(sample_index, weights=own, minlength=len(samples))
+
+def find_interior_faces(coords, tris, tri_faces, face_count, threshold, beta=1.5, bvh=None, chunk_size=None):
+    # chunk_size - sample triangles evaluated at once in Morton order, all at once by default
+    interior = np.zeros(face_count, dtype=bool)
+    if len(tris) == 0:
+        return interior
+
+    coords = np.asarray(coords, dtype=np.float64)
+    tri_coords = coords[tris]
+    if bvh is None:
+        bvh = mesh_bvh.build_bvh(tri_coords)
+    dipoles = build_dipoles(bvh, tri_coords)
+    epsilon = 1e-5 * np.linalg.norm(coords.max(axis=0) - coords.min(axis=0))
+
+    face_tris = face_triangles(tri_faces, face_count)
+    face_area = np.zeros(face_count, dtype=np.float64)
+    face_winding = np.zeros(face_count, dtype=np.float64)
+    for samples in mesh_chunks.iter_chunks(tri_coords.mean(axis=1), chunk_size):
+        # sample every triangle slightly in front of its face
+        sample_coords = tri_coords[samples]
+        area_normals = 0.5 * np.cross(sample_coords[:, 1] - sample_coords[:, 0], sample_coords[:, 2] - sample_coords[:, 0])
+        areas = np.linalg.norm(area_normals, axis=1)
+        unit_normals = area_normals / np.maximum(areas, 1e-300)[:, None]
+        points = sample_coords.mean(axis=1) + unit_normals * epsilon
+
+        winding = winding_numbers(bvh, dipoles, tri_coords, points, beta)
+
+        # remove the contribution of the sample's own face, we want the rest of the mesh
+        winding -= own_face_winding(tri_coords, tri_faces, face_tris, points, samples)
+
+        # area weighted winding number per face
+        face_area += np.bincount(tri_faces[samples], weights=areas, minlength=face_count)
+        face_winding += np.bincount(tri_faces[samples], weights=winding * areas, minlength=face_count)
+
+    has_area = face_area > 0.0
+    interior[has_area] = face_winding[has_area] / face_area[has_area] > threshold
+    return interior
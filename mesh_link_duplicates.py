@@ -0,0 +1,361 @@
+bl_info = {
+    "name": "Link Duplicate Meshes",
+    "author": "rpopovici",
+    "version": (0, 1),
+    "blender": (2, 80, 0),
+    "location": "(Object Mode) Object > Link Duplicate Meshes",
+    "description": "Relink identical mesh datablocks to one shared mesh",
+    "warning": "",
+    "wiki_url": "https://github.com/rpopovici/mesh-utils",
+    "category": "Mesh",
+    }
+
+import hashlib
+import bpy
+from collections import defaultdict
+from mathutils import Matrix
+from . import auto_load
+
+# loaded on first use
+np = auto_load.lazy_import("numpy")
+mesh_arrays = auto_load.lazy_import(".mesh_arrays", __package__)
+
+# Meshes are grouped by a hash of everything except the vertex positions:
+# topology, materials, every generic attribute, legacy per element properties,
+# UVs, vertex colors, custom normals and deform weights. Positions are compared
+# separately, a duplicate may be a moved, rotated or uniformly scaled copy and
+# its objects get that transform instead.
+
+# generic attribute data types, the property holding the values and its width
+ATTRIBUTE_VALUES = {
+    'FLOAT': ("value", "float32", 1),
+    'INT': ("value", "int32", 1),
+    'INT8': ("value", "int8", 1),
+    'BOOLEAN': ("value", "bool", 1),
+    'FLOAT2': ("vector", "float32", 2),
+    'INT32_2D': ("value", "int32", 2),
+    'FLOAT_VECTOR': ("vector", "float32", 3),
+    'FLOAT_COLOR': ("color", "float32", 4),
+    'BYTE_COLOR': ("color", "float32", 4),
+    'QUATERNION': ("value", "float32", 4),
+    'FLOAT4X4': ("value", "float32", 16),
+}
+# per element properties of versions before generic attributes, read when they exist
+LEGACY_PROPERTIES = (
+    ("vertices", bpy.types.MeshVertex, ("bevel_weight",)),
+    ("edges", bpy.types.MeshEdge, ("use_seam", "use_edge_sharp", "crease", "bevel_weight", "use_freestyle_mark")),
+    ("polygons", bpy.types.MeshPolygon, ("use_smooth", "use_freestyle_mark")),
+)
+# selection state is not worth keeping meshes apart
+IGNORED_PREFIXES = (".select", ".vs.", ".es.")
+# custom normals are hashed at this precision
+NORMAL_STEPS = 10000
+
+def read_attribute(attribute):
+    # None for data types without bulk access
+    if attribute.data_type == 'STRING':
+        return np.frombuffer("\0".join(item.value for item in attribute.data).encode(), dtype=np.uint8)
+    if attribute.data_type not in ATTRIBUTE_VALUES:
+        return None
+    (prop, dtype, width) = ATTRIBUTE_VALUES[attribute.data_type]
+    return mesh_arrays.foreach_get(attribute.data, prop, dtype, width)
+
+def read_custom_normals(mesh):
+    if hasattr(mesh, "corner_normals"):
+        normals = mesh_arrays.foreach_get(mesh.corner_normals, "vector", np.float32, 3)
+    else:
+        mesh.calc_normals_split()
+        normals = mesh_arrays.foreach_get(mesh.loops, "normal", np.float32, 3)
+    return np.round(normals * NORMAL_STEPS).astype(np.int16)
+
+def read_deform_weights(mesh):
+    # vertex group weights have no bulk access
+    counts = np.fromiter((len(vertex.groups) for vertex in mesh.vertices), dtype=np.int32, count=len(mesh.vertices))
+    groups = np.fromiter((element.group for vertex in mesh.vertices for element in vertex.groups), dtype=np.int32)
+    weights = np.fromiter((element.weight for vertex in mesh.vertices for element in vertex.groups), dtype=np.float32)
+    return [counts, groups, weights]
+
+def read_mesh_arrays(mesh, users):
+    # (coords, header, arrays), None when some data can't be compared
+    coords = mesh_arrays.get_vertex_coords(mesh).astype(np.float64)
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(mesh)
+    header = [
+        [material.name if material else None for material in mesh.materials],
+        # deform weights refer to the vertex groups of the objects by index
+        sorted({tuple(group.name for group in obj.vertex_groups) for obj in users}),
+        [getattr(mesh, prop, None) for prop in ("use_auto_smooth", "auto_smooth_angle", "has_custom_normals")],
+    ]
+    arrays = [
+        mesh_arrays.get_loop_vertices(mesh),
+        loop_total,
+        mesh_arrays.foreach_get(mesh.polygons, "material_index", np.int32),
+        mesh_arrays.foreach_get(mesh.edges, "vertices", np.int32, 2),
+    ]
+
+    attributes = getattr(mesh, "attributes", None)
+    for attribute in attributes if attributes is not None else ():
+        if attribute.name == "position" or attribute.name.startswith(IGNORED_PREFIXES):
+            continue
+        values = read_attribute(attribute)
+        if values is None:
+            return None
+        header.append((attribute.name, attribute.domain, attribute.data_type))
+        arrays.append(values)
+
+    for (collection, element_type, props) in LEGACY_PROPERTIES:
+        for prop in props:
+            if prop in element_type.bl_rna.properties:
+                arrays.append(mesh_arrays.foreach_get(getattr(mesh, collection), prop, np.float32))
+    for uv_layer in mesh.uv_layers:
+        header.append(uv_layer.name)
+        arrays.append(mesh_arrays.get_loop_uvs(mesh, uv_layer.name))
+    for color_layer in getattr(mesh, "vertex_colors", ()):
+        header.append(color_layer.name)
+        arrays.append(mesh_arrays.foreach_get(color_layer.data, "color", np.float32, 4))
+
+    if getattr(mesh, "has_custom_normals", False):
+        arrays.append(read_custom_normals(mesh))
+    if any(obj.vertex_groups for obj in users):
+        arrays.extend(read_deform_weights(mesh))
+    return (coords, repr(header), arrays)
+
+def fingerprint(header, arrays):
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(header.encode())
+    for array in arrays:
+        digest.update(str((array.dtype, array.shape)).encode())
+        digest.update(np.ascontiguousarray(array).data)
+    return digest.hexdigest()
+
+def mesh_size(coords, arrays):
+    # rough memory footprint of the mesh data
+    return coords.nbytes // 2 + sum(array.nbytes for array in arrays)
+
+def choose_frame(coords, tolerance):
+    # vertex indices spanning the mesh, far apart so the frame is well conditioned
+    # (a, b, None) for flat meshes, None for meshes without a plane, those are matched by translation only
+    if len(coords) == 0:
+        return None
+    offset = coords - coords[0]
+    a = int(np.argmax(np.einsum('ij,ij->i', offset, offset)))
+    axis = offset[a] / max(np.linalg.norm(offset[a]), 1e-300)
+    off_axis = offset - np.outer(offset @ axis, axis)
+    b = int(np.argmax(np.einsum('ij,ij->i', off_axis, off_axis)))
+    if np.linalg.norm(off_axis[b]) <= tolerance:
+        return None
+    normal = np.cross(offset[a], offset[b])
+    normal /= np.linalg.norm(normal)
+    height = np.abs(offset @ normal)
+    c = int(np.argmax(height))
+    return (a, b, c if height[c] > tolerance else None)
+
+def frames(coords, frame):
+    # (count, 3, 3) frame matrices, columns are the frame axes of every mesh
+    if frame is None:
+        return np.broadcast_to(np.eye(3), (len(coords), 3, 3)).copy()
+    (a, b, c) = frame
+    e1 = coords[:, a] - coords[:, 0]
+    e2 = coords[:, b] - coords[:, 0]
+    if c is not None:
+        e3 = coords[:, c] - coords[:, 0]
+    else:
+        # flat meshes, the normal scaled like the mesh
+        e3 = np.cross(e1, e2)
+        e3 /= np.sqrt(np.linalg.norm(e1, axis=1) * np.linalg.norm(e2, axis=1))[:, None]
+    return np.stack((e1, e2, e3), axis=2)
+
+def fit_similarity(source, targets, source_frame, target_frames):
+    # transforms taking source to every target, rotation, uniform scale and translation only
+    # returns (k, 4, 4) matrices and the largest vertex distance left for every target
+    linear = target_frames @ np.linalg.inv(source_frame)
+    (u, singular, vt) = np.linalg.svd(linear)
+    rotation = u @ vt
+    scale = singular.mean(axis=1)
+    # plain translations stay exact
+    identity = (np.abs(rotation - np.eye(3)).max(axis=(1, 2)) < 1e-6) & (np.abs(scale - 1.0) < 1e-6)
+    rotation[identity] = np.eye(3)
+    scale[identity] = 1.0
+    linear = rotation * scale[:, None, None]
+
+    moved = np.einsum('kij,vj->kvi', linear, source)
+    translation = (targets - moved).mean(axis=1) if targets.shape[1] else np.zeros((len(targets), 3))
+    error = np.abs(moved + translation[:, None] - targets).max(axis=(1, 2), initial=0.0)
+    # mirrored copies would flip their faces
+    error[np.linalg.det(rotation) < 0] = np.inf
+
+    transforms = np.broadcast_to(np.eye(4), (len(targets), 4, 4)).copy()
+    transforms[:, :3, :3] = linear
+    transforms[:, :3, 3] = translation
+    return (transforms, error)
+
+def cluster_coords(coords, tolerance):
+    # coords (count, vertices, 3) of meshes sharing the topology
+    # returns [(shared index, [(duplicate index, transform), ...]), ...]
+    # Every mesh is mapped into its own frame, spanned by the same vertex indices,
+    # which leaves identical positions for moved, rotated and scaled copies. The
+    # meshes are sorted by a weighted sum of those positions and only runs of
+    # close sums are compared. Meshes whose frame is degenerate get another round
+    # with a frame picked from one of them.
+    weights = np.random.default_rng(0).random(coords.shape[1] * 3)
+    weights /= weights.sum()
+    clusters = []
+    remaining = np.arange(len(coords))
+    while len(remaining):
+        frame = choose_frame(coords[remaining[0]], tolerance)
+        mesh_frames = frames(coords[remaining], frame)
+        norms = np.linalg.norm(mesh_frames, axis=1)
+        valid = np.abs(np.linalg.det(mesh_frames)) > 1e-9 * norms.prod(axis=1)
+        valid[0] = True
+        (members, mesh_frames) = (remaining[valid], mesh_frames[valid])
+        remaining = remaining[~valid]
+
+        local = coords[members] - coords[members, :1]
+        canonical = np.einsum('kij,kvj->kvi', np.linalg.inv(mesh_frames), local)
+        signature = canonical.reshape(len(members), -1) @ weights
+        gap = 4.0 * tolerance / max(float(norms[valid].min()), 1e-12)
+
+        order = np.argsort(signature, kind='stable')
+        runs = np.split(order, np.flatnonzero(np.diff(signature[order]) > gap) + 1)
+        for run in runs:
+            # the first mesh of a run is kept
+            run = np.sort(run)
+            while len(run):
+                (shared, others) = (run[0], run[1:])
+                (transforms, error) = fit_similarity(coords[members[shared]], coords[members[others]],
+                    mesh_frames[shared], mesh_frames[others])
+                match = error <= tolerance
+                clusters.append((members[shared], list(zip(members[others[match]], transforms[match]))))
+                run = others[~match]
+    return clusters
+
+def group_duplicate_meshes(meshes, users, tolerance):
+    # [(shared mesh, [(duplicate mesh, transform), ...], bytes per duplicate)]
+    # cheap size key first, only meshes sharing it are read and hashed
+    by_size = defaultdict(list)
+    for mesh in meshes:
+        by_size[(len(mesh.vertices), len(mesh.edges), len(mesh.loops), len(mesh.polygons), len(mesh.uv_layers))].append(mesh)
+
+    groups = []
+    for candidates in by_size.values():
+        if len(candidates) < 2:
+            continue
+        by_hash = defaultdict(list)
+        contents = {}
+        for mesh in candidates:
+            data = read_mesh_arrays(mesh, users[mesh])
+            if data is None:
+                continue
+            (coords, header, arrays) = data
+            key = fingerprint(header, arrays)
+            # hash collisions are ruled out by comparing the arrays
+            if key in contents:
+                (first_header, first_arrays) = contents[key]
+                if header != first_header or not all(np.array_equal(a, b) for (a, b) in zip(arrays, first_arrays)):
+                    continue
+            contents.setdefault(key, (header, arrays))
+            by_hash[key].append((mesh, coords))
+
+        for (key, members) in by_hash.items():
+            if len(members) < 2:
+                continue
+            coords = np.stack([coords for (mesh, coords) in members])
+            size = mesh_size(coords[0], contents[key][1])
+            for (shared, duplicates) in cluster_coords(coords, tolerance):
+                if duplicates:
+                    groups.append((members[shared][0], [(members[index][0], transform) for (index, transform) in duplicates], size))
+    return groups
+
+def relink_mesh(objects, shared, transform):
+    # the duplicate is the shared mesh transformed, the objects get the transform instead
+    # returns False when an object can't take the transform, e.g. a rotation on a non-uniform scale
+    transform = Matrix(transform.tolist())
+    bases = [obj.matrix_basis @ transform for obj in objects]
+    for basis in bases:
+        (location, rotation, scale) = basis.decompose()
+        composed = Matrix.Translation(location) @ rotation.to_matrix().to_4x4() @ Matrix.Diagonal(scale.to_4d())
+        if max(abs(a - b) for (row, composed_row) in zip(basis, composed) for (a, b) in zip(row, composed_row)) > 1e-5 * max(scale.length, 1.0):
+            return False
+
+    inverse = transform.inverted()
+    for (obj, basis) in zip(objects, bases):
+        obj.data = shared
+        if transform != Matrix.Identity(4):
+            obj.matrix_basis = basis
+            # children keep their place
+            for child in obj.children:
+                child.matrix_parent_inverse = inverse @ child.matrix_parent_inverse
+    return True
+
+def link_duplicate_meshes(objects, tolerance, remove_unused):
+    users = defaultdict(list)
+    for obj in objects:
+        if obj.type == 'MESH' and obj.data.shape_keys is None and not obj.data.library:
+            users[obj.data].append(obj)
+
+    # meshes used by objects outside the given ones are left alone
+    meshes = [mesh for (mesh, mesh_users) in users.items() if mesh.users == len(mesh_users)]
+    relinked = 0
+    saved = 0
+    for (shared, duplicates, size) in group_duplicate_meshes(meshes, users, tolerance):
+        for (mesh, transform) in duplicates:
+            if not relink_mesh(users[mesh], shared, transform):
+                continue
+            relinked += 1
+            saved += size
+            if remove_unused and mesh.users == 0:
+                bpy.data.meshes.remove(mesh)
+    return (relinked, saved)
+
+class LinkDuplicateMeshes(bpy.types.Operator):
+    """Relink identical meshes to one shared mesh datablock"""
+    bl_idname = 'object.link_duplicate_meshes'
+    bl_label = 'Link Duplicate Meshes'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    only_selected: bpy.props.BoolProperty(
+        name = "Only Selected",
+        default = True,
+        description = "Check selected objects only, otherwise all objects in the scene",
+        )
+
+    tolerance: bpy.props.FloatProperty(
+        name = "Tolerance",
+        subtype = 'DISTANCE',
+        default = 0.00001,
+        min = 0.0000001,
+        max = 1.0,
+        precision = 6,
+        description = "Maximum vertex position difference, moved, rotated and uniformly scaled copies of a mesh count as duplicates",
+        unit = 'LENGTH',
+        )
+
+    remove_unused: bpy.props.BoolProperty(
+        name = "Remove Unused",
+        default = False,
+        description = "Delete the duplicate mesh datablocks right away instead of leaving them without users",
+        )
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def execute(self, context):
+        objects = context.selected_objects if self.only_selected else context.scene.objects
+        (relinked, saved) = link_duplicate_meshes(objects, self.tolerance, self.remove_unused)
+        self.report({'INFO'}, "%d duplicate meshes linked, about %.1f MB saved" % (relinked, saved / (1024 * 1024)))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return self.execute(context)
+
+def menu_func(self, context):
+    self.layout.separator()
+    self.layout.operator(LinkDuplicateMeshes.bl_idname, text="Link Duplicate Meshes")
+
+def register():
+    # bpy.utils.register_class(LinkDuplicateMeshes)
+    bpy.types.VIEW3D_MT_object.append(menu_func)
+
+def unregister():
+    # bpy.utils.unregister_class(LinkDuplicateMeshes)
+    bpy.types.VIEW3D_MT_object.remove(menu_func)
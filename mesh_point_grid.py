@@ -0,0 +1,87 @@
+import numpy as np
+
+# Nearest point lookups within a distance over a sparse uniform grid.
+# Points are hashed into int64 cell keys and sorted. Cells are at least four
+# times the search distance wide, so a query only reaches the 8 cells around
+# the cell corner closest to it, and most queries only their own cell.
+
+# upper bound for (query, point) candidate pairs tested at once
+MAX_CANDIDATES = 1 << 22
+# cells per axis, keeps the cell keys inside int64
+MAX_CELLS = 1 << 20
+
+CORNERS = np.array([(x, y, z) for x in (0, 1) for y in (0, 1) for z in (0, 1)])
+
+def grid_from_bounds(co_min, co_max, distance):
+    # cells at least 4 * distance wide, one empty cell on each side of the points
+    extent = float((co_max - co_min).max())
+    cell_size = max(4.0 * distance, extent / (MAX_CELLS - 3)) or 1.0
+    origin = co_min - cell_size
+    shape = np.floor((co_max - co_min) / cell_size).astype(np.int64) + 3
+    return (origin, cell_size, shape)
+
+def cell_keys(cells, shape):
+    return (cells[:, 0] * shape[1] + cells[:, 1]) * shape[2] + cells[:, 2]
+
+def find_nearest(points, queries, distance):
+    # index of the nearest point within distance of every query, -1 where there is none
+    points = np.asarray(points, dtype=np.float64)
+    queries = np.asarray(queries, dtype=np.float64)
+    nearest = np.full(len(queries), -1, dtype=np.int64)
+    if len(points) == 0 or len(queries) == 0:
+        return nearest
+
+    (origin, cell_size, shape) = grid_from_bounds(points.min(axis=0), points.max(axis=0), distance)
+    keys = cell_keys(np.floor((points - origin) / cell_size).astype(np.int64), shape)
+    order = np.argsort(keys, kind='stable')
+    (cell_ids, cell_start, cell_count) = np.unique(keys[order], return_index=True, return_counts=True)
+    points = points[order]
+
+    # queries far outside the grid are clamped to its empty border cells,
+    # points and queries are sorted by cell so lookups run mostly in memory order
+    local = np.clip((queries - origin) / cell_size, -1.0, shape)
+    query_cells = np.floor(local).astype(np.int64)
+    offset = local - query_cells
+    side = np.where(offset < 0.5, -1, 1)
+    # the neighbour cells along every axis within reach
+    near = np.minimum(offset, 1.0 - offset) * cell_size <= distance
+    query_order = np.argsort(cell_keys(query_cells, shape), kind='stable')
+    (queries, query_cells, side, near) = (queries[query_order], query_cells[query_order], side[query_order], near[query_order])
+
+    best = np.full(len(queries), np.inf)
+    found_points = np.full(len(queries), -1, dtype=np.int64)
+    for corner in CORNERS:
+        index = np.flatnonzero(np.all(near[:, corner == 1], axis=1))
+        cells = query_cells[index] + side[index] * corner
+        inside = np.all((cells >= 0) & (cells < shape), axis=1)
+        (index, cells) = (index[inside], cells[inside])
+        query_keys = cell_keys(cells, shape)
+        found = np.minimum(np.searchsorted(cell_ids, query_keys), len(cell_ids) - 1)
+        hit = cell_ids[found] == query_keys
+        (index, first, counts) = (index[hit], cell_start[found[hit]], cell_count[found[hit]])
+
+        # split queries in chunks with a bounded number of candidate pairs
+        ends = np.cumsum(counts)
+        start = 0
+        while start < len(index):
+            stop = max(int(np.searchsorted(ends, ends[start] - counts[start] + MAX_CANDIDATES, side='right')), start + 1)
+            chunk_counts = counts[start:stop]
+            segments = np.cumsum(chunk_counts) - chunk_counts
+            pairs = np.repeat(np.arange(start, stop), chunk_counts)
+            rank = np.arange(len(pairs)) - np.repeat(segments, chunk_counts)
+            candidates = first[pairs] + rank
+            dist = np.linalg.norm(points[candidates] - queries[index[pairs]], axis=1)
+            candidates = order[candidates]
+
+            # closest candidate of every query, lower index on ties, candidates of a query are contiguous
+            query = index[start:stop]
+            dist_min = np.minimum.reduceat(dist, segments)
+            tied = np.where(dist == np.repeat(dist_min, chunk_counts), candidates, np.iinfo(np.int64).max)
+            (candidates, dist) = (np.minimum.reduceat(tied, segments), dist_min)
+            better = (dist <= distance) & ((dist < best[query]) | ((dist == best[query]) & (candidates < found_points[query])))
+            best[query[better]] = dist[better]
+            found_points[query[better]] = candidates[better]
+            start = stop
+
+    nearest[query_order] = found_points
+    return nearest
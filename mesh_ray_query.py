@@ -0,0 +1,104 @@
+import numpy as np
+from . import mesh_bvh
+
+# Batched ray queries against a mesh_bvh triangle BVH.
+# Whole arrays of rays are traversed together as a frontier of (ray, node) pairs,
+# so there is no Python call per ray like with BVHTree.ray_cast.
+
+# number of rays traversed together
+BATCH_SIZE = 1 << 16
+
+def dot(a, b):
+    return np.einsum('ij,ij->i', a, b)
+
+def safe_directions(directions):
+    # avoid zero components, the slab test divides by them
+    directions = np.asarray(directions, dtype=np.float64)
+    return np.where(np.abs(directions) < 1e-30, 1e-30, directions)
+
+def ray_box(origins, inv_directions, bbox_min, bbox_max):
+    # slab test, returns entry and exit distance
+    t0 = (bbox_min - origins) * inv_directions
+    t1 = (bbox_max - origins) * inv_directions
+    near = np.minimum(t0, t1)
+    far = np.maximum(t0, t1)
+    t_enter = np.maximum(np.maximum(near[:, 0], near[:, 1]), near[:, 2])
+    t_exit = np.minimum(np.minimum(far[:, 0], far[:, 1]), far[:, 2])
+    return (t_enter, t_exit)
+
+def ray_triangle(origins, directions, tri_coords, t_min):
+    # Moller-Trumbore, returns hit distance or inf
+    v0 = tri_coords[:, 0]
+    e1 = tri_coords[:, 1] - v0
+    e2 = tri_coords[:, 2] - v0
+    p = np.cross(directions, e2)
+    det = dot(e1, p)
+    valid = np.abs(det) > 1e-20
+    inv_det = 1.0 / np.where(valid, det, 1.0)
+
+    s = origins - v0
+    u = dot(s, p) * inv_det
+    q = np.cross(s, e1)
+    v = dot(directions, q) * inv_det
+    t = dot(e2, q) * inv_det
+
+    valid &= (u >= 0.0) & (v >= 0.0) & (u + v <= 1.0) & (t > t_min)
+    return np.where(valid, t, np.inf)
+
+def traverse(bvh, tri_coords, origins, directions, max_dist, t_min, any_hit):
+    distance = np.full(len(origins), max_dist, dtype=np.float64)
+    tri_index = np.full(len(origins), -1, dtype=np.int64)
+
+    for batch_start in range(0, len(origins), BATCH_SIZE):
+        batch = slice(batch_start, batch_start + BATCH_SIZE)
+        o = np.asarray(origins[batch], dtype=np.float64)
+        d = safe_directions(directions[batch])
+        inv_d = 1.0 / d
+        best = distance[batch]
+        best_tri = tri_index[batch]
+
+        rays = np.arange(len(o))
+        nodes = np.zeros(len(o), dtype=np.int64)
+        while len(rays):
+            # drop nodes missed by the ray or behind the closest hit so far
+            (t_enter, t_exit) = ray_box(o[rays], inv_d[rays], bvh.bbox_min[nodes], bvh.bbox_max[nodes])
+            keep = (t_enter <= t_exit) & (t_exit >= t_min) & (t_enter <= best[rays])
+            if any_hit:
+                keep &= best_tri[rays] < 0
+            rays = rays[keep]
+            nodes = nodes[keep]
+
+            leaf = bvh.left[nodes] < 0
+            (leaf_rays, leaf_tris) = mesh_bvh.expand_leaves(bvh, rays[leaf], nodes[leaf])
+            t = ray_triangle(o[leaf_rays], d[leaf_rays], tri_coords[leaf_tris], t_min)
+            hit = t < best[leaf_rays]
+            (leaf_rays, leaf_tris, t) = (leaf_rays[hit], leaf_tris[hit], t[hit])
+
+            # farthest first, so the closest hit per ray is written last
+            order = np.argsort(-t, kind='stable')
+            best[leaf_rays[order]] = t[order]
+            best_tri[leaf_rays[order]] = leaf_tris[order]
+
+            inner = ~leaf
+            rays = np.repeat(rays[inner], 2)
+            nodes = np.stack((bvh.left[nodes[inner]], bvh.right[nodes[inner]]), axis=1).ravel()
+
+        distance[batch] = best
+        tri_index[batch] = best_tri
+
+    return (distance, tri_index)
+
+def closest_hit(bvh, tri_coords, origins, directions, max_dist=np.inf, t_min=0.0):
+    # returns (hit, distance, triangle index), distance is along the direction vector
+    (distance, tri_index) = traverse(bvh, tri_coords, origins, directions, max_dist, t_min, False)
+    hit = tri_index >= 0
+    return (hit, distance, tri_index)
+
+def any_hit(bvh, tri_coords, origins, directions, max_dist=np.inf, t_min=0.0):
+    (distance, tri_index) = traverse(bvh, tri_coords, origins, directions, max_dist, t_min, True)
+    return tri_index >= 0
+
+def hit_distance(bvh, tri_coords, origins, directions, max_dist=np.inf, t_min=0.0):
+    # distance to the closest hit, inf when nothing was hit
+    (hit, distance, tri_index) = closest_hit(bvh, tri_coords, origins, directions, max_dist, t_min)
+    return np.where(hit, distance, np.inf)
@@ -11,53 +11,74 @@ bl_info = {
     }
 
 import bpy
-import bmesh
-from mathutils import Vector
-
-def hit_test(pixels, resolution, xpos, ypos):
-    count = 0
-    for i in range(-1, 2):
-        for j in range(-1, 2):
-            red = pixels[4 * (xpos + i + resolution * (ypos + j)) + 0]
-            alpha = pixels[4 * (xpos + i + resolution * (ypos + j)) + 3]
-            if (red == 0) and (alpha != 0):
-                count += 1
-    return count > 0
+from . import auto_load
+from . import preferences
+
+# loaded on first use
+np = auto_load.lazy_import("numpy")
+mesh_arrays = auto_load.lazy_import(".mesh_arrays", __package__)
+mesh_interior_voxel = auto_load.lazy_import(".mesh_interior_voxel", __package__)
+mesh_interior_winding = auto_load.lazy_import(".mesh_interior_winding", __package__)
+mesh_bvh = auto_load.lazy_import(".mesh_bvh", __package__)
+mesh_ray_query = auto_load.lazy_import(".mesh_ray_query", __package__)
+mesh_cache = auto_load.lazy_import(".mesh_cache", __package__)
+mesh_chunks = auto_load.lazy_import(".mesh_chunks", __package__)
+
+AO_UV_LAYER = "__AO_UV_LAYER__"
+
+# peak memory per winding number sample, mostly the BVH traversal frontier
+WINDING_BYTES_PER_SAMPLE = 64 * 1024
+# peak memory per voxel, three bit-packed grids exist at once
+VOXEL_BYTES_PER_VOXEL = 3 / 8
 
 # clean-up light leaks
-def clean_up(pixels, resolution):
-    for xpos in range(1, resolution - 1):
-        for ypos in range(1, resolution - 1):
-            red = pixels[4 * (xpos + resolution * ypos) + 0]
-            alpha = pixels[4 * (xpos + resolution * ypos) + 3]
-            if (red != 0) and (alpha != 0):
-                count = 0
-                for i in range(-1, 2):
-                    for j in range(-1, 2):
-                        r = pixels[4 * (xpos + i + resolution * (ypos + j)) + 0]
-                        a = pixels[4 * (xpos + i + resolution * (ypos + j)) + 3]
-                        if (r != 0) and (a != 0):
-                            count += 1
-                if (count > 0) and (count < 3):
-                    # remove pixel
-                    pixels[4 * (xpos + resolution * ypos) + 0] = 0.0
-
-
-def hit_test_area(pixels, resolution, xpos_min, ypos_min, xpos_max, ypos_max):
+def clean_up(lit):
+    # count lit pixels in every 3x3 neighbourhood, pixel itself included
+    padded = np.pad(lit, 1).astype(np.uint8)
+    (height, width) = lit.shape
+    count = np.zeros(lit.shape, dtype=np.uint8)
+    for i in range(3):
+        for j in range(3):
+            count += padded[j:j + height, i:i + width]
+
+    # remove lit pixels with less than two lit neighbours, border excluded
+    leak = lit & (count < 3)
+    leak[0, :] = leak[-1, :] = False
+    leak[:, 0] = leak[:, -1] = False
+    return lit & ~leak
+
+def build_area_table(lit):
+    # summed area table, lets us count lit pixels in any rectangle in O(1)
+    (height, width) = lit.shape
+    table = np.zeros((height + 1, width + 1), dtype=np.int64)
+    table[1:, 1:] = lit.cumsum(axis=0).cumsum(axis=1)
+    return table
+
+def hit_test_area(area_table, xpos_min, ypos_min, xpos_max, ypos_max):
     tolerance = 1
-    count = 0
-    for i in range(xpos_min, xpos_max + 1):
-        for j in range(ypos_min, ypos_max + 1):
-            red = pixels[4 * (i + resolution * j) + 0]
-            alpha = pixels[4 * (i + resolution * j) + 3]
-            if (red != 0) and (alpha != 0):
-                count += 1
+    count = (area_table[ypos_max + 1, xpos_max + 1] - area_table[ypos_min, xpos_max + 1]
+        - area_table[ypos_max + 1, xpos_min] + area_table[ypos_min, xpos_min])
     return count < tolerance
 
+def classify_interior_faces(mesh, area_table, resolution):
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(mesh)
+    uvs = mesh_arrays.get_loop_uvs(mesh, AO_UV_LAYER)
 
-def select_interior_faces(context, obj, bake_type, resolution, samples, bounces):
+    # face bbox in pixel space
+    pos = np.clip(np.rint(uvs * (resolution - 1)), 0, resolution - 1).astype(np.int64)
+    xpos_min = np.minimum.reduceat(pos[:, 0], loop_start)
+    xpos_max = np.maximum.reduceat(pos[:, 0], loop_start)
+    ypos_min = np.minimum.reduceat(pos[:, 1], loop_start)
+    ypos_max = np.maximum.reduceat(pos[:, 1], loop_start)
+
+    # select face if there is no lit pixel inside its bbox
+    return hit_test_area(area_table, xpos_min, ypos_min, xpos_max, ypos_max)
+
+
+def select_interior_faces(context, objects, bake_type, resolution, samples, bounces):
     ao_map_size = resolution
     selected_objects = bpy.context.selected_objects
+    meshes = list({obj.data for obj in objects})
     context.scene.render.engine = 'CYCLES'
     context.scene.cycles.samples = samples
     #bpy.context.scene.render.layers["RenderLayer"].cycles.use_denoising = True
@@ -106,15 +127,22 @@ def select_interior_faces(context, obj, bake_type, resolution, samples, bounces)
     #world.cycles.max_bounces = 2048
     #world.cycles.volume_sampling = "MULTIPLE_IMPORTANCE"
 
+    # only the bake targets are packed and baked, everything else acts as occluder
+    for obj in selected_objects:
+        if obj not in objects:
+            obj.select_set(False)
+
     # add new UV layer
-    uv_layer =  obj.data.uv_layers.get("__AO_UV_LAYER__")
-    if not uv_layer:
-        uv_layer = obj.data.uv_layers.new(name="__AO_UV_LAYER__")
-    uv_layer.active = True
+    for me in meshes:
+        uv_layer = me.uv_layers.get(AO_UV_LAYER)
+        if not uv_layer:
+            uv_layer = me.uv_layers.new(name=AO_UV_LAYER)
+        uv_layer.active = True
 
     # quick face unwrap
     #bpy.ops.mesh.select_all(action='SELECT')
     #bpy.ops.uv.smart_project(angle_limit=1.0, island_margin=0.01, user_area_weight=0.0, use_aspect=True, stretch_to_bounds=True)
+    # PREF_PACK_IN_ONE packs the faces of all selected meshes into one shared atlas
     bpy.ops.uv.lightmap_pack(PREF_CONTEXT='ALL_FACES', PREF_PACK_IN_ONE=True, PREF_NEW_UVLAYER=False, PREF_APPLY_IMAGE=False, PREF_IMG_PX_SIZE=ao_map_size, PREF_BOX_DIV=12, PREF_MARGIN_DIV=0.2)
     bpy.ops.mesh.select_all(action='DESELECT')
 
@@ -143,24 +171,27 @@ def select_interior_faces(context, obj, bake_type, resolution, samples, bounces)
     # # link emission shader to material
     # bake_material.node_tree.links.new(material_output.inputs[0], emission.outputs[0])
 
-    old_mat = None
-    # Assign material to object
-    if obj.data.materials:
-        # assign to 1st material slot
-        old_mat = obj.data.materials[0]
-        obj.data.materials[0] = bake_material
-    else:
-        # no slots
-        obj.data.materials.append(bake_material)
+    old_mats = {}
+    # Assign material to every mesh
+    for me in meshes:
+        if me.materials:
+            # assign to 1st material slot
+            old_mats[me] = me.materials[0]
+            me.materials[0] = bake_material
+        else:
+            # no slots
+            me.materials.append(bake_material)
 
-    obj.active_material_index = 0
+    for obj in objects:
+        obj.active_material_index = 0
 
     # activating the object
     #bpy.context.scene.objects.active = obj
-    bpy.context.view_layer.objects.active = obj
+    if context.view_layer.objects.active not in objects:
+        context.view_layer.objects.active = objects[0]
 
     # create a new image and assign it to the image texture node
-    ao_map = bpy.data.images.new(name=(obj.name + "_AO"), width = ao_map_size, height = ao_map_size)
+    ao_map = bpy.data.images.new(name=(context.view_layer.objects.active.name + "_AO"), width = ao_map_size, height = ao_map_size)
     image_texture_node.image = ao_map
 
     # hide from rendering
@@ -170,77 +201,158 @@ def select_interior_faces(context, obj, bake_type, resolution, samples, bounces)
 
     # ['COMBINED', 'AO', 'SHADOW', 'NORMAL', 'UV', 'ROUGHNESS', 'EMIT', 'ENVIRONMENT', 'DIFFUSE', 'GLOSSY', 'TRANSMISSION', 'SUBSURFACE']
     # pass_filter = {'NONE', 'AO', 'EMIT', 'DIRECT', 'INDIRECT', 'COLOR', 'DIFFUSE', 'GLOSSY', 'TRANSMISSION', 'SUBSURFACE'}
+    # a single bake pass for all target objects
     bpy.ops.object.bake(type = bake_type,  width = resolution, height = resolution, margin = 0) #, uv_layer = uv_layer.name)
 
-    # select "black" faces from AO
-    me = obj.data
-    bm = bmesh.from_edit_mesh(me)
-
-    #uv_layer = bm.loops.layers.uv.verify()
-    #bm.faces.layers.tex.verify()
-    uv_layer = bm.loops.layers.uv.get("__AO_UV_LAYER__")
+    # Extract pixels to new array for performance gain
+    pixels = np.empty(resolution * resolution * 4, dtype=np.float32)
+    ao_map.pixels.foreach_get(pixels)
+    pixels = pixels.reshape(resolution, resolution, 4)
+
+    # anything not black in the RED channel is lit
+    lit = (pixels[:, :, 0] != 0) & (pixels[:, :, 3] != 0)
+    area_table = build_area_table(clean_up(lit))
+    del pixels
+
+    # select "black" faces from AO, sync edit meshes once for all objects
+    mode = context.object.mode
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    for me in meshes:
+        if me.polygons:
+            face_select = classify_interior_faces(me, area_table, resolution)
+            # hidden faces keep their selection
+            hide = mesh_arrays.get_flags(me.polygons, "hide")
+            face_select[hide] = mesh_arrays.get_flags(me.polygons, "select")[hide]
+            mesh_arrays.set_face_selection(me, face_select)
+
+        # clean up
+        uv_layer = me.uv_layers.get(AO_UV_LAYER)
+        me.uv_layers.remove(uv_layer)
+
+        if me in old_mats:
+            me.materials[0] = old_mats[me]
+        else:
+            me.materials.pop()
+
+    bpy.ops.object.mode_set(mode=mode)
 
-    # down scale Uvs
-    # for f in bm.faces:
-    #     for l in f.loops:
-    #         l[uv_layer].uv *= 0.99
-    #         l[uv_layer].uv += Vector((0.005, 0.005))
+    bpy.data.images.remove(ao_map)
+    bpy.data.materials.remove(bake_material)
 
-    # Extract pixels to new array for performance gain
-    pixels_copy = list(ao_map.pixels[:])
-    clean_up(pixels_copy, resolution)
-
-    # determine bbox
-    xpos_min = float("inf")
-    xpos_max = float("-inf")
-    ypos_min = float("inf")
-    ypos_max = float("-inf")
-    for face in bm.faces:
-        if face.hide:
+    # restore selection
+    for obj in selected_objects:
+        obj.select_set(True)
+
+def cached_bvh(cache, tri_coords):
+    # BVH arrays are memory mapped from the cache on warm runs
+    arrays = mesh_cache.cached(cache, "bvh", {}, [tri_coords], lambda: mesh_bvh.build_bvh(tri_coords)._asdict())
+    return mesh_bvh.BVH(**arrays)
+
+def select_interior_faces_engine(context, objects, engine, params, find_interior_faces):
+    # sync edit meshes once for all objects
+    mode = context.object.mode
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    # all objects are classified together in world space so they occlude each other,
+    # relative to the first object so cached results survive moving the objects
+    origin = np.array(objects[0].matrix_world.translation, dtype=np.float64)
+    coords = []
+    tris = []
+    tri_faces = []
+    vert_offset = 0
+    face_offset = 0
+    for obj in objects:
+        (obj_tris, obj_tri_faces) = mesh_arrays.get_loop_triangles(obj.data)
+        coords.append(mesh_arrays.get_world_coords(obj, origin))
+        tris.append(obj_tris + vert_offset)
+        tri_faces.append(obj_tri_faces + face_offset)
+        vert_offset += len(obj.data.vertices)
+        face_offset += len(obj.data.polygons)
+
+    coords = np.concatenate(coords)
+    tris = np.concatenate(tris)
+    tri_faces = np.concatenate(tri_faces)
+    cache = preferences.get_cache(context)
+    result = mesh_cache.cached(cache, engine, params, [coords, tris, tri_faces],
+        lambda: {"interior": find_interior_faces(cache, coords, tris, tri_faces, face_offset)})
+    interior = np.array(result["interior"])
+
+    face_offset = 0
+    for obj in objects:
+        me = obj.data
+        face_select = interior[face_offset:face_offset + len(me.polygons)]
+        face_offset += len(me.polygons)
+        if me.polygons:
+            # hidden faces keep their selection
+            hide = mesh_arrays.get_flags(me.polygons, "hide")
+            face_select[hide] = mesh_arrays.get_flags(me.polygons, "select")[hide]
+            mesh_arrays.set_face_selection(me, face_select)
+
+    bpy.ops.object.mode_set(mode=mode)
+
+def fit_voxel_resolution(context, resolution):
+    # lowered until the grids fit the memory budget, cube shaped bounds are the worst case
+    budget = preferences.get_memory_budget(context)
+    if budget is None:
+        return resolution
+    # grids are padded by three voxels along every axis
+    return max(min(resolution, int((budget / VOXEL_BYTES_PER_VOXEL) ** (1 / 3)) - 3), 16)
+
+def select_interior_faces_voxel(context, objects, resolution):
+    def find_interior_faces(cache, coords, tris, tri_faces, face_count):
+        return mesh_interior_voxel.find_interior_faces(coords, tris, tri_faces, face_count, resolution)
+    select_interior_faces_engine(context, objects, "voxel", {"resolution": resolution}, find_interior_faces)
+
+def select_interior_faces_winding(context, objects, threshold, accuracy):
+    chunk_size = mesh_chunks.chunk_size(preferences.get_memory_budget(context), WINDING_BYTES_PER_SAMPLE)
+    def find_interior_faces(cache, coords, tris, tri_faces, face_count):
+        bvh = cached_bvh(cache, coords[tris]) if len(tris) else None
+        return mesh_interior_winding.find_interior_faces(coords, tris, tri_faces, face_count, threshold, accuracy, bvh, chunk_size)
+    select_interior_faces_engine(context, objects, "winding", {"threshold": threshold, "accuracy": accuracy}, find_interior_faces)
+
+def find_thin_faces(coords, tris, tri_faces, face_count, thickness, bvh=None):
+    tri_coords = coords[tris]
+    if bvh is None:
+        bvh = mesh_bvh.build_bvh(tri_coords)
+
+    normals = np.cross(tri_coords[:, 1] - tri_coords[:, 0], tri_coords[:, 2] - tri_coords[:, 0])
+    normals /= np.maximum(np.linalg.norm(normals, axis=1), 1e-30)[:, None]
+
+    # cast inward from every triangle, start just below the surface to skip itself
+    epsilon = 1e-6 * np.linalg.norm(coords.max(axis=0) - coords.min(axis=0))
+    origins = tri_coords.mean(axis=1) - normals * epsilon
+    (hit, distance, hit_tris) = mesh_ray_query.closest_hit(bvh, tri_coords, origins, -normals, max_dist=thickness)
+
+    # the opposite wall must be seen from its back side, the inside of the volume
+    facing = np.einsum('ij,ij->i', normals[hit_tris[hit]], -normals[hit]) > 0.0
+    thin = np.zeros(len(tris), dtype=bool)
+    thin[np.flatnonzero(hit)[facing]] = True
+    return np.bincount(tri_faces[thin], minlength=face_count) > 0
+
+def select_thin_walls(context, objects, thickness):
+    # sync edit meshes once for all objects
+    mode = context.object.mode
+    bpy.ops.object.mode_set(mode='OBJECT')
+
+    cache = preferences.get_cache(context)
+    for obj in objects:
+        me = obj.data
+        if not me.polygons:
             continue
-        face_select = True
-        for loop in face.loops:
-            luv = loop[uv_layer]
-            uv = luv.uv
-            xpos = round(uv.x * (resolution - 1))
-            ypos = round(uv.y * (resolution - 1))
-            if xpos_min > xpos:
-                xpos_min = xpos
-            if xpos_max < xpos:
-                xpos_max = xpos
-            if ypos_min > ypos:
-                ypos_min = ypos
-            if ypos_max < ypos:
-                ypos_max = ypos
-            # select face if RED color channel is black
-            #if ao_map.pixels[4 * (xpos + resolution * ypos) + 0] != 0:
-            #if not hit_test(pixels_copy, resolution, xpos, ypos):
-            #    face_select = False
-        if not hit_test_area(pixels_copy, resolution, xpos_min, ypos_min, xpos_max, ypos_max):
-            face_select = False
-        face.select_set(face_select)
-
-        xpos_min = float("inf")
-        xpos_max = float("-inf")
-        ypos_min = float("inf")
-        ypos_max = float("-inf")
-
-
-    bmesh.update_edit_mesh(me)
-
-    # clean up
-    bpy.data.images.remove(ao_map)
-    uv_layer = obj.data.uv_layers.get("__AO_UV_LAYER__")
-    obj.data.uv_layers.remove(uv_layer)
-    
-    if not old_mat:
-        bpy.ops.object.mode_set(mode='OBJECT')
-        bpy.ops.object.material_slot_remove()
-        bpy.ops.object.mode_set(mode='EDIT')
-    else:
-        obj.data.materials[0] = old_mat
+        (tris, tri_faces) = mesh_arrays.get_loop_triangles(me)
+        # world orientation and scale for the thickness, relative to the object for the cache
+        coords = mesh_arrays.get_world_coords(obj, np.array(obj.matrix_world.translation, dtype=np.float64))
+        result = mesh_cache.cached(cache, "thin_walls", {"thickness": thickness}, [coords, tris, tri_faces],
+            lambda: {"thin": find_thin_faces(coords, tris, tri_faces, len(me.polygons), thickness, cached_bvh(cache, coords[tris]))})
+        face_select = np.array(result["thin"])
 
-    bpy.data.materials.remove(bake_material)
+        # hidden faces keep their selection
+        hide = mesh_arrays.get_flags(me.polygons, "hide")
+        face_select[hide] = mesh_arrays.get_flags(me.polygons, "select")[hide]
+        mesh_arrays.set_face_selection(me, face_select)
+
+    bpy.ops.object.mode_set(mode=mode)
 
 
 class SelectInteriorFaces(bpy.types.Operator):
@@ -249,6 +361,17 @@ class SelectInteriorFaces(bpy.types.Operator):
     bl_label = 'Select interior faces'
     bl_options = {'REGISTER', 'UNDO'}
 
+    engine: bpy.props.EnumProperty(
+        items=[
+                ('BAKE', "Cycles Bake", "Detect occlusion by baking an AO/Diffuse map with Cycles"),
+                ('VOXEL', "Voxel", "Flood fill a voxel grid from the outside. Fast and deterministic, requires closed volumes"),
+                ('WINDING', "Winding Number", "Generalized winding number of the rest of the mesh in front of every face. Robust to holes"),
+                ],
+        name="Engine",
+        default="BAKE",
+        description="",
+        )
+
     bake_type: bpy.props.EnumProperty(
         items=[
                 ('AO', "AO", "Bake AO map for occlusion detection"),
@@ -287,13 +410,107 @@ class SelectInteriorFaces(bpy.types.Operator):
         description = "Cycles rendering light bounces",
         )
 
+    voxel_resolution: bpy.props.IntProperty(
+        name = "Voxel Resolution",
+        default = 128,
+        min = 16,
+        max = 1024,
+        description = "Number of voxels along the largest side of the mesh bounds",
+        )
+
+    winding_threshold: bpy.props.FloatProperty(
+        name = "Threshold",
+        default = 0.75,
+        min = 0.0,
+        max = 2.0,
+        description = "Faces with a higher winding number in front of them are interior. Exterior faces are close to 0.5, faces inside a closed volume close to 1.0",
+        )
+
+    winding_accuracy: bpy.props.FloatProperty(
+        name = "Accuracy",
+        default = 1.5,
+        min = 1.0,
+        max = 4.0,
+        description = "Distance to cluster size ratio above which triangle clusters are approximated. Higher is more accurate and slower",
+        )
+
+    @classmethod
+    def poll(cls, context):
+        return context.active_object is not None and context.active_object.type == 'MESH'
+
+    def execute(self, context):
+        objects = [obj for obj in context.objects_in_mode if obj.type == 'MESH']
+        if not objects:
+            objects = [context.active_object]
+        if self.engine == 'BAKE':
+            select_interior_faces(context, objects, self.bake_type, int(self.resolution), self.samples, self.bounces)
+        elif self.engine == 'VOXEL':
+            resolution = fit_voxel_resolution(context, self.voxel_resolution)
+            if resolution < self.voxel_resolution:
+                self.report({'WARNING'}, "Voxel resolution lowered to %d to fit the memory budget" % resolution)
+            select_interior_faces_voxel(context, objects, resolution)
+        elif self.engine == 'WINDING':
+            select_interior_faces_winding(context, objects, self.winding_threshold, self.winding_accuracy)
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        self.execute(context)
+        return {"FINISHED"}
+
+    def draw(self, context):
+        layout = self.layout
+
+        row = layout.row()
+        row.label(text="Engine:")
+        row.prop(self, "engine", text="")
+
+        layout.separator()
+
+        # Cycles bake
+        box = layout.box()
+        box.enabled = self.engine == 'BAKE'
+        for prop in ("bake_type", "resolution", "samples", "bounces"):
+            box.prop(self, prop)
+
+        # Voxel flood fill
+        box = layout.box()
+        box.enabled = self.engine == 'VOXEL'
+        box.prop(self, "voxel_resolution")
+        resolution = fit_voxel_resolution(context, self.voxel_resolution)
+        if resolution < self.voxel_resolution:
+            box.label(text="Lowered to %d by the memory budget" % resolution, icon='INFO')
+
+        # Generalized winding number
+        box = layout.box()
+        box.enabled = self.engine == 'WINDING'
+        box.prop(self, "winding_threshold")
+        box.prop(self, "winding_accuracy")
+
+class SelectThinWalls(bpy.types.Operator):
+    """Select faces whose opposite wall is closer than the given thickness"""
+    bl_idname = 'mesh.select_thin_walls'
+    bl_label = 'Select thin walls'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    thickness: bpy.props.FloatProperty(
+        name = "Thickness",
+        subtype ='DISTANCE',
+        default = 0.001,
+        min = 0.0,
+        max = 100.0,
+        description = "Minimum wall thickness, faces with the opposite wall closer than this are selected",
+        unit ='LENGTH',
+        )
+
     @classmethod
     def poll(cls, context):
         return context.active_object is not None and context.active_object.type == 'MESH'
 
     def execute(self, context):
-        obj = context.active_object
-        select_interior_faces(context, obj, self.bake_type, int(self.resolution), self.samples, self.bounces)
+        objects = [obj for obj in context.objects_in_mode if obj.type == 'MESH']
+        if not objects:
+            objects = [context.active_object]
+        select_thin_walls(context, objects, self.thickness)
         return {'FINISHED'}
 
     def invoke(self, context, event):
@@ -301,7 +518,10 @@ class SelectInteriorFaces(bpy.types.Operator):
         return {"FINISHED"}
 
 def menu_func(self, context):
-    self.layout.operator(SelectInteriorFaces.bl_idname, text="Interior Faces (Cycles Bake)")
+    self.layout.operator(SelectInteriorFaces.bl_idname, text="Interior Faces (Cycles Bake)").engine = 'BAKE'
+    self.layout.operator(SelectInteriorFaces.bl_idname, text="Interior Faces (Voxel)").engine = 'VOXEL'
+    self.layout.operator(SelectInteriorFaces.bl_idname, text="Interior Faces (Winding Number)").engine = 'WINDING'
+    self.layout.operator(SelectThinWalls.bl_idname, text="Thin Walls")
 
 def register():
     # bpy.utils.register_class(SelectInteriorFaces)
@@ -1,7 +1,7 @@
 bl_info = {
     "name": "Select Overlapping Mesh",
     "author": "rpopovici",
-    "version": (0, 4),
+    "version": (0, 9),
     "blender": (2, 80, 0),
     "location": "(Edit Mode) Select > Select All by Trait",
     "description": "Select overlapping vertices/edges/faces",
@@ -17,6 +17,27 @@ from mathutils.kdtree import KDTree
 from mathutils import Matrix
 from mathutils import Vector
 from math import radians, sqrt
+from . import auto_load
+from . import preferences
+
+# loaded on first use
+np = auto_load.lazy_import("numpy")
+mesh_arrays = auto_load.lazy_import(".mesh_arrays", __package__)
+mesh_uv_overlap = auto_load.lazy_import(".mesh_uv_overlap", __package__)
+mesh_evaluated = auto_load.lazy_import(".mesh_evaluated", __package__)
+mesh_chunks = auto_load.lazy_import(".mesh_chunks", __package__)
+mesh_cache = auto_load.lazy_import(".mesh_cache", __package__)
+mesh_point_grid = auto_load.lazy_import(".mesh_point_grid", __package__)
+
+MIRROR_AXES = {'X': 0, 'Y': 1, 'Z': 2}
+
+# edges below this share of the mesh size are zero length at float precision
+ZERO_SIZE = 1e-6
+
+# peak memory per face of the split and inset clone and its BVH, rough estimate
+OVERLAP_BYTES_PER_FACE = 8 * 1024
+# loops read at once for the face bounds of the streamed search
+STREAM_LOOPS = 1 << 18
 
 def measure (first, second):
 	locx = second[0] - first[0]
@@ -74,6 +95,80 @@ def find_duplicate_vertices(bm, distance):
     
     return list(vtx_selection)
 
+def find_mirror_pairs(coords, axis, distance, visible=None, offset=0.0):
+    # index of the mirrored counterpart of every vertex, -1 where there is none
+    # coords are mirrored across the plane normal to axis at offset along it
+    indices = np.arange(len(coords)) if visible is None else np.flatnonzero(visible)
+    mirror = np.full(len(coords), -1, dtype=np.int64)
+    if len(indices) == 0:
+        return mirror
+
+    co = np.asarray(coords, dtype=np.float64)[indices]
+    mirrored = co.copy()
+    mirrored[:, MIRROR_AXES[axis]] = 2.0 * offset - mirrored[:, MIRROR_AXES[axis]]
+
+    found = mesh_point_grid.find_nearest(co, mirrored, distance)
+    mirror[indices] = np.where(found >= 0, indices[found], -1)
+    return mirror
+
+def find_short_edges(coords, edges, min_length):
+    co = np.asarray(coords, dtype=np.float64)
+    return np.linalg.norm(co[edges[:, 1]] - co[edges[:, 0]], axis=1) < min_length
+
+def find_degenerate_faces(coords, loop_vertices, loop_start, loop_total, min_area, min_length, planarity=None, angle=None):
+    # faces with near zero area or short edges, optionally non planar n-gons and collinear corners
+    face_count = len(loop_start)
+    degenerate = np.zeros(face_count, dtype=bool)
+    if face_count == 0:
+        return degenerate
+
+    # corners relative to the first corner of their face, for precision
+    loop_faces = np.repeat(np.arange(face_count), loop_total)
+    co = np.asarray(coords, dtype=np.float64)[loop_vertices]
+    co -= co[loop_start][loop_faces]
+    next_loop = np.arange(1, len(co) + 1)
+    next_loop[loop_start + loop_total - 1] = loop_start
+    edge_vectors = co[next_loop] - co
+    edge_lengths = np.linalg.norm(edge_vectors, axis=1)
+
+    # Newell's method, length is the area and direction the normal
+    vectors = 0.5 * np.add.reduceat(np.cross(co, co[next_loop]), loop_start, axis=0)
+    areas = np.linalg.norm(vectors, axis=1)
+    degenerate |= areas < min_area
+    degenerate |= np.logical_or.reduceat(edge_lengths < min_length, loop_start)
+
+    if planarity is not None:
+        # corner distance from the plane through the face center
+        normals = vectors / np.maximum(areas, 1e-30)[:, None]
+        centers = np.add.reduceat(co, loop_start, axis=0) / loop_total[:, None]
+        offsets = np.abs(np.einsum('ij,ij->i', co - centers[loop_faces], normals[loop_faces]))
+        degenerate |= (loop_total > 3) & (np.maximum.reduceat(offsets, loop_start) > planarity)
+
+    if angle is not None:
+        # edges on both sides of a corner are parallel, straight or folded back
+        prev_loop = np.empty_like(next_loop)
+        prev_loop[next_loop] = np.arange(len(co))
+        sines = np.linalg.norm(np.cross(edge_vectors[prev_loop], edge_vectors), axis=1)
+        sines /= np.maximum(edge_lengths[prev_loop] * edge_lengths, 1e-30)
+        degenerate |= np.logical_or.reduceat(sines < np.sin(angle), loop_start)
+
+    return degenerate
+
+def read_degenerate_faces(mesh, min_area, min_length, planarity=None, angle=None):
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(mesh)
+    return find_degenerate_faces(mesh_arrays.get_vertex_coords(mesh), mesh_arrays.get_loop_vertices(mesh),
+        loop_start, loop_total, min_area, min_length, planarity, angle)
+
+def read_excluded_faces(mesh, min_area=None, min_length=None):
+    # degenerate faces break the inset and the BVH, they are left out of intersections
+    # without thresholds only faces degenerate at float precision of the mesh size are left out
+    if min_length is None:
+        coords = mesh_arrays.get_vertex_coords(mesh)
+        size = float(np.ptp(coords, axis=0).max()) if len(coords) else 0.0
+        min_length = size * ZERO_SIZE
+        min_area = min_length * min_length
+    return read_degenerate_faces(mesh, min_area, min_length)
+
 def find_self_intersect_faces(bm, distance):
     bhv_tree = BVHTree.FromBMesh(bm, epsilon = 0.0)
     overlap_pairs = bhv_tree.overlap(bhv_tree)
@@ -85,39 +180,80 @@ def find_intersect_faces(bm, bm2, distance):
     overlap_pairs = bhv_tree.overlap(bhv_tree2)
     return overlap_pairs
 
-def select_duplicate_vertices(context, distance):
-    obj = context.active_object
-    mesh = obj.data
+def cached_indices(context, kind, params, find, arrays=()):
+    # element indices of the active mesh found by find(), kept on disk when the cache is enabled,
+    # keyed by the local geometry, hidden elements, params and any other arrays the result depends on.
+    # KDTrees and BVHTrees can't be stored, their results can.
+    # mesh data is in sync, select_overlapping toggles the mode first
+    cache = preferences.get_cache(context)
+    if cache is None:
+        return find()
+    mesh = context.active_object.data
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(mesh)
+    key_arrays = [mesh_arrays.get_vertex_coords(mesh), mesh_arrays.get_edge_vertices(mesh), mesh_arrays.get_loop_vertices(mesh), loop_total,
+        mesh_arrays.get_flags(mesh.vertices, "hide"), mesh_arrays.get_flags(mesh.edges, "hide"), mesh_arrays.get_flags(mesh.polygons, "hide")]
+    result = mesh_cache.cached(cache, kind, params, key_arrays + list(arrays),
+        lambda: {"indices": np.array(sorted(find()), dtype=np.int64)})
+    return result["indices"].tolist()
+
+def select_elements(mesh, select_type, indices):
     bm = bmesh.from_edit_mesh(mesh)
-    verts = bm.verts
-
-    if hasattr(bm.verts, "ensure_lookup_table"):
-        verts.ensure_lookup_table()
+    elements = {'VERT': bm.verts, 'EDGE': bm.edges, 'FACE': bm.faces}[select_type]
+    if hasattr(elements, "ensure_lookup_table"):
+        elements.ensure_lookup_table()
 
-    # Create a kd-tree from a mesh
-    kd = build_kdtree_from_verts(verts)
-
-    # Select duplicate vertices
-    for i, vtx in enumerate(verts):
-        vtx_group = []
-        for (co, index, dist) in kd.find_range(vtx.co, distance):
-            vtx_group.append(index)
-        if len(vtx_group) > 1:
-            #print(vtx_group)
-            for index in vtx_group:
-                if not verts[index].hide:
-                    verts[index].select_set(True)
+    for index in indices:
+        if not elements[index].hide:
+            elements[index].select_set(True)
 
     # Show the updates in the viewport
     bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False)
+    bmesh.update_edit_mesh(mesh, False, False)
 
+def select_duplicate_vertices(context, distance):
+    mesh = context.active_object.data
+    bm = bmesh.from_edit_mesh(mesh)
+    select_elements(mesh, 'VERT', cached_indices(context, "doubles_vert", {"distance": distance},
+        lambda: find_duplicate_vertices(bm, distance)))
 
-def select_duplicate_edges(context, distance):
+def select_asymmetric_vertices(context, axis, distance, offset):
+    # mesh data is in sync, select_overlapping toggles the mode first
     obj = context.active_object
     mesh = obj.data
-    bm = bmesh.from_edit_mesh(mesh)
-    
+    visible = ~mesh_arrays.get_flags(mesh.vertices, "hide")
+    mirror = find_mirror_pairs(mesh_arrays.get_vertex_coords(mesh), axis, distance, visible, offset)
+
+    select_elements(mesh, 'VERT', np.flatnonzero(visible & (mirror < 0)).tolist())
+
+def select_degenerate_geometry(context, select_type, min_area, min_length, planarity, angle):
+    # mesh data is in sync, select_overlapping toggles the mode first
+    obj = context.active_object
+    mesh = obj.data
+    if select_type == 'EDGE':
+        selection = find_short_edges(mesh_arrays.get_vertex_coords(mesh), mesh_arrays.get_edge_vertices(mesh), min_length)
+    else:
+        selection = read_degenerate_faces(mesh, min_area, min_length, planarity, angle)
+    select_elements(mesh, select_type, np.flatnonzero(selection).tolist())
+
+def find_uv_overlap_faces(mesh, tolerance):
+    # faces of the active UV map overlapping other faces in UV space
+    uv_layer = mesh.uv_layers.active
+    visible = ~mesh_arrays.get_flags(mesh.polygons, "hide")
+    if uv_layer is None:
+        return np.zeros(len(mesh.polygons), dtype=bool)
+
+    (tri_loops, tri_faces) = mesh_arrays.get_loop_triangle_loops(mesh)
+    uvs = mesh_arrays.get_loop_uvs(mesh, uv_layer.name)
+    shown = visible[tri_faces]
+    return mesh_uv_overlap.find_uv_overlaps(uvs[tri_loops[shown]], tri_faces[shown], len(mesh.polygons), tolerance)
+
+def select_uv_overlap_faces(context, tolerance):
+    # mesh data is in sync, select_overlapping toggles the mode first
+    obj = context.active_object
+    mesh = obj.data
+    select_elements(mesh, 'FACE', np.flatnonzero(find_uv_overlap_faces(mesh, tolerance)).tolist())
+
+def find_duplicate_edges(bm, distance):
     if hasattr(bm.verts, "ensure_lookup_table"):
         bm.verts.ensure_lookup_table()
         bm.edges.ensure_lookup_table()
@@ -126,7 +262,7 @@ def select_duplicate_edges(context, distance):
     vtx_group = find_duplicate_vertices(bm, distance)
     
     if len(vtx_group) == 0:
-        return
+        return set()
 
     # get potential duplicate edges
     edges_from_verts = set()
@@ -137,25 +273,26 @@ def select_duplicate_edges(context, distance):
     # calculate edge center
     edge_centers = [(edge_index, calc_edge_median(bm.edges[edge_index])) for edge_index in edges_from_verts if not bm.edges[edge_index].hide]
 
-    if len(edge_centers) == 0:
-        return
-
     # build KDTree for edge median points
+    edge_selection = set()
     kd = build_kdtree_from_coords([edge_center[1] for edge_center in edge_centers])
     for (edge_index, edge_center) in edge_centers:
         coord_group = kd.find_range(edge_center, distance)
         if len(coord_group) > 1:
-            if not bm.edges[edge_index].hide:
-                bm.edges[edge_index].select_set(True)
+            edge_selection.add(edge_index)
 
-    bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False, False)
+    return edge_selection
 
-def select_intersect_faces(context, intersections, coplanar, inset, tolerance, angle):
-    obj = context.active_object
-    mesh = obj.data
+def select_duplicate_edges(context, distance):
+    mesh = context.active_object.data
     bm = bmesh.from_edit_mesh(mesh)
+    select_elements(mesh, 'EDGE', cached_indices(context, "doubles_edge", {"distance": distance},
+        lambda: find_duplicate_edges(bm, distance)))
 
+def find_intersecting_faces(bm, mesh, intersections, coplanar, inset, tolerance, angle, exclude=None, thickness=None):
+    # bm and mesh hold the same geometry, mesh is cloned and inset
+    # exclude - mask of degenerate faces, they break the inset and are left out
+    # thickness - inset thickness, derived from the faces when not given
     if hasattr(bm.verts, "ensure_lookup_table"):
         bm.faces.ensure_lookup_table()
 
@@ -166,35 +303,49 @@ def select_intersect_faces(context, intersections, coplanar, inset, tolerance, a
     # split edges
     bmesh.ops.split_edges(bm_clone, edges = bm_clone.edges, verts = [], use_verts=False)
 
-    # calculate avg edge length
-    thick_avg = 0.0
-    for face in bm_clone.faces:
-        perimeter = face.calc_perimeter()
-        thick = perimeter / len(face.verts)
-        thick_avg += thick
+    if exclude is None:
+        exclude = [False] * len(bm_clone.faces)
+    inset_faces = [face for face in bm_clone.faces if not exclude[face.index]]
+    if not inset_faces:
+        bm_clone.free()
+        return set()
 
-    # inset thickness as factor of distance param
-    thick_avg = thick_avg / len(bm_clone.faces) * inset
-
-    # clamp on edge length
-    min_edge_len = 1000000.0
-    for edge in bm_clone.edges:
-        edge_length = edge.calc_length()
-        if edge_length < min_edge_len:
-            min_edge_len = edge_length
-
-    # clamp by smallest edge length
-    edge_clamp_limit = min_edge_len * 0.33
-    if thick_avg > edge_clamp_limit:
-        thick_avg = edge_clamp_limit
+    if thickness is not None:
+        thick_avg = thickness
+    else:
+        # calculate avg edge length
+        thick_avg = 0.0
+        for face in inset_faces:
+            perimeter = face.calc_perimeter()
+            thick = perimeter / len(face.verts)
+            thick_avg += thick
+
+        # inset thickness as factor of distance param
+        thick_avg = thick_avg / len(inset_faces) * inset
+
+        # clamp on edge length
+        min_edge_len = 1000000.0
+        for edge in bm_clone.edges:
+            # edges are split, every edge has one face
+            if all(exclude[face.index] for face in edge.link_faces):
+                continue
+            edge_length = edge.calc_length()
+            if edge_length < min_edge_len:
+                min_edge_len = edge_length
+
+        # clamp by smallest edge length
+        edge_clamp_limit = min_edge_len * 0.33
+        if thick_avg > edge_clamp_limit:
+            thick_avg = edge_clamp_limit
 
     # inset faces by very small amount
     #inset_faces = bmesh.ops.inset_individual(bm_clone, faces=bm_clone.faces, thickness=thick_avg, depth=0.0, use_even_offset=False, use_interpolate=True, use_relative_offset=False)
-    inset_faces = bmesh.ops.inset_region(bm_clone, faces=bm_clone.faces, faces_exclude=[], use_boundary=True, use_even_offset=True, use_interpolate=True, use_relative_offset=False, use_edge_rail=False, thickness=thick_avg, depth=0.0, use_outset=False)
+    inset_faces = bmesh.ops.inset_region(bm_clone, faces=inset_faces, faces_exclude=[], use_boundary=True, use_even_offset=True, use_interpolate=True, use_relative_offset=False, use_edge_rail=False, thickness=thick_avg, depth=0.0, use_outset=False)
     faces_to_delete = [face for face in inset_faces['faces']]
     bmesh.ops.delete(bm_clone, geom=faces_to_delete, context='FACES')
     bmesh.ops.recalc_face_normals(bm_clone, faces=bm_clone.faces)
 
+    face_selection = set()
     if (intersections):
         #intersect_pairs = find_intersect_faces(bm, bm_clone, distance)
         intersect_pairs = find_self_intersect_faces(bm_clone, tolerance)
@@ -202,45 +353,129 @@ def select_intersect_faces(context, intersections, coplanar, inset, tolerance, a
         for pair in intersect_pairs:
             (first_index, second_index) = pair
             # exclude pairs with same index because these are false positive as result of cloning
-            if first_index != second_index:
+            if first_index != second_index and not (exclude[first_index] or exclude[second_index]):
                 # exclude hidden
                 if (not bm.faces[first_index].hide) and (not bm.faces[second_index].hide):
-                    bm.faces[first_index].select_set(True)
-                    bm.faces[second_index].select_set(True)
+                    face_selection.add(first_index)
+                    face_selection.add(second_index)
 
     # coplanar intersections
     if (coplanar):
         bvh_tree = BVHTree.FromBMesh(bm, epsilon = 0.0)
         for face in bm_clone.faces:
             for vert in face.verts:
-                # skip if already selected or hidden
-                if bm.faces[face.index].select or bm.faces[face.index].hide:
+                # skip if already found or hidden
+                if face.index in face_selection or bm.faces[face.index].hide or exclude[face.index]:
                     continue
                 nearest_list = bvh_tree.find_nearest_range(vert.co, tolerance)
                 for (location, normal, index, dist) in nearest_list:
                     org_face = bm.faces[face.index]
                     co_face = bm.faces[index]
-                    # skip if already selected or hidden
-                    if (org_face.select and co_face.select) or org_face.hide or co_face.hide:
+                    # skip if already found or hidden
+                    if (face.index in face_selection and index in face_selection) or org_face.hide or co_face.hide or exclude[index]:
                         continue
                     if (index is not None) and (index != face.index) and collinear(org_face.normal, co_face.normal, angle): #(measure(vert.co, location) < 0.0001):
                         #print(co_face.index, location, index, dist)
                         if bmesh.geometry.intersect_face_point(bm.faces[index], vert.co) and (not adjacent(org_face, co_face)):
-                            org_face.select_set(True)
-                            co_face.select_set(True)
-
-    bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False, False)
+                            face_selection.add(face.index)
+                            face_selection.add(index)
 
     #bpy.ops.object.mode_set(mode='OBJECT')
     #bm_clone_resampled.to_mesh(mesh)
 
     bm_clone.free()
+    return face_selection
 
-def select_duplicate_faces(context, distance):
-    obj = context.active_object
-    mesh = obj.data
+def select_intersect_faces(context, intersections, coplanar, inset, tolerance, angle, exclude=None):
+    # mesh data is in sync, select_overlapping toggles the mode first
+    mesh = context.active_object.data
     bm = bmesh.from_edit_mesh(mesh)
+    params = {"intersections": intersections, "coplanar": coplanar, "inset": inset, "tolerance": tolerance, "angle": angle}
+    select_elements(mesh, 'FACE', cached_indices(context, "intersections", params,
+        lambda: find_intersecting_faces(bm, mesh, intersections, coplanar, inset, tolerance, angle, exclude),
+        [exclude if exclude is not None else np.zeros(0, dtype=bool)]))
+
+def iter_face_batches(loop_start, loop_total, max_loops):
+    # (first face, end face) ranges of at most max_loops loops, at least one face each
+    loop_end = loop_start + loop_total
+    start = 0
+    while start < len(loop_start):
+        stop = max(int(np.searchsorted(loop_end, loop_start[start] + max_loops, side='right')), start + 1)
+        yield (start, stop)
+        start = stop
+
+def calc_face_bounds(coords, loop_vertices, loop_start, loop_total, exclude, inset):
+    # face bounds and the inset thickness of find_intersecting_faces for the whole mesh,
+    # a batch of faces at a time in float32
+    face_count = len(loop_start)
+    bbox_min = np.empty((face_count, 3), dtype=np.float32)
+    bbox_max = np.empty((face_count, 3), dtype=np.float32)
+    mean_edge_sum = 0.0
+    kept = 0
+    min_edge_len = 1000000.0
+    for (start, stop) in iter_face_batches(loop_start, loop_total, STREAM_LOOPS):
+        first_loop = loop_start[start]
+        local_start = loop_start[start:stop] - first_loop
+        total = loop_total[start:stop]
+        co = coords[loop_vertices[first_loop:loop_start[stop - 1] + total[-1]]].astype(np.float32)
+        bbox_min[start:stop] = np.minimum.reduceat(co, local_start, axis=0)
+        bbox_max[start:stop] = np.maximum.reduceat(co, local_start, axis=0)
+
+        next_loop = np.arange(1, len(co) + 1)
+        next_loop[local_start + total - 1] = local_start
+        edge_lengths = np.linalg.norm(co[next_loop] - co, axis=1)
+        keep = ~exclude[start:stop]
+        if keep.any():
+            perimeters = np.add.reduceat(edge_lengths, local_start, dtype=np.float64)
+            mean_edge_sum += float((perimeters[keep] / total[keep]).sum())
+            kept += int(np.count_nonzero(keep))
+            min_edge_len = min(min_edge_len, float(edge_lengths[np.repeat(keep, total)].min()))
+
+    if kept == 0:
+        return (bbox_min, bbox_max, 0.0)
+    # clamp by smallest edge length
+    return (bbox_min, bbox_max, min(mean_edge_sum / kept * inset, min_edge_len * 0.33))
+
+def build_chunk_mesh(coords, loop_vertices, loop_start, loop_total, hide, faces):
+    # temporary mesh of the given faces, face i is faces[i]
+    counts = loop_total[faces]
+    loops = np.repeat(loop_start[faces] - (np.cumsum(counts) - counts), counts) + np.arange(counts.sum())
+    (verts, chunk_loop_vertices) = np.unique(loop_vertices[loops], return_inverse=True)
+    mesh = bpy.data.meshes.new("__overlap_chunk__")
+    mesh_arrays.create_mesh_from_arrays(mesh, coords[verts], chunk_loop_vertices.ravel(), counts)
+    mesh.polygons.foreach_set("hide", hide[faces])
+    return mesh
+
+def select_intersect_faces_streamed(context, intersections, coplanar, inset, tolerance, angle, exclude, chunk_size):
+    # only a Morton ordered chunk of faces and its halo are cloned and inset at a time
+    # mesh data is in sync, select_overlapping toggles the mode first
+    mesh = context.active_object.data
+    coords = mesh_arrays.get_vertex_coords(mesh)
+    loop_vertices = mesh_arrays.get_loop_vertices(mesh)
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(mesh)
+    hide = mesh_arrays.get_flags(mesh.polygons, "hide")
+
+    # one inset thickness for all chunks, as without chunks
+    (bbox_min, bbox_max, thickness) = calc_face_bounds(coords, loop_vertices, loop_start, loop_total, exclude, inset)
+    grid = mesh_chunks.build_halo_grid(bbox_min, bbox_max, tolerance)
+
+    largest = 0
+    for chunk in mesh_chunks.iter_chunks((bbox_min + bbox_max) / 2, chunk_size):
+        faces = np.concatenate((chunk, mesh_chunks.chunk_halo(grid, chunk)))
+        largest = max(largest, len(faces))
+        chunk_mesh = build_chunk_mesh(coords, loop_vertices, loop_start, loop_total, hide, faces)
+        bm = bmesh.new()
+        bm.from_mesh(chunk_mesh)
+        found = find_intersecting_faces(bm, chunk_mesh, intersections, coplanar, inset, tolerance, angle, exclude[faces], thickness)
+        bm.free()
+        bpy.data.meshes.remove(chunk_mesh)
+
+        # flush the chunk results right away
+        select_elements(mesh, 'FACE', faces[sorted(found)].tolist())
+    # faces of the largest chunk with its halo
+    return largest
+
+def find_duplicate_faces(bm, distance):
     if hasattr(bm.verts, "ensure_lookup_table"):
         bm.verts.ensure_lookup_table()
         bm.faces.ensure_lookup_table()
@@ -248,7 +483,7 @@ def select_duplicate_faces(context, distance):
     vtx_group = find_duplicate_vertices(bm, distance)
     
     if len(vtx_group) == 0:
-        return
+        return set()
 
     faces_from_verts = set()
     for vtx_index in vtx_group:
@@ -258,19 +493,20 @@ def select_duplicate_faces(context, distance):
     #print(faces_from_verts)
     face_centers = [(face_index, bm.faces[face_index].calc_center_median_weighted()) for face_index in faces_from_verts if not bm.faces[face_index].hide]
 
-    if len(face_centers) == 0:
-        return
-
+    face_selection = set()
     kd = build_kdtree_from_coords([face_center[1] for face_center in face_centers])
     for (face_index, face_center) in face_centers:
         coord_group = kd.find_range(face_center, distance)
         if len(coord_group) > 1:
-            if not bm.faces[face_index].hide:
-                bm.faces[face_index].select_set(True)
+            face_selection.add(face_index)
 
-    bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False, False)
-    return
+    return face_selection
+
+def select_duplicate_faces(context, distance):
+    mesh = context.active_object.data
+    bm = bmesh.from_edit_mesh(mesh)
+    select_elements(mesh, 'FACE', cached_indices(context, "doubles_face", {"distance": distance},
+        lambda: find_duplicate_faces(bm, distance)))
 
 def get_mesh_select_mode():
     (vertex_mode, edge_mode, face_mode) = bpy.context.tool_settings.mesh_select_mode
@@ -299,6 +535,12 @@ class SelectOverlapping(bpy.types.Operator):
         description="",
         )
 
+    evaluated: bpy.props.BoolProperty(
+        name="Modifiers",
+        description="Find doubles and intersections on the mesh with its modifiers, without applying them",
+        default = False
+        )
+
     overlapping: bpy.props.BoolProperty(
         name="Overlapping",
         description="Select overlapping mesh",
@@ -311,10 +553,96 @@ class SelectOverlapping(bpy.types.Operator):
         default = 0.0001,
         min = 0.0,
         max = 100.0,
-        description = "Minimum overlapping distance between vertices to select",
+        description = "Minimum overlapping distance between vertices to select, also the distance mirrored vertices are matched within",
         unit ='LENGTH',
         )
 
+    symmetry: bpy.props.BoolProperty(
+        name="Symmetry",
+        description="Select vertices without a mirrored counterpart",
+        default = False
+        )
+
+    mirror_axis: bpy.props.EnumProperty(
+        items=[
+                ('X', "X", "Mirror across the YZ plane"),
+                ('Y', "Y", "Mirror across the XZ plane"),
+                ('Z', "Z", "Mirror across the XY plane"),
+                ],
+        name="Mirror Axis",
+        default='X',
+        description="Local axis the mesh is mirrored along",
+        )
+
+    mirror_offset: bpy.props.FloatProperty(
+        name = "Mirror Offset",
+        subtype = 'DISTANCE',
+        default = 0.0,
+        description = "Position of the mirror plane along the mirror axis, in local space",
+        unit = 'LENGTH',
+        )
+
+    degenerate: bpy.props.BoolProperty(
+        name="Degenerate",
+        description="Select zero area faces, short edges, non planar n-gons and faces with collinear corners",
+        default = False
+        )
+
+    min_area: bpy.props.FloatProperty(
+        name = "Area",
+        default = 0.00000001,
+        min = 0.0,
+        max = 100.0,
+        precision = 8,
+        description = "Faces below this area are degenerate",
+        unit ='AREA',
+        )
+
+    min_length: bpy.props.FloatProperty(
+        name = "Length",
+        subtype ='DISTANCE',
+        default = 0.000001,
+        min = 0.0,
+        max = 100.0,
+        precision = 6,
+        description = "Edges below this length are degenerate",
+        unit ='LENGTH',
+        )
+
+    planarity: bpy.props.FloatProperty(
+        name = "Planarity",
+        subtype ='DISTANCE',
+        default = 0.0001,
+        min = 0.0,
+        max = 100.0,
+        description = "Maximum distance of n-gon corners from the face plane",
+        unit ='LENGTH',
+        )
+
+    collinear_angle: bpy.props.FloatProperty(
+        name = "Collinear Angle",
+        subtype='ANGLE',
+        default = radians(0.1),
+        min = radians(0.0),
+        max = radians(10.0),
+        description = "Corners closer than this angle to a straight line are collinear",
+        )
+
+    uv_overlap: bpy.props.BoolProperty(
+        name="UV Overlap",
+        description="Select faces overlapping other faces in the active UV map",
+        default = False
+        )
+
+    uv_tolerance: bpy.props.FloatProperty(
+        name = "UV Tolerance",
+        default = 0.000001,
+        min = 0.0,
+        max = 0.1,
+        precision = 6,
+        description = "Overlaps up to this deep in UV space are ignored, faces sharing an edge or a vertex only touch",
+        )
+
     intersections: bpy.props.BoolProperty(
         name="Intersections",
         description="Select intersecting faces",
@@ -361,7 +689,11 @@ class SelectOverlapping(bpy.types.Operator):
         return context.active_object is not None and context.active_object.type == 'MESH'
 
     def execute(self, context):
-        self.select_overlapping(context, self.overlapping, self.distance, self.intersections, self.inset, self.coplanar, self.tolerance, self.angle)
+        try:
+            self.select_overlapping(context, self.overlapping, self.distance, self.intersections, self.inset, self.coplanar, self.tolerance, self.angle)
+        except ValueError as error:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
         return {'FINISHED'}
 
     def invoke(self, context, event):
@@ -383,6 +715,7 @@ class SelectOverlapping(bpy.types.Operator):
         row = layout.row()
         row.label(text="Selection Type:")
         row.prop(self, "select_type", text="")
+        layout.prop(self, "evaluated")
 
         layout.separator()
 
@@ -392,10 +725,47 @@ class SelectOverlapping(bpy.types.Operator):
         row.label(text="Doubles")
         row.prop(self, "overlapping", text="")
         distance_row = box.row()
-        distance_row.enabled = self.overlapping
+        distance_row.enabled = self.overlapping or self.symmetry
         distance_row.label(text="Distance")
         distance_row.prop(self, "distance", text="")
 
+        # Symmetry
+        box = layout.box()
+        box.enabled = mesh_select_mode == 'VERT'
+        row = box.row()
+        row.label(text="Symmetry")
+        row.prop(self, "symmetry", text="")
+        axis_row = box.row()
+        axis_row.enabled = self.symmetry
+        axis_row.prop(self, "mirror_axis", expand=True)
+        offset_row = box.row()
+        offset_row.enabled = self.symmetry
+        offset_row.label(text="Offset")
+        offset_row.prop(self, "mirror_offset", text="")
+
+        # Degenerate
+        box = layout.box()
+        box.enabled = mesh_select_mode in {'EDGE', 'FACE'}
+        row = box.row()
+        row.label(text="Degenerate")
+        row.prop(self, "degenerate", text="")
+        for (prop, enabled) in (("min_area", face_mode), ("min_length", True), ("planarity", face_mode), ("collinear_angle", face_mode)):
+            distance_row = box.row()
+            distance_row.enabled = self.degenerate and enabled
+            distance_row.label(text=self.bl_rna.properties[prop].name)
+            distance_row.prop(self, prop, text="")
+
+        # UV Overlap
+        box = layout.box()
+        box.enabled = face_mode
+        row = box.row()
+        row.label(text="UV Overlap")
+        row.prop(self, "uv_overlap", text="")
+        distance_row = box.row()
+        distance_row.enabled = self.uv_overlap
+        distance_row.label(text="Tolerance")
+        distance_row.prop(self, "uv_tolerance", text="")
+
         # Intersections
         box = layout.box()
         box.enabled = face_mode
@@ -440,19 +810,26 @@ class SelectOverlapping(bpy.types.Operator):
         # force context update in edit mode
         # apparently there's a bug in scene.update()
         #bpy.context.scene.update()
+        (vertex_mode, edge_mode, face_mode) = bpy.context.tool_settings.mesh_select_mode
         mode = bpy.context.object.mode
         if mode != 'OBJECT':
             bpy.ops.object.mode_set(mode = 'OBJECT')
-            bpy.ops.object.mode_set(mode = mode)
+        try:
+            # modifiers are evaluated in object mode, doubles and intersections of the mesh with modifiers
+            evaluated = self.search_evaluated(context, vertex_mode, edge_mode, face_mode) if self.evaluated else []
+        finally:
+            if mode != 'OBJECT':
+                bpy.ops.object.mode_set(mode = mode)
 
         # select in context
-        (vertex_mode, edge_mode, face_mode) = bpy.context.tool_settings.mesh_select_mode
+        if self.evaluated:
+            self.select_evaluated(context, evaluated)
 
-        if overlapping:
+        elif overlapping:
             # vertex mode
             if vertex_mode:
                 if context.active_object.data.vertices:
-                    select_duplicate_vertices(context, distance)        
+                    select_duplicate_vertices(context, distance)
             # edge mode
             elif edge_mode:
                 if context.active_object.data.edges:
@@ -462,9 +839,63 @@ class SelectOverlapping(bpy.types.Operator):
                 if context.active_object.data.polygons:
                     select_duplicate_faces(context, distance)
 
-        if (intersections or coplanar) and face_mode:
+        if self.symmetry and vertex_mode:
+            if context.active_object.data.vertices:
+                select_asymmetric_vertices(context, self.mirror_axis, distance, self.mirror_offset)
+
+        if self.degenerate and (edge_mode or face_mode):
+            if context.active_object.data.edges:
+                select_degenerate_geometry(context, 'EDGE' if edge_mode else 'FACE', self.min_area, self.min_length, self.planarity, self.collinear_angle)
+
+        if self.uv_overlap and face_mode:
+            if context.active_object.data.polygons:
+                select_uv_overlap_faces(context, self.uv_tolerance)
+
+        if (intersections or coplanar) and face_mode and not self.evaluated:
             if context.active_object.data.polygons:
-                select_intersect_faces(context, intersections, coplanar, inset, tolerance, angle)
+                exclude = read_excluded_faces(context.active_object.data, *self.exclude_thresholds())
+                chunk_size = mesh_chunks.chunk_size(preferences.get_memory_budget(context), OVERLAP_BYTES_PER_FACE)
+                if chunk_size is not None and len(context.active_object.data.polygons) > chunk_size:
+                    largest = select_intersect_faces_streamed(context, intersections, coplanar, inset, tolerance, angle, exclude, chunk_size)
+                    if largest > 2 * chunk_size:
+                        self.report({'WARNING'}, "Dense overlaps, chunks grew to %d faces with their neighbours, above the memory budget" % largest)
+                else:
+                    select_intersect_faces(context, intersections, coplanar, inset, tolerance, angle, exclude)
+
+    def exclude_thresholds(self):
+        # the degenerate thresholds only apply to intersections when degenerate geometry is selected too
+        return (self.min_area, self.min_length) if self.degenerate else ()
+
+    def search_evaluated(self, context, vertex_mode, edge_mode, face_mode):
+        # [(select type, (original indices or None, evaluated element count))]
+        searches = []
+        if self.overlapping:
+            select_type = 'VERT' if vertex_mode else 'EDGE' if edge_mode else 'FACE'
+            find_duplicates = {'VERT': find_duplicate_vertices, 'EDGE': find_duplicate_edges, 'FACE': find_duplicate_faces}[select_type]
+            searches.append((("doubles", select_type, self.distance), select_type,
+                lambda bm, mesh: find_duplicates(bm, self.distance)))
+
+        if (self.intersections or self.coplanar) and face_mode:
+            params = (self.intersections, self.coplanar, self.inset, self.tolerance, self.angle)
+            thresholds = self.exclude_thresholds()
+            searches.append((("intersections",) + params + thresholds, 'FACE',
+                lambda bm, mesh: find_intersecting_faces(bm, mesh, *params, read_excluded_faces(mesh, *thresholds))))
+
+        if not searches:
+            return []
+        results = mesh_evaluated.evaluated_search(context, context.active_object, searches)
+        return [(select_type, result) for ((key, select_type, find), result) in zip(searches, results)]
+
+    def select_evaluated(self, context, evaluated):
+        # elements created by modifiers that don't keep the original indices can't be selected
+        unmapped = 0
+        for (select_type, (indices, count)) in evaluated:
+            if indices is None:
+                unmapped += count
+            else:
+                select_elements(context.active_object.data, select_type, indices.tolist())
+        if unmapped:
+            self.report({'WARNING'}, "%d overlapping elements found with modifiers, they can't be mapped back to the mesh" % unmapped)
 
 def menu_func(self, context):
     self.layout.operator(SelectOverlapping.bl_idname, text="Select Overlapping")
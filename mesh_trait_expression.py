@@ -0,0 +1,118 @@
+import re
+import operator
+
+# Trait expressions, e.g. "BEVEL > 0.5 AND NOT (SEAM OR SHARP)" or "AREA < 1e-6".
+# Expressions are evaluated into boolean masks by a recursive descent parser.
+# Trait values, masks of traits without a comparison and the promotion of face
+# masks to edges are supplied by the caller, so no mesh access happens here.
+
+TOKEN_PATTERN = re.compile(r"\s*(?:([-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?)|(<=|>=|==|!=|<|>)|([A-Za-z_]+)|(\(|\)|&|\||!|~))")
+
+OPERATORS = {'&': 'AND', '|': 'OR', '!': 'NOT', '~': 'NOT'}
+
+COMPARISONS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+def tokenize(expression):
+    tokens = []
+    position = 0
+    expression = expression.rstrip()
+    while position < len(expression):
+        match = TOKEN_PATTERN.match(expression, position)
+        if not match:
+            raise ValueError("Unexpected character '%s' in trait expression" % expression[position:].strip()[0])
+        (number, comparison, word, symbol) = match.groups()
+        if number is not None:
+            tokens.append(('NUMBER', float(number)))
+        elif comparison is not None:
+            tokens.append(('COMPARE', comparison))
+        elif word is not None:
+            tokens.append(('WORD', word.upper()))
+        else:
+            tokens.append(('WORD', OPERATORS.get(symbol, symbol)))
+        position = match.end()
+    return tokens
+
+class TraitExpression:
+    # recursive descent evaluation of a trait expression into an edge or face mask
+    # expr := term (OR term)*, term := factor (AND factor)*,
+    # factor := NOT factor | ( expr ) | TRAIT [comparison number]
+
+    def __init__(self, expression, traits, face_traits, read_trait, trait_mask, to_edges):
+        self.tokens = tokenize(expression)
+        self.position = 0
+        self.traits = traits
+        self.face_traits = face_traits
+        self.read_trait = read_trait
+        self.trait_mask = trait_mask
+        self.to_edges = to_edges
+
+        # face traits are only promoted to edges when mixed with edge traits
+        used = {value for (kind, value) in self.tokens if kind == 'WORD' and value in traits}
+        self.domain = 'FACE' if used and used <= set(face_traits) else 'EDGE'
+
+    def peek(self):
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return (None, None)
+
+    def next(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def evaluate(self):
+        if not self.tokens:
+            raise ValueError("Empty trait expression")
+        mask = self.parse_or()
+        if self.position < len(self.tokens):
+            raise ValueError("Unexpected '%s' in trait expression" % self.peek()[1])
+        return mask
+
+    def parse_or(self):
+        mask = self.parse_and()
+        while self.peek() == ('WORD', 'OR'):
+            self.next()
+            mask = mask | self.parse_and()
+        return mask
+
+    def parse_and(self):
+        mask = self.parse_factor()
+        while self.peek() == ('WORD', 'AND'):
+            self.next()
+            mask = mask & self.parse_factor()
+        return mask
+
+    def parse_factor(self):
+        (kind, value) = self.next()
+        if (kind, value) == ('WORD', 'NOT'):
+            return ~self.parse_factor()
+        if (kind, value) == ('WORD', '('):
+            mask = self.parse_or()
+            if self.next() != ('WORD', ')'):
+                raise ValueError("Missing ')' in trait expression")
+            return mask
+        if kind == 'WORD' and value in self.traits:
+            return self.parse_trait(value)
+        raise ValueError("Expected a trait, got '%s'" % (value if value is not None else "end of expression"))
+
+    def parse_trait(self, trait):
+        values = self.read_trait(trait)
+        if self.peek()[0] == 'COMPARE':
+            (_, comparison) = self.next()
+            (kind, number) = self.next()
+            if kind != 'NUMBER':
+                raise ValueError("Expected a number after '%s %s'" % (trait, comparison))
+            mask = COMPARISONS[comparison](values, number)
+        else:
+            mask = self.trait_mask(trait, values)
+
+        if trait in self.face_traits and self.domain == 'EDGE':
+            mask = self.to_edges(mask)
+        return mask
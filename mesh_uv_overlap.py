@@ -0,0 +1,94 @@
+import numpy as np
+
+# Overlapping triangles in UV space.
+# UV triangles are binned into a uniform 2D grid, keyed by a hash of the
+# cell coordinates so sparse layouts over many UDIM tiles stay compact.
+# Candidate pairs sharing a cell are tested with the separating axis theorem,
+# overlaps no deeper than the tolerance are ignored so triangles sharing an
+# edge or a vertex inside an island don't count.
+
+# upper bound for candidate pairs tested at once
+MAX_CANDIDATES = 1 << 22
+
+def tri_bounds(uv_tris):
+    return (uv_tris.min(axis=1), uv_tris.max(axis=1))
+
+def grid_cells(bbox_min, bbox_max, cell_size):
+    # (triangle, cell key) for every cell a triangle bounding box covers
+    cell_min = np.floor(bbox_min / cell_size).astype(np.int64)
+    cell_max = np.floor(bbox_max / cell_size).astype(np.int64)
+    spans = cell_max - cell_min + 1
+    counts = spans[:, 0] * spans[:, 1]
+
+    tris = np.repeat(np.arange(len(bbox_min)), counts)
+    rank = np.arange(len(tris)) - np.repeat(np.cumsum(counts) - counts, counts)
+    x = cell_min[tris, 0] + rank % spans[tris, 0]
+    y = cell_min[tris, 1] + rank // spans[tris, 0]
+    return (tris, cell_key(x, y))
+
+def cell_key(x, y):
+    # cells far apart may share a key, that only adds candidates
+    return (x * 73856093) ^ (y * 19349663)
+
+def cell_pairs(tris, keys):
+    # sorted by cell, counts pair every triangle with the following ones in its cell
+    order = np.lexsort((tris, keys))
+    (tris, keys) = (tris[order], keys[order])
+    cell_start = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    cell_end = np.r_[cell_start[1:], len(keys)]
+    cell_index = np.repeat(np.arange(len(cell_start)), cell_end - cell_start)
+    counts = cell_end[cell_index] - np.arange(len(keys)) - 1
+    return (tris, keys, counts)
+
+def iter_candidates(counts):
+    # positions of candidate pairs in chunks of bounded size
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(counts):
+        offset = ends[start] - counts[start]
+        stop = max(int(np.searchsorted(ends, offset + MAX_CANDIDATES, side='right')), start + 1)
+        chunk_counts = counts[start:stop]
+        first = np.repeat(np.arange(start, stop), chunk_counts)
+        rank = np.arange(len(first)) - np.repeat(np.cumsum(chunk_counts) - chunk_counts, chunk_counts)
+        yield (first, first + 1 + rank)
+        start = stop
+
+def triangles_overlap(first, second, tolerance):
+    # separating axis test, edge normals of both triangles are the candidate axes
+    edges = np.concatenate((np.roll(first, -1, axis=1) - first, np.roll(second, -1, axis=1) - second), axis=1)
+    axes = np.stack((-edges[..., 1], edges[..., 0]), axis=-1)
+    axes /= np.maximum(np.linalg.norm(axes, axis=-1), 1e-30)[..., None]
+
+    first_proj = axes[:, :, None, 0] * first[:, None, :, 0] + axes[:, :, None, 1] * first[:, None, :, 1]
+    second_proj = axes[:, :, None, 0] * second[:, None, :, 0] + axes[:, :, None, 1] * second[:, None, :, 1]
+    depth = np.minimum(first_proj.max(axis=2), second_proj.max(axis=2)) - np.maximum(first_proj.min(axis=2), second_proj.min(axis=2))
+    return np.all(depth > tolerance, axis=1)
+
+def find_uv_overlaps(uv_tris, tri_faces, face_count, tolerance, cell_size=None):
+    # mask of faces with a UV triangle overlapping a triangle of another face
+    overlapping = np.zeros(face_count, dtype=bool)
+    if len(uv_tris) < 2:
+        return overlapping
+
+    uv_tris = np.asarray(uv_tris, dtype=np.float64)
+    (bbox_min, bbox_max) = tri_bounds(uv_tris)
+    if cell_size is None:
+        # about one average triangle per cell side
+        cell_size = max(float(np.mean((bbox_max - bbox_min).max(axis=1))), 1e-9)
+
+    (tris, keys) = grid_cells(bbox_min, bbox_max, cell_size)
+    (tris, keys, counts) = cell_pairs(tris, keys)
+
+    for (first, second) in iter_candidates(counts):
+        (a, b) = (tris[first], tris[second])
+        keep = tri_faces[a] != tri_faces[b]
+        keep &= np.all((bbox_min[a] < bbox_max[b] - tolerance) & (bbox_min[b] < bbox_max[a] - tolerance), axis=1)
+        # pairs sharing several cells are tested in the cell of the common corner only
+        common = np.floor(np.maximum(bbox_min[a], bbox_min[b]) / cell_size).astype(np.int64)
+        keep &= keys[first] == cell_key(common[:, 0], common[:, 1])
+        (a, b) = (a[keep], b[keep])
+
+        hits = triangles_overlap(uv_tris[a], uv_tris[b], tolerance)
+        overlapping[tri_faces[a[hits]]] = True
+        overlapping[tri_faces[b[hits]]] = True
+    return overlapping
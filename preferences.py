@@ -0,0 +1,118 @@
+import os
+import shutil
+import bpy
+from . import profiling
+
+# Add-on preferences, operator profiling, the on-disk mesh cache and the memory budget.
+
+CACHE_FOLDER = "mesh_utils_cache"
+
+def get_preferences(context):
+    addon = context.preferences.addons.get(__package__)
+    return addon.preferences if addon is not None else None
+
+def get_cache_directory(addon_preferences):
+    if addon_preferences is not None and addon_preferences.cache_directory:
+        return bpy.path.abspath(addon_preferences.cache_directory)
+    return os.path.join(bpy.utils.user_resource('CONFIG'), CACHE_FOLDER)
+
+def get_cache(context):
+    # (directory, max size in bytes) as used by mesh_cache, None when disabled
+    addon_preferences = get_preferences(context)
+    if addon_preferences is None or not addon_preferences.use_cache:
+        return None
+    return (get_cache_directory(addon_preferences), addon_preferences.cache_size * 1024 * 1024)
+
+def get_memory_budget(context):
+    # bytes heavy engines may use at once, None for no limit
+    # MESH_UTILS_MEMORY_BUDGET (MB) is used when the add-on isn't enabled in the preferences, e.g. in benchmarks
+    addon_preferences = get_preferences(context)
+    if addon_preferences is not None:
+        budget = addon_preferences.memory_budget
+    else:
+        budget = int(os.environ.get("MESH_UTILS_MEMORY_BUDGET") or 0)
+    return budget * 1024 * 1024 if budget else None
+
+class ClearMeshCache(bpy.types.Operator):
+    """Remove all cached spatial indices and results"""
+    bl_idname = 'mesh.clear_mesh_cache'
+    bl_label = 'Clear Mesh Cache'
+
+    def execute(self, context):
+        directory = get_cache_directory(get_preferences(context))
+        shutil.rmtree(directory, ignore_errors=True)
+        return {'FINISHED'}
+
+class MeshUtilsPreferences(bpy.types.AddonPreferences):
+    bl_idname = __package__
+
+    enable_profiling: bpy.props.BoolProperty(
+        name = "Profile Operators",
+        default = False,
+        description = "Record wall time, input size and parameters of every operator run",
+        )
+
+    track_memory: bpy.props.BoolProperty(
+        name = "Track Memory",
+        default = False,
+        description = "Record peak Python memory, slows operators down",
+        )
+
+    history_size: bpy.props.IntProperty(
+        name = "History Size",
+        default = 200,
+        min = 10,
+        max = 100000,
+        description = "Runs kept per operator",
+        )
+
+    use_cache: bpy.props.BoolProperty(
+        name = "Cache Spatial Data",
+        default = False,
+        description = "Keep spatial indices and per-face results of heavy meshes on disk, keyed by the mesh geometry",
+        )
+
+    cache_directory: bpy.props.StringProperty(
+        name = "Cache Directory",
+        subtype = 'DIR_PATH',
+        default = "",
+        description = "Where cached data is stored, defaults to the Blender config directory",
+        )
+
+    cache_size: bpy.props.IntProperty(
+        name = "Cache Size (MB)",
+        default = 2048,
+        min = 16,
+        max = 1024 * 1024,
+        description = "Least recently used entries are removed above this size",
+        )
+
+    memory_budget: bpy.props.IntProperty(
+        name = "Memory Budget (MB)",
+        default = 0,
+        min = 0,
+        max = 1024 * 1024,
+        description = "Intersection and winding number detection stream over chunks of faces and the voxel resolution is capped to stay in this budget, 0 for no limit",
+        )
+
+    def draw(self, context):
+        layout = self.layout
+
+        box = layout.box()
+        box.prop(self, "memory_budget")
+
+        box = layout.box()
+        row = box.row()
+        row.prop(self, "use_cache")
+        row.operator(ClearMeshCache.bl_idname, icon='X')
+        col = box.column()
+        col.enabled = self.use_cache
+        col.prop(self, "cache_directory")
+        col.prop(self, "cache_size")
+
+        box = layout.box()
+        row = box.row()
+        row.prop(self, "enable_profiling")
+        row.prop(self, "track_memory")
+        row.prop(self, "history_size")
+        profiling.draw_profile(box)
@@ -0,0 +1,285 @@
+import os
+import csv
+import json
+import time
+import functools
+import statistics
+import tracemalloc
+import bpy
+import bmesh
+from bpy_extras.io_utils import ExportHelper
+from . import auto_load
+
+# Operator profiling.
+# Every operator of the add-on gets its execute wrapped at registration.
+# Wall time, input size, parameters and optionally peak Python memory of
+# every run are kept in a rolling history per operator, appended as JSON lines
+# to a file in the Blender config directory and summarized in the add-on
+# preferences. The file is rewritten only once records dropped from the
+# history make up most of it.
+
+PROFILE_FILE = "mesh_utils_profile.jsonl"
+
+# histogram bucket upper bounds
+TIME_BUCKETS = [0.01, 0.1, 1.0, 10.0, float("inf")]
+FACE_BUCKETS = [1000, 10000, 100000, 1000000, float("inf")]
+
+history = None
+# records in the profile file, kept or dropped from the history
+file_records = 0
+
+def get_profile_path():
+    return os.path.join(bpy.utils.user_resource('CONFIG'), PROFILE_FILE)
+
+def load_history():
+    global history
+    global file_records
+    if history is None:
+        history = {}
+        file_records = 0
+        try:
+            with open(get_profile_path()) as profile_file:
+                for line in profile_file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # cut short while appending
+                        continue
+                    history.setdefault(record.pop("operator"), []).append(record)
+                    file_records += 1
+        except OSError:
+            pass
+    return history
+
+def write_records(mode, records):
+    # records - [(bl_idname, record)]
+    try:
+        os.makedirs(os.path.dirname(get_profile_path()), exist_ok=True)
+        with open(get_profile_path(), mode) as profile_file:
+            for (bl_idname, record) in records:
+                profile_file.write(json.dumps(dict(record, operator=bl_idname)) + "\n")
+    except OSError:
+        pass
+
+def save_history():
+    # rewrite the file with the records kept in the history
+    global file_records
+    records = [(bl_idname, record) for (bl_idname, records) in load_history().items() for record in records]
+    write_records("w", records)
+    file_records = len(records)
+
+def add_record(bl_idname, record, history_size):
+    global file_records
+    records = load_history().setdefault(bl_idname, [])
+    records.append(record)
+    del records[:-history_size]
+    write_records("a", [(bl_idname, record)])
+    file_records += 1
+    # compact once most of the file has been dropped from the history
+    if file_records > 2 * sum(len(records) for records in history.values()):
+        save_history()
+
+def mesh_counts(mesh):
+    # mesh data is stale in edit mode, the edit mesh has the current counts
+    if mesh.is_editmode:
+        bm = bmesh.from_edit_mesh(mesh)
+        return (len(bm.verts), len(bm.edges), len(bm.faces))
+    return (len(mesh.vertices), len(mesh.edges), len(mesh.polygons))
+
+def count_elements(context):
+    # input size, all meshes in edit mode or the selected meshes
+    objects = (getattr(context, "objects_in_mode", None) or getattr(context, "selected_objects", None)
+        or [getattr(context, "active_object", None)])
+    meshes = {obj.data for obj in objects if obj is not None and obj.type == 'MESH'}
+    counts = [mesh_counts(mesh) for mesh in meshes]
+    return {
+        "objects": len(meshes),
+        "vertices": sum(count[0] for count in counts),
+        "edges": sum(count[1] for count in counts),
+        "faces": sum(count[2] for count in counts),
+    }
+
+def get_parameters(operator):
+    parameters = {}
+    for prop in operator.bl_rna.properties:
+        if prop.identifier == "rna_type":
+            continue
+        value = getattr(operator, prop.identifier)
+        if not isinstance(value, (bool, int, float, str)):
+            value = list(value) if hasattr(value, "__len__") else str(value)
+        parameters[prop.identifier] = value
+    return parameters
+
+def get_addon_preferences(context):
+    # the preferences module draws the profile summaries, so it imports this one and not the other way round
+    addon = context.preferences.addons.get(__package__)
+    return addon.preferences if addon is not None else None
+
+def profiled(execute):
+    @functools.wraps(execute)
+    def wrapper(self, context):
+        addon_preferences = get_addon_preferences(context)
+        if addon_preferences is None or not addon_preferences.enable_profiling:
+            return execute(self, context)
+
+        # size before the run, the operator might create or delete geometry
+        record = {"time": time.time()}
+        record.update(count_elements(context))
+
+        track_memory = addon_preferences.track_memory and not tracemalloc.is_tracing()
+        if track_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            result = execute(self, context)
+        finally:
+            record["wall_time"] = time.perf_counter() - start
+            if track_memory:
+                record["peak_memory_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+                tracemalloc.stop()
+
+        record["result"] = sorted(result) if result is not None else None
+        record["parameters"] = get_parameters(self)
+        add_record(self.bl_idname, record, addon_preferences.history_size)
+        return result
+    wrapper.profiled = True
+    return wrapper
+
+def instrument_operator(cls):
+    # auto_load class hook
+    if not issubclass(cls, bpy.types.Operator) or cls.__module__ == __name__:
+        return
+    execute = cls.__dict__.get("execute")
+    if execute is not None and not getattr(execute, "profiled", False):
+        cls.execute = profiled(execute)
+
+if instrument_operator not in auto_load.class_hooks:
+    auto_load.class_hooks.append(instrument_operator)
+
+
+# Summaries
+#################################################
+
+def histogram(values, buckets):
+    counts = [0] * len(buckets)
+    for value in values:
+        for (i, bound) in enumerate(buckets):
+            if value < bound:
+                counts[i] += 1
+                break
+    return counts
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+def summarize(records):
+    times = [record["wall_time"] for record in records]
+    memory = [record["peak_memory_mb"] for record in records if record.get("peak_memory_mb") is not None]
+    return {
+        "runs": len(records),
+        "median_time": statistics.median(times),
+        "p90_time": percentile(times, 0.9),
+        "max_time": max(times),
+        "max_faces": max(record["faces"] for record in records),
+        "max_memory_mb": max(memory) if memory else None,
+        "time_histogram": histogram(times, TIME_BUCKETS),
+        "face_histogram": histogram([record["faces"] for record in records], FACE_BUCKETS),
+    }
+
+def bucket_labels(buckets, unit_format):
+    labels = ["<" + unit_format(bound) for bound in buckets[:-1]]
+    return labels + [">=" + unit_format(buckets[-2])]
+
+def format_time(seconds):
+    return "%gms" % (seconds * 1000) if seconds < 1.0 else "%gs" % seconds
+
+def format_count(count):
+    return "%gk" % (count / 1000) if count < 1000000 else "%gM" % (count / 1000000)
+
+
+# Export
+#################################################
+
+def export_json(filepath):
+    with open(filepath, "w") as output:
+        json.dump({bl_idname: {"summary": summarize(records), "records": records}
+            for (bl_idname, records) in load_history().items() if records}, output, indent=2)
+
+def export_csv(filepath):
+    columns = ["operator", "time", "wall_time", "peak_memory_mb", "objects", "vertices", "edges", "faces", "result", "parameters"]
+    with open(filepath, "w", newline="") as output:
+        writer = csv.writer(output)
+        writer.writerow(columns)
+        for (bl_idname, records) in load_history().items():
+            for record in records:
+                row = dict(record, operator=bl_idname, parameters=json.dumps(record.get("parameters", {})))
+                writer.writerow([row.get(column) for column in columns])
+
+class ExportOperatorProfile(bpy.types.Operator, ExportHelper):
+    """Export operator timings"""
+    bl_idname = 'mesh.export_operator_profile'
+    bl_label = 'Export Operator Profile'
+
+    filename_ext = ".json"
+
+    filter_glob: bpy.props.StringProperty(
+        default="*.json;*.csv",
+        options={'HIDDEN'},
+        )
+
+    file_format: bpy.props.EnumProperty(
+        items=[
+                ('JSON', "JSON", "Summaries and all records"),
+                ('CSV', "CSV", "One row per record"),
+                ],
+        name="Format",
+        default='JSON',
+        description="",
+        )
+
+    def check(self, context):
+        self.filename_ext = "." + self.file_format.lower()
+        return ExportHelper.check(self, context)
+
+    def execute(self, context):
+        if self.file_format == 'CSV':
+            export_csv(self.filepath)
+        else:
+            export_json(self.filepath)
+        self.report({'INFO'}, "Operator profile written to " + self.filepath)
+        return {'FINISHED'}
+
+class ClearOperatorProfile(bpy.types.Operator):
+    """Clear operator timings"""
+    bl_idname = 'mesh.clear_operator_profile'
+    bl_label = 'Clear Operator Profile'
+
+    def execute(self, context):
+        load_history().clear()
+        save_history()
+        return {'FINISHED'}
+
+
+# Preferences
+#################################################
+
+def draw_profile(layout):
+    records_by_operator = {bl_idname: records for (bl_idname, records) in load_history().items() if records}
+    for (bl_idname, records) in sorted(records_by_operator.items()):
+        summary = summarize(records)
+        box = layout.box()
+        box.label(text="%s - %d runs, median %s, p90 %s, max %s, up to %d faces" % (bl_idname, summary["runs"],
+            format_time(summary["median_time"]), format_time(summary["p90_time"]), format_time(summary["max_time"]), summary["max_faces"]))
+        draw_histogram(box, "Time", bucket_labels(TIME_BUCKETS, format_time), summary["time_histogram"])
+        draw_histogram(box, "Faces", bucket_labels(FACE_BUCKETS, format_count), summary["face_histogram"])
+
+    row = layout.row()
+    row.operator(ExportOperatorProfile.bl_idname, icon='EXPORT')
+    row.operator(ClearOperatorProfile.bl_idname, icon='X')
+
+def draw_histogram(layout, title, labels, counts):
+    row = layout.row(align=True)
+    row.label(text=title)
+    for (label, count) in zip(labels, counts):
+        row.label(text="%s: %d" % (label, count))
@@ -1,10 +1,10 @@
 bl_info = {
     "name": "Select All by Trait",
     "author": "rpopovici",
-    "version": (0, 1),
+    "version": (0, 2),
     "blender": (2, 80, 0),
     "location": "(Edit Mode) Select > Select All by Trait",
-    "description": "Select Bevel/Crease/Seam/Sharp/Freestyle by Trait",
+    "description": "Select Bevel/Crease/Seam/Sharp/Freestyle/Angle/Length/Area/Normal by Trait",
     "warning": "",
     "wiki_url": "https://github.com/rpopovici/mesh-utils",
     "category": "Mesh",
@@ -12,88 +12,166 @@ bl_info = {
 
 import bpy
 import bmesh
-
-def select_bevel_edges(context, obj):
-    mesh = obj.data
-    bm = bmesh.from_edit_mesh(mesh)
-
-    if hasattr(bm.edges, "ensure_lookup_table"):
-        bm.edges.ensure_lookup_table()
-
-    bw = bm.edges.layers.bevel_weight.verify()
-    for edge in bm.edges:
-        if edge[bw] != 0:
-            edge.select_set(True)
-
-    # Show the updates in the viewport
-    bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False)
-
-def select_crease_edges(context, obj):
-    mesh = obj.data
-    bm = bmesh.from_edit_mesh(mesh)
-
-    if hasattr(bm.edges, "ensure_lookup_table"):
-        bm.edges.ensure_lookup_table()
-
-    cs = bm.edges.layers.crease.verify()
-    for edge in bm.edges:
-        if edge[cs] != 0:
-            edge.select_set(True)
-
-    # Show the updates in the viewport
-    bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False)
+from math import degrees, radians
+from . import auto_load
+
+# loaded on first use
+np = auto_load.lazy_import("numpy")
+mesh_arrays = auto_load.lazy_import(".mesh_arrays", __package__)
+mesh_trait_expression = auto_load.lazy_import(".mesh_trait_expression", __package__)
+
+# Traits are read or computed in bulk into NumPy arrays.
+# Blender 4.0 moved some edge traits from MeshEdge properties to generic attributes.
+
+class TraitData:
+    # per object cache of bulk arrays shared by the trait readers
+    def __init__(self, obj):
+        self.obj = obj
+        self.mesh = obj.data
+        self.cache = {}
+
+    def get(self, compute):
+        if compute not in self.cache:
+            self.cache[compute] = compute(self)
+        return self.cache[compute]
+
+def read_edge_values(mesh, prop, attribute, dtype):
+    attributes = getattr(mesh, "attributes", None)
+    if attributes is not None and attribute in attributes:
+        return mesh_arrays.foreach_get(attributes[attribute].data, "value", dtype)
+    if prop in bpy.types.MeshEdge.bl_rna.properties:
+        return mesh_arrays.foreach_get(mesh.edges, prop, dtype)
+    return np.zeros(len(mesh.edges), dtype=dtype)
+
+def read_bevel_weights(data):
+    return read_edge_values(data.mesh, "bevel_weight", "bevel_weight_edge", np.float32)
+
+def read_crease_weights(data):
+    return read_edge_values(data.mesh, "crease", "crease_edge", np.float32)
 
 # seam
-def select_seam_edges(context, obj):
-    mesh = obj.data
-    bm = bmesh.from_edit_mesh(mesh)
-
-    if hasattr(bm.edges, "ensure_lookup_table"):
-        bm.edges.ensure_lookup_table()
-
-    for edge in bm.edges:
-        if edge.seam:
-            edge.select_set(True)
-
-    # Show the updates in the viewport
-    bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False)
+def read_seam_edges(data):
+    return read_edge_values(data.mesh, "use_seam", ".uv_seam", bool)
 
 # smooth
-def select_sharp_edges(context, obj):
+def read_sharp_edges(data):
+    return read_edge_values(data.mesh, "use_edge_sharp", "sharp_edge", bool)
+
+def read_freestyle_edges(data):
+    return read_edge_values(data.mesh, "use_freestyle_mark", "freestyle_edge", bool)
+
+def calc_world_coords(data):
+    return mesh_arrays.get_world_coords(data.obj)
+
+def calc_loops(data):
+    (loop_start, loop_total) = mesh_arrays.get_polygon_loops(data.mesh)
+    loop_faces = np.repeat(np.arange(len(loop_start)), loop_total)
+    return (loop_start, loop_total, loop_faces, mesh_arrays.get_loop_edges(data.mesh))
+
+def calc_face_vectors(data):
+    # Newell's method in world space, length is the area and direction the normal
+    (loop_start, loop_total, loop_faces, loop_edges) = data.get(calc_loops)
+    co = data.get(calc_world_coords)[mesh_arrays.get_loop_vertices(data.mesh)]
+    next_loop = np.arange(1, len(co) + 1)
+    next_loop[loop_start + loop_total - 1] = loop_start
+    vectors = np.zeros((len(loop_start), 3))
+    if len(loop_start):
+        vectors = 0.5 * np.add.reduceat(np.cross(co, co[next_loop]), loop_start, axis=0)
+    return vectors
+
+def calc_face_areas(data):
+    return np.linalg.norm(data.get(calc_face_vectors), axis=1)
+
+def calc_face_normals(data):
+    vectors = data.get(calc_face_vectors)
+    return vectors / np.maximum(data.get(calc_face_areas), 1e-30)[:, None]
+
+def calc_edge_lengths(data):
+    co = data.get(calc_world_coords)
+    edge_verts = mesh_arrays.get_edge_vertices(data.mesh)
+    return np.linalg.norm(co[edge_verts[:, 1]] - co[edge_verts[:, 0]], axis=1)
+
+def calc_dihedral_angles(data):
+    # angle between the normals of the two faces of every manifold edge, in degrees
+    (loop_start, loop_total, loop_faces, loop_edges) = data.get(calc_loops)
+    normals = data.get(calc_face_normals)
+    edge_count = len(data.mesh.edges)
+
+    order = np.argsort(loop_edges, kind='stable')
+    face_count = np.bincount(loop_edges, minlength=edge_count)
+    first = np.cumsum(face_count) - face_count
+    manifold = np.flatnonzero(face_count == 2)
+    face_a = loop_faces[order[first[manifold]]]
+    face_b = loop_faces[order[first[manifold] + 1]]
+
+    angles = np.zeros(edge_count)
+    cosine = np.einsum('ij,ij->i', normals[face_a], normals[face_b])
+    angles[manifold] = np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+    return angles
+
+def calc_normal_angles(data, direction):
+    # angle between face normals and a direction, in degrees
+    cosine = data.get(calc_face_normals) @ np.asarray(direction, dtype=np.float64)
+    return np.degrees(np.arccos(np.clip(cosine, -1.0, 1.0)))
+
+DIRECTIONS = {
+    'POS_X': (1, 0, 0),
+    'NEG_X': (-1, 0, 0),
+    'POS_Y': (0, 1, 0),
+    'NEG_Y': (0, -1, 0),
+    'POS_Z': (0, 0, 1),
+    'NEG_Z': (0, 0, -1),
+}
+
+EDGE_TRAITS = {
+    'BEVEL': read_bevel_weights,
+    'CREASE': read_crease_weights,
+    'SEAM': read_seam_edges,
+    'SHARP': read_sharp_edges,
+    'FREESTYLE': read_freestyle_edges,
+    'ANGLE': calc_dihedral_angles,
+    'LENGTH': calc_edge_lengths,
+}
+
+FACE_TRAITS = {
+    'AREA': calc_face_areas,
+    'NORMAL': None, # depends on the chosen direction
+}
+
+TRAITS = set(EDGE_TRAITS) | set(FACE_TRAITS)
+
+
+# Selection
+#################################################
+
+def select_by_trait(obj, expression, trait_mask, direction):
+    data = TraitData(obj)
     mesh = obj.data
-    bm = bmesh.from_edit_mesh(mesh)
-
-    if hasattr(bm.edges, "ensure_lookup_table"):
-        bm.edges.ensure_lookup_table()
-
-    for edge in bm.edges:
-        if not edge.smooth:
-            edge.select_set(True)
-
-    # Show the updates in the viewport
-    bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False)
-
-def select_freestyle_edges(context, obj):
-    mesh = obj.data
-
-    bm = bmesh.from_edit_mesh(mesh)
-
-    if hasattr(bm.edges, "ensure_lookup_table"):
-        bm.edges.ensure_lookup_table()
-
-    fs = bm.edges.layers.freestyle.verify()
-    for edge in bm.edges:
-        print(edge[fs])
-        if mesh.edges[edge.index].use_freestyle_mark:
-            edge.select_set(True)
 
-    # Show the updates in the viewport
-    bm.select_flush_mode()
-    bmesh.update_edit_mesh(mesh, False)
+    def read_trait(trait):
+        if trait == 'NORMAL':
+            return calc_normal_angles(data, direction)
+        if trait in FACE_TRAITS:
+            return data.get(FACE_TRAITS[trait])
+        return data.get(EDGE_TRAITS[trait])
+
+    def to_edges(face_mask):
+        # edges of matching faces
+        (loop_start, loop_total, loop_faces, loop_edges) = data.get(calc_loops)
+        edge_mask = np.zeros(len(mesh.edges), dtype=bool)
+        edge_mask[loop_edges[face_mask[loop_faces]]] = True
+        return edge_mask
+
+    trait_expression = mesh_trait_expression.TraitExpression(expression, TRAITS, FACE_TRAITS, read_trait, trait_mask, to_edges)
+    mask = trait_expression.evaluate()
+
+    # extend the current selection, hidden elements are left alone
+    if trait_expression.domain == 'FACE':
+        mask = mask & ~mesh_arrays.get_flags(mesh.polygons, "hide")
+        mesh_arrays.extend_face_selection(mesh, mask)
+    else:
+        mask = mask & ~mesh_arrays.get_flags(mesh.edges, "hide")
+        mesh_arrays.extend_edge_selection(mesh, mask)
 
 class SelectAllByTrait(bpy.types.Operator):
     """Select All by Trait"""
@@ -108,44 +186,169 @@ class SelectAllByTrait(bpy.types.Operator):
                 ('SEAM', "Seam", "Select seam edges"),
                 ('SHARP', "Sharp", "Select sharp edges"),
                 ('FREESTYLE', "Freestyle", "Select freestyle edges"),
+                ('ANGLE', "Angle", "Select edges with a dihedral angle above the threshold"),
+                ('LENGTH', "Length", "Select edges shorter than the threshold"),
+                ('AREA', "Area", "Select faces smaller than the threshold"),
+                ('NORMAL', "Normal", "Select faces facing the given direction"),
+                ('EXPRESSION', "Expression", "Select edges matching a combination of traits"),
                 ],
         name="Selection Type",
         description="",
         )
 
+    expression: bpy.props.StringProperty(
+        name="Expression",
+        default="BEVEL OR CREASE",
+        description="Traits combined with AND/OR/NOT and parentheses. Weights can be compared, e.g. BEVEL > 0.5 AND NOT SEAM",
+        )
+
+    min_weight: bpy.props.FloatProperty(
+        name = "Min Weight",
+        default = 0.0,
+        min = 0.0,
+        max = 1.0,
+        description = "Select bevel/crease weights above this value",
+        )
+
+    max_weight: bpy.props.FloatProperty(
+        name = "Max Weight",
+        default = 1.0,
+        min = 0.0,
+        max = 1.0,
+        description = "Select bevel/crease weights up to this value",
+        )
+
+    angle: bpy.props.FloatProperty(
+        name = "Angle",
+        subtype = 'ANGLE',
+        default = radians(30.0),
+        min = radians(0.0),
+        max = radians(180.0),
+        description = "Select edges whose faces meet at a sharper angle. ANGLE comparisons in expressions are in degrees",
+        )
+
+    length: bpy.props.FloatProperty(
+        name = "Length",
+        subtype = 'DISTANCE',
+        default = 0.001,
+        min = 0.0,
+        description = "Select edges shorter than this",
+        unit = 'LENGTH',
+        )
+
+    area: bpy.props.FloatProperty(
+        name = "Area",
+        default = 0.000001,
+        min = 0.0,
+        precision = 6,
+        description = "Select faces smaller than this",
+        unit = 'AREA',
+        )
+
+    direction: bpy.props.EnumProperty(
+        items=[
+                ('POS_X', "+X", ""),
+                ('NEG_X', "-X", ""),
+                ('POS_Y', "+Y", ""),
+                ('NEG_Y', "-Y", ""),
+                ('POS_Z', "+Z (Up)", ""),
+                ('NEG_Z', "-Z (Down)", ""),
+                ],
+        name="Direction",
+        default='NEG_Z',
+        description="World space direction faces have to face",
+        )
+
+    direction_angle: bpy.props.FloatProperty(
+        name = "Direction Angle",
+        subtype = 'ANGLE',
+        default = radians(30.0),
+        min = radians(0.0),
+        max = radians(180.0),
+        description = "Maximum angle between face normals and the direction. NORMAL comparisons in expressions are in degrees",
+        )
+
     @classmethod
     def poll(cls, context):
         return context.active_object is not None and context.active_object.type == 'MESH'
 
     def execute(self, context):
-        self.select_all_by_trait(context)
+        try:
+            self.select_all_by_trait(context)
+        except ValueError as error:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
         return {'FINISHED'}
 
     def invoke(self, context, event):
-        self.execute(context)
-        return {"FINISHED"}
+        return self.execute(context)
+
+    def draw(self, context):
+        layout = self.layout
+
+        row = layout.row()
+        row.label(text="Selection Type:")
+        row.prop(self, "select_type", text="")
+
+        if self.select_type == 'EXPRESSION':
+            layout.prop(self, "expression", text="")
+
+        box = layout.box()
+        box.enabled = self.select_type in {'BEVEL', 'CREASE', 'EXPRESSION'}
+        box.prop(self, "min_weight")
+        box.prop(self, "max_weight")
+
+        box = layout.box()
+        row = box.row()
+        row.enabled = self.select_type in {'ANGLE', 'EXPRESSION'}
+        row.prop(self, "angle")
+        row = box.row()
+        row.enabled = self.select_type in {'LENGTH', 'EXPRESSION'}
+        row.prop(self, "length")
+        row = box.row()
+        row.enabled = self.select_type in {'AREA', 'EXPRESSION'}
+        row.prop(self, "area")
+        col = box.column()
+        col.enabled = self.select_type in {'NORMAL', 'EXPRESSION'}
+        col.prop(self, "direction")
+        col.prop(self, "direction_angle")
+
+    def trait_mask(self, trait, values):
+        # selection of a trait used without comparison
+        if trait == 'ANGLE':
+            return values > degrees(self.angle)
+        if trait == 'LENGTH':
+            return values < self.length
+        if trait == 'AREA':
+            return values < self.area
+        if trait == 'NORMAL':
+            return values <= degrees(self.direction_angle)
+        if values.dtype == bool:
+            return values
+        # weights are selected inside (min_weight, max_weight]
+        return (values > self.min_weight) & (values <= self.max_weight)
 
     def select_all_by_trait(self, context):
-        # force context update in edit mode
-        # apparently there's a bug in scene.update()
-        #bpy.context.scene.update()
+        if self.select_type == 'EXPRESSION':
+            expression = self.expression
+        else:
+            expression = self.select_type
+
+        # every mesh in multi-object edit mode, linked duplicates only once
+        objects = {}
+        for obj in context.objects_in_mode or [context.active_object]:
+            if obj.type == 'MESH':
+                objects.setdefault(obj.data, obj)
+
+        # edit meshes and mesh data are synced once for all objects by leaving edit mode
         mode = bpy.context.object.mode
-        if mode != 'OBJECT':
-            bpy.ops.object.mode_set(mode = 'OBJECT')
-            bpy.ops.object.mode_set(mode = mode)
+        bpy.ops.object.mode_set(mode = 'OBJECT')
 
-        obj = context.active_object
-
-        if self.select_type == 'BEVEL':
-            select_bevel_edges(context, obj)
-        elif self.select_type == 'CREASE':
-            select_crease_edges(context, obj)
-        elif self.select_type == 'SEAM':
-            select_seam_edges(context, obj)
-        elif self.select_type == 'SHARP':
-            select_sharp_edges(context, obj)
-        elif self.select_type == 'FREESTYLE':
-            select_freestyle_edges(context, obj)
+        try:
+            for obj in objects.values():
+                select_by_trait(obj, expression, self.trait_mask, DIRECTIONS[self.direction])
+        finally:
+            bpy.ops.object.mode_set(mode = mode)
 
 def menu_func(self, context):
     self.layout.separator()
@@ -154,6 +357,11 @@ def menu_func(self, context):
     self.layout.operator(SelectAllByTrait.bl_idname, text="Seam").select_type = 'SEAM'
     self.layout.operator(SelectAllByTrait.bl_idname, text="Sharp").select_type = 'SHARP'
     self.layout.operator(SelectAllByTrait.bl_idname, text="Freestyle").select_type = 'FREESTYLE'
+    self.layout.operator(SelectAllByTrait.bl_idname, text="Dihedral Angle").select_type = 'ANGLE'
+    self.layout.operator(SelectAllByTrait.bl_idname, text="Edge Length").select_type = 'LENGTH'
+    self.layout.operator(SelectAllByTrait.bl_idname, text="Face Area").select_type = 'AREA'
+    self.layout.operator(SelectAllByTrait.bl_idname, text="Face Normal").select_type = 'NORMAL'
+    self.layout.operator(SelectAllByTrait.bl_idname, text="Trait Expression").select_type = 'EXPRESSION'
 
 def register():
     # bpy.utils.register_class(SelectAllByTrait)
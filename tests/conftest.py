@@ -0,0 +1,24 @@
+import sys
+import types
+from pathlib import Path
+import pytest
+
+# The NumPy engines don't need Blender. They are imported as submodules of a
+# bare package, so the add-on __init__ (and bpy) is never executed.
+PACKAGE = "mesh_utils"
+ROOT = Path(__file__).resolve().parent.parent
+
+if PACKAGE not in sys.modules:
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(ROOT)]
+    sys.modules[PACKAGE] = package
+
+class AddonRoot:
+    # the add-on root is a package importing bpy, collect it as a plain directory
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_collect_directory(self, path, parent):
+        if path == ROOT:
+            return pytest.Dir.from_parent(parent, path=path)
+
+def pytest_configure(config):
+    config.pluginmanager.register(AddonRoot(), "mesh_utils_addon_root")
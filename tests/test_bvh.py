@@ -0,0 +1,45 @@
+import numpy as np
+from mesh_utils import mesh_bvh
+
+
+def random_triangles(count, seed):
+    rng = np.random.default_rng(seed)
+    return rng.random((count, 1, 3)) * 10.0 + rng.normal(0, 0.2, (count, 3, 3))
+
+def test_leaves_partition_triangles():
+    tri_coords = random_triangles(1000, 1)
+    bvh = mesh_bvh.build_bvh(tri_coords, leaf_size=8)
+    assert np.array_equal(np.sort(bvh.order), np.arange(len(tri_coords)))
+
+    leaves = np.flatnonzero(bvh.left < 0)
+    assert np.all(bvh.count[leaves] <= 8)
+    covered = np.zeros(len(tri_coords), dtype=np.int64)
+    for leaf in leaves:
+        covered[bvh.order[bvh.start[leaf]:bvh.start[leaf] + bvh.count[leaf]]] += 1
+    assert np.all(covered == 1)
+
+def test_children_split_the_parent_range():
+    bvh = mesh_bvh.build_bvh(random_triangles(777, 2), leaf_size=4)
+    inner = np.flatnonzero(bvh.left >= 0)
+    (left, right) = (bvh.left[inner], bvh.right[inner])
+    assert np.array_equal(bvh.start[left], bvh.start[inner])
+    assert np.array_equal(bvh.start[right], bvh.start[left] + bvh.count[left])
+    assert np.array_equal(bvh.count[left] + bvh.count[right], bvh.count[inner])
+
+def test_node_bounds_contain_their_triangles():
+    tri_coords = random_triangles(500, 3)
+    bvh = mesh_bvh.build_bvh(tri_coords, leaf_size=8)
+    for node in range(len(bvh.start)):
+        tris = tri_coords[bvh.order[bvh.start[node]:bvh.start[node] + bvh.count[node]]].reshape(-1, 3)
+        assert np.allclose(bvh.bbox_min[node], tris.min(axis=0))
+        assert np.allclose(bvh.bbox_max[node], tris.max(axis=0))
+
+def test_expand_leaves():
+    tri_coords = random_triangles(100, 4)
+    bvh = mesh_bvh.build_bvh(tri_coords, leaf_size=8)
+    leaves = np.flatnonzero(bvh.left < 0)
+    (pairs, tris) = mesh_bvh.expand_leaves(bvh, np.arange(len(leaves)), leaves)
+    assert len(tris) == len(tri_coords)
+    for (pair, leaf) in enumerate(leaves):
+        expected = bvh.order[bvh.start[leaf]:bvh.start[leaf] + bvh.count[leaf]]
+        assert np.array_equal(tris[pairs == pair], expected)
@@ -0,0 +1,44 @@
+import numpy as np
+from mesh_utils import mesh_chunks
+
+
+def random_boxes(count, seed):
+    # small boxes, a few spanning most of the scene
+    rng = np.random.default_rng(seed)
+    bbox_min = rng.random((count, 3)) * 20.0
+    bbox_max = bbox_min + rng.random((count, 3)) * 0.5
+    bbox_max[:5] = bbox_min[:5] + rng.random((5, 3)) * 15.0
+    return (bbox_min, bbox_max)
+
+def reference_halo(bbox_min, bbox_max, chunk, margin):
+    # every element touching one of the chunk elements
+    touching = np.all((bbox_min[chunk, None] <= bbox_max[None] + margin) & (bbox_max[chunk, None] >= bbox_min[None] - margin), axis=2)
+    halo = np.flatnonzero(touching.any(axis=0))
+    return halo[~np.isin(halo, chunk)]
+
+def test_chunks_partition_elements():
+    centers = np.random.default_rng(1).random((5000, 3))
+    chunks = list(mesh_chunks.iter_chunks(centers, 700))
+    assert all(len(chunk) <= 700 for chunk in chunks)
+    assert np.array_equal(np.sort(np.concatenate(chunks)), np.arange(len(centers)))
+    assert len(list(mesh_chunks.iter_chunks(centers, None))) == 1
+
+def test_halo_matches_brute_force():
+    (bbox_min, bbox_max) = random_boxes(3000, 2)
+    for margin in (0.0, 0.3):
+        grid = mesh_chunks.build_halo_grid(bbox_min, bbox_max, margin)
+        assert len(grid.large) > 0
+        for chunk in mesh_chunks.iter_chunks((bbox_min + bbox_max) / 2, 400):
+            halo = mesh_chunks.chunk_halo(grid, chunk)
+            assert np.array_equal(halo, reference_halo(bbox_min, bbox_max, chunk, margin))
+
+def test_halo_stays_local():
+    # a chunk crossing the middle of a dense grid of boxes only gets its neighbours
+    cells = np.stack(np.meshgrid(*[np.arange(40)] * 3, indexing='ij'), axis=-1).reshape(-1, 3).astype(np.float64)
+    (bbox_min, bbox_max) = (cells, cells + 0.9)
+    grid = mesh_chunks.build_halo_grid(bbox_min, bbox_max, 0.05)
+    chunk = np.flatnonzero(np.all(cells == [19, 19, 0], axis=1) | np.all(cells == [20, 20, 39], axis=1))
+    assert len(mesh_chunks.chunk_halo(grid, chunk)) == 0
+    # both boxes sit on a border of the grid, 17 neighbours each
+    grid = mesh_chunks.build_halo_grid(bbox_min, bbox_max, 0.2)
+    assert len(mesh_chunks.chunk_halo(grid, chunk)) == 2 * 17
@@ -0,0 +1,60 @@
+import itertools
+import numpy as np
+from mesh_utils import mesh_delaunay_tiles
+
+
+def brute_force_delaunay(points):
+    # every triangle with no other point inside its circumcircle
+    tris = np.array(list(itertools.combinations(range(len(points)), 3)), dtype=np.int64).reshape(-1, 3)
+    keep = []
+    for start in range(0, len(tris), 4096):
+        chunk = tris[start:start + 4096]
+        (center, radius) = mesh_delaunay_tiles.circumcircles(points, chunk)
+        distance = np.linalg.norm(points[None, :, :] - center[:, None, :], axis=2)
+        distance[np.arange(len(chunk))[:, None], chunk] = np.inf
+        keep.append(chunk[np.isfinite(radius) & np.all(distance > radius[:, None] * (1 + 1e-9), axis=1)])
+    return np.concatenate(keep)
+
+def triangle_set(tris):
+    return set(map(tuple, np.sort(tris, axis=1).tolist()))
+
+def check(points, tile_points):
+    # returns the number of points of every triangulator call
+    calls = []
+    def triangulate(local):
+        calls.append(len(local))
+        return brute_force_delaunay(local)
+    tris = mesh_delaunay_tiles.tiled_delaunay(points, triangulate, tile_points)
+    assert len(tris) == len(triangle_set(tris))
+    assert triangle_set(tris) == triangle_set(brute_force_delaunay(points))
+    return calls
+
+
+def test_uniform_points_match_brute_force():
+    rng = np.random.default_rng(3)
+    for point_count in (60, 150):
+        calls = check(rng.random((point_count, 2)), 16)
+        # every triangulator call is bounded by the tile and its halo
+        assert max(calls) <= 2 * 16
+
+def test_clustered_points_match_brute_force():
+    rng = np.random.default_rng(4)
+    clusters = rng.random((4, 2)) * 100.0
+    points = np.concatenate([center + rng.normal(scale=0.5, size=(35, 2)) for center in clusters])
+    calls = check(points, 12)
+    # the gap between the clusters is triangulated at once, it's only the cluster rims
+    assert max(calls) < len(points) // 4
+
+def test_points_with_holes_match_brute_force():
+    rng = np.random.default_rng(5)
+    points = rng.random((400, 2)) * 2.0 - 1.0
+    # ring with a large empty center and a sparse outside
+    radius = np.linalg.norm(points, axis=1)
+    points = points[(radius > 0.6) & (radius < 0.9) | (rng.random(len(points)) < 0.05)]
+    calls = check(points, 14)
+    assert max(calls) < len(points) // 4
+
+def test_small_sets_are_triangulated_at_once():
+    points = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.2, 1.1]])
+    tris = mesh_delaunay_tiles.tiled_delaunay(points, brute_force_delaunay, 16)
+    assert triangle_set(tris) == triangle_set(brute_force_delaunay(points))
@@ -0,0 +1,76 @@
+import itertools
+import numpy as np
+from mesh_utils import mesh_interior_voxel
+
+
+def box(center, size):
+    # closed box, 6 quads split in 12 triangles
+    corners = np.array(list(itertools.product((-0.5, 0.5), repeat=3))) * size + center
+    quads = [(0, 1, 3, 2), (4, 6, 7, 5), (0, 4, 5, 1), (2, 3, 7, 6), (0, 2, 6, 4), (1, 5, 7, 3)]
+    tris = [(a, b, c) for (a, b, c, d) in quads] + [(a, c, d) for (a, b, c, d) in quads]
+    tri_faces = list(range(6)) * 2
+    return (corners, np.array(tris), np.array(tri_faces))
+
+def reference_exterior(occupied):
+    # 6-neighbourhood flood fill from the border, one voxel layer per step
+    exterior = np.zeros_like(occupied)
+    exterior[[0, -1], :, :] = exterior[:, [0, -1], :] = exterior[:, :, [0, -1]] = True
+    exterior &= ~occupied
+    while True:
+        padded = np.pad(exterior, 1)
+        grown = exterior.copy()
+        for axis in range(3):
+            for shift in (-1, 1):
+                grown |= np.roll(padded, shift, axis=axis)[1:-1, 1:-1, 1:-1]
+        grown &= ~occupied
+        if np.array_equal(grown, exterior):
+            return exterior
+        exterior = grown
+
+def reference_dilate(grid):
+    padded = np.pad(grid, 1)
+    grown = np.zeros_like(grid)
+    for (x, y, z) in itertools.product(range(3), repeat=3):
+        grown |= padded[x:x + grid.shape[0], y:y + grid.shape[1], z:z + grid.shape[2]]
+    return grown
+
+def pack(grid):
+    return np.packbits(grid, axis=-1)
+
+def unpack(packed, depth):
+    return np.unpackbits(packed, axis=-1, count=depth).view(bool)
+
+
+def test_flood_fill_matches_reference():
+    rng = np.random.default_rng(1)
+    for shape in [(9, 7, 8), (13, 11, 21), (6, 17, 35)]:
+        for density in (0.2, 0.4, 0.6):
+            occupied = rng.random(shape) < density
+            exterior = mesh_interior_voxel.flood_fill_exterior(pack(occupied), shape[2])
+            assert np.array_equal(unpack(exterior, shape[2]), reference_exterior(occupied))
+
+def test_dilate_matches_reference():
+    rng = np.random.default_rng(2)
+    for shape in [(5, 6, 7), (10, 9, 24), (4, 4, 33)]:
+        grid = rng.random(shape) < 0.05
+        dilated = mesh_interior_voxel.dilate(pack(grid))
+        assert np.array_equal(unpack(dilated, shape[2]), reference_dilate(grid))
+
+def test_voxelize_marks_surface_only():
+    (coords, tris, tri_faces) = box(np.zeros(3), 1.0)
+    (origin, voxel_size, shape) = mesh_interior_voxel.grid_from_bounds(coords, 16)
+    occupied = unpack(mesh_interior_voxel.voxelize(coords[tris], origin, voxel_size, shape), shape[2])
+    # hollow box, the center is empty and the border layer is free for the flood fill
+    center = tuple(n // 2 for n in shape)
+    assert occupied.any() and not occupied[center]
+    assert not occupied[[0, -1]].any() and not occupied[:, [0, -1]].any() and not occupied[:, :, [0, -1]].any()
+
+def test_nested_box_is_interior():
+    (outer, outer_tris, outer_faces) = box(np.zeros(3), 2.0)
+    (inner, inner_tris, inner_faces) = box(np.array([0.1, -0.2, 0.05]), 0.7)
+    coords = np.concatenate((outer, inner))
+    tris = np.concatenate((outer_tris, inner_tris + len(outer)))
+    tri_faces = np.concatenate((outer_faces, inner_faces + 6))
+    interior = mesh_interior_voxel.find_interior_faces(coords, tris, tri_faces, 12, 32)
+    assert not interior[:6].any()
+    assert interior[6:].all()
@@ -0,0 +1,77 @@
+import numpy as np
+from mesh_utils import mesh_bvh, mesh_interior_winding
+
+
+def grid_box(center, size, steps):
+    # closed box, every side a steps x steps grid of quads split in triangles
+    coords = []
+    tris = []
+    tri_faces = []
+    (u, v) = np.meshgrid(np.linspace(-0.5, 0.5, steps + 1), np.linspace(-0.5, 0.5, steps + 1), indexing='ij')
+    for axis in range(3):
+        for sign in (-1.0, 1.0):
+            side = np.zeros((steps + 1, steps + 1, 3))
+            side[..., axis] = 0.5 * sign
+            side[..., (axis + 1) % 3] = u if sign > 0 else v
+            side[..., (axis + 2) % 3] = v if sign > 0 else u
+            first = len(coords) * (steps + 1) ** 2
+            coords.append(side.reshape(-1, 3))
+            index = first + np.arange((steps + 1) ** 2).reshape(steps + 1, steps + 1)
+            (a, b, c, d) = (index[:-1, :-1], index[1:, :-1], index[1:, 1:], index[:-1, 1:])
+            quads = np.stack((a, b, c, d), axis=-1).reshape(-1, 4)
+            tris.append(np.concatenate((quads[:, [0, 1, 2]], quads[:, [0, 2, 3]])))
+            face_base = sum(len(faces) for faces in tri_faces) // 2
+            faces = face_base + np.arange(len(quads))
+            tri_faces.append(np.concatenate((faces, faces)))
+    coords = np.concatenate(coords) * size + center
+    return (coords, np.concatenate(tris), np.concatenate(tri_faces))
+
+def exact_winding(tri_coords, points):
+    # sum over every triangle, no clusters
+    winding = np.zeros(len(points))
+    for tri in tri_coords:
+        winding += mesh_interior_winding.triangle_winding(np.broadcast_to(tri, (len(points), 3, 3)), points)
+    return winding
+
+def test_closed_box_winding():
+    (coords, tris, tri_faces) = grid_box(np.zeros(3), 1.0, 4)
+    tri_coords = coords[tris]
+    points = np.array([[0.0, 0.0, 0.0], [0.3, -0.2, 0.1], [2.0, 0.0, 0.0], [0.0, 0.9, -3.0]])
+    assert np.allclose(exact_winding(tri_coords, points), [1.0, 1.0, 0.0, 0.0], atol=1e-9)
+
+def test_clusters_match_exact_sum():
+    (coords, tris, tri_faces) = grid_box(np.zeros(3), 1.0, 12)
+    tri_coords = coords[tris]
+    rng = np.random.default_rng(5)
+    points = np.concatenate((rng.random((50, 3)) * 0.8 - 0.4, rng.random((50, 3)) * 4.0 - 2.0))
+    bvh = mesh_bvh.build_bvh(tri_coords)
+    dipoles = mesh_interior_winding.build_dipoles(bvh, tri_coords)
+    exact = exact_winding(tri_coords, points)
+    # the approximation error shrinks as clusters have to be farther away
+    for (beta, error) in ((2.0, 0.05), (5.0, 0.005)):
+        approximate = mesh_interior_winding.winding_numbers(bvh, dipoles, tri_coords, points, beta)
+        assert np.abs(approximate - exact).max() < error
+
+def test_nested_boxes():
+    (outer, outer_tris, outer_faces) = grid_box(np.zeros(3), 2.0, 3)
+    (inner, inner_tris, inner_faces) = grid_box(np.zeros(3), 0.5, 3)
+    coords = np.concatenate((outer, inner))
+    tris = np.concatenate((outer_tris, inner_tris + len(outer)))
+    tri_faces = np.concatenate((outer_faces, inner_faces + outer_faces.max() + 1))
+    face_count = int(tri_faces.max()) + 1
+    interior = mesh_interior_winding.find_interior_faces(coords, tris, tri_faces, face_count, threshold=0.75)
+    expected = np.zeros(face_count, dtype=bool)
+    expected[outer_faces.max() + 1:] = True
+    assert np.array_equal(interior, expected)
+
+def test_chunks_match_whole_mesh():
+    (outer, outer_tris, outer_faces) = grid_box(np.zeros(3), 2.0, 6)
+    (inner, inner_tris, inner_faces) = grid_box(np.array([0.3, 0.0, 0.0]), 0.8, 6)
+    coords = np.concatenate((outer, inner))
+    tris = np.concatenate((outer_tris, inner_tris + len(outer)))
+    tri_faces = np.concatenate((outer_faces, inner_faces + outer_faces.max() + 1))
+    face_count = int(tri_faces.max()) + 1
+    whole = mesh_interior_winding.find_interior_faces(coords, tris, tri_faces, face_count, threshold=0.75)
+    chunked = mesh_interior_winding.find_interior_faces(coords, tris, tri_faces, face_count, threshold=0.75, chunk_size=50)
+    assert whole[outer_faces.max() + 1:].all() and not whole[:outer_faces.max() + 1].any()
+    assert np.array_equal(whole, chunked)
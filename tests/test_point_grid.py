@@ -0,0 +1,32 @@
+import numpy as np
+from mesh_utils import mesh_point_grid
+
+
+def reference_nearest(points, queries, distance):
+    dist = np.linalg.norm(queries[:, None] - points[None], axis=2)
+    nearest = np.argmin(dist, axis=1)
+    return np.where(dist[np.arange(len(queries)), nearest] <= distance, nearest, -1)
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(4)
+    points = rng.random((400, 3))
+    # exact and close copies, far away queries
+    queries = np.concatenate((points[:100], points[100:200] + rng.normal(0, 0.01, (100, 3)), rng.random((100, 3)) * 10 - 5))
+    for distance in (0.0, 0.005, 0.02, 0.3):
+        found = mesh_point_grid.find_nearest(points, queries, distance)
+        assert np.array_equal(found, reference_nearest(points, queries, distance))
+
+def test_coincident_points_prefer_lower_index():
+    points = np.array([[1.0, 2.0, 3.0]] * 3 + [[1.0, 2.0, 4.0]])
+    found = mesh_point_grid.find_nearest(points, points, 0.0)
+    assert found.tolist() == [0, 0, 0, 3]
+
+def test_huge_extent_and_empty_input():
+    # cells grow far beyond the distance, lookups stay exact
+    points = np.array([[0.0, 0.0, 0.0], [1e-6, 0.0, 0.0], [1e9, 0.0, 0.0]])
+    found = mesh_point_grid.find_nearest(points, points + [4e-7, 0.0, 0.0], 1e-6)
+    assert found.tolist() == [0, 1, 2]
+    found = mesh_point_grid.find_nearest(points, points + [0.0, 2e-6, 0.0], 1e-6)
+    assert found.tolist() == [-1, -1, -1]
+    assert len(mesh_point_grid.find_nearest(np.zeros((0, 3)), points, 1.0)) == 3
+    assert mesh_point_grid.find_nearest(points, np.zeros((0, 3)), 1.0).shape == (0,)
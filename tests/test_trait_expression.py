@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from mesh_utils import mesh_trait_expression
+
+EDGE_TRAITS = {
+    'ANGLE': np.array([0.0, 15.0, 30.0, 45.0]),
+    'SEAM': np.array([False, True, False, True]),
+}
+FACE_TRAITS = {
+    'AREA': np.array([1e-7, 1e-6, 2e-6]),
+}
+# edges of every face
+FACE_EDGES = [[0, 1], [1, 2], [3]]
+
+
+def evaluate(expression):
+    def to_edges(face_mask):
+        edge_mask = np.zeros(len(EDGE_TRAITS['ANGLE']), dtype=bool)
+        for face in np.flatnonzero(face_mask):
+            edge_mask[FACE_EDGES[face]] = True
+        return edge_mask
+
+    traits = dict(EDGE_TRAITS, **FACE_TRAITS)
+    trait_expression = mesh_trait_expression.TraitExpression(expression, set(traits), set(FACE_TRAITS),
+        traits.__getitem__, lambda trait, values: values > 0, to_edges)
+    return (trait_expression.domain, trait_expression.evaluate())
+
+def test_number_literals():
+    tokens = mesh_trait_expression.tokenize("AREA < 1e-6 OR ANGLE >= 3E+1 OR ANGLE > -.5 OR ANGLE != 2.")
+    numbers = [value for (kind, value) in tokens if kind == 'NUMBER']
+    assert numbers == [1e-6, 30.0, -0.5, 2.0]
+    assert [kind for (kind, value) in tokens].count('COMPARE') == 4
+
+def test_exponent_thresholds():
+    (domain, mask) = evaluate("AREA < 1e-6")
+    assert domain == 'FACE'
+    assert mask.tolist() == [True, False, False]
+
+    (domain, mask) = evaluate("ANGLE >= 3e1")
+    assert domain == 'EDGE'
+    assert mask.tolist() == [False, False, True, True]
+
+def test_negative_literal():
+    (domain, mask) = evaluate("ANGLE > -1 AND NOT SEAM")
+    assert mask.tolist() == [True, False, True, False]
+    (domain, mask) = evaluate("ANGLE<-1")
+    assert not mask.any()
+
+def test_mixed_domains():
+    # face traits promoted to the edges of matching faces
+    (domain, mask) = evaluate("AREA <= 1.5e-6 AND NOT SEAM")
+    assert domain == 'EDGE'
+    assert mask.tolist() == [True, False, True, False]
+
+def test_errors():
+    with pytest.raises(ValueError):
+        evaluate("AREA < ")
+    with pytest.raises(ValueError):
+        evaluate("AREA < 1e")
+    with pytest.raises(ValueError):
+        evaluate("(ANGLE > 1")
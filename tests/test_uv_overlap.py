@@ -0,0 +1,40 @@
+import numpy as np
+from mesh_utils import mesh_uv_overlap
+
+
+def reference_overlaps(uv_tris, tri_faces, face_count, tolerance):
+    # every pair of triangles of different faces
+    (a, b) = np.triu_indices(len(uv_tris), 1)
+    keep = tri_faces[a] != tri_faces[b]
+    (a, b) = (a[keep], b[keep])
+    hits = mesh_uv_overlap.triangles_overlap(uv_tris[a], uv_tris[b], tolerance)
+    overlapping = np.zeros(face_count, dtype=bool)
+    overlapping[tri_faces[a[hits]]] = True
+    overlapping[tri_faces[b[hits]]] = True
+    return overlapping
+
+def quad(corner, size):
+    (x, y) = corner
+    square = np.array([(x, y), (x + size, y), (x + size, y + size), (x, y + size)])
+    return np.stack((square[[0, 1, 2]], square[[0, 2, 3]]))
+
+def test_grid_matches_all_pairs():
+    rng = np.random.default_rng(7)
+    # small scattered triangles over several UDIM tiles, some large ones spanning many cells
+    centers = rng.random((300, 1, 2)) * [3.0, 2.0]
+    uv_tris = centers + rng.normal(0, 0.03, (300, 3, 2))
+    uv_tris[:10] = centers[:10] + rng.normal(0, 0.5, (10, 3, 2))
+    tri_faces = np.arange(300) // 2
+    for cell_size in (None, 0.01, 0.2):
+        found = mesh_uv_overlap.find_uv_overlaps(uv_tris, tri_faces, 150, 1e-6, cell_size)
+        assert np.array_equal(found, reference_overlaps(uv_tris, tri_faces, 150, 1e-6))
+
+def test_shared_edges_and_separate_tiles():
+    # a grid of quads sharing edges, a copy in the next UDIM tile and one quad stacked on the first
+    quads = [quad((x * 0.1, y * 0.1), 0.1) for x in range(4) for y in range(4)]
+    quads += [quad((1.0 + x * 0.1, y * 0.1), 0.1) for x in range(4) for y in range(4)]
+    quads.append(quad((0.05, 0.05), 0.1))
+    uv_tris = np.concatenate(quads)
+    tri_faces = np.repeat(np.arange(len(quads)), 2)
+    found = mesh_uv_overlap.find_uv_overlaps(uv_tris, tri_faces, len(quads), 1e-6)
+    assert set(np.flatnonzero(found)) == {0, 1, 4, 5, len(quads) - 1}